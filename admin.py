@@ -1,29 +1,76 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, jsonify, Response, current_app
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
 from extensions import db
 from models import User, Alert, Transaction, Admin
+from dashboard_stats import (get_user_stats, get_transaction_stats, get_monthly_transaction_counts,
+                             get_user_transaction_counts, get_user_risk_profiles, get_transaction_total,
+                             recent_users_query)
+from pagination import KeysetPage, InvalidCursor
+from serializers import serialize_transaction, serialize_user
+from risk_stats import reconcile_counters
+from flagging_worker import DEFAULT_LOOKBACK, run_flagging_pass, start_flagging_scheduler
+from query_plans import explain_admin_queries
+from response_cache import response_cache
+from change_feed import STREAM_CLOSED, change_feed, dashboard_snapshot
+from timeseries import get_time_series, includes_archived, parse_range, TimeSeriesError
+from scoring import get_scorer, score_features, check_parity, ScoringQueueFull, MODEL_PATH
+from bulk_scoring import score_stream, start_background_job, resume_background_job, job_key
+from state_store import get_state
+from feature_store import feature_store
+from search_index import SearchError, search, rebuild_search_index
+from data_tables import (DataTableError, flagged_transactions_query, table_page, transactions_query,
+                         user_search_criteria)
+from moderation import ModerationError, build_criteria, bulk_moderate
+from logging_setup import configure_logging
+from request_metrics import instrument_blueprint, render_metrics, timed_inference
+from identity import init_identity, load_principal, identity_cache
+from feature_importance import (DISABLED_MESSAGE as FEATURE_IMPORTANCE_DISABLED, compute_feature_importance,
+                                feature_importance_enabled, get_feature_importance, start_background_computation)
+from archival import archive_transactions, restore_transactions, get_archive_status
+from password_hashing import init_password_hasher
+from read_state import mark_all_read as mark_all_alerts_read, recent_alerts_for, set_alert_read, unread_count
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from functools import wraps
 from datetime import datetime, timedelta
-import bcrypt
+import click
+import json
+import os
+import queue
+import uuid
+import time
 from extensions import db, login_manager
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Blueprint Definition
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+instrument_blueprint(admin_bp)
+
+@admin_bp.record_once
+def init_admin_services(state):
+    configure_logging(state.app)
+    response_cache.init_app(state.app)
+    change_feed.init_app(state.app)
+    feature_store.init_app(state.app)
+    init_identity(state.app)
+    init_password_hasher(state.app)
+
+    # Opt-in: set FLAGGING_WORKER_INTERVAL (seconds) in exactly one process
+    interval = state.app.config.get('FLAGGING_WORKER_INTERVAL')
+    if interval:
+        start_flagging_scheduler(state.app, interval=interval,
+                                 batch_size=state.app.config.get('FLAGGING_WORKER_BATCH_SIZE', 500),
+                                 lookback=state.app.config.get('FLAGGING_WORKER_LOOKBACK', DEFAULT_LOOKBACK))
 
 # Decorators
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        logger.debug(f"Checking admin access for user: {current_user}")
-        logger.debug(f"Is authenticated: {current_user.is_authenticated}")
-        logger.debug(f"Is Admin instance: {isinstance(current_user, Admin)}")
         if not current_user.is_authenticated or not isinstance(current_user, Admin):
             flash('You do not have permission to access this page.', 'danger')
-            logger.warning(f"Access denied for user: {current_user}, redirecting to login")
+            logger.warning("Access denied for user: %s, redirecting to login", current_user)
             return redirect(url_for('auth.admin_login'))
         return f(*args, **kwargs)
     return decorated_function
@@ -33,7 +80,7 @@ def super_admin_required(f):
     def decorated_function(*args, **kwargs):
         if not current_user.is_authenticated or not isinstance(current_user, Admin) or not current_user.is_super_admin:
             flash('You do not have super admin permission to access this page.', 'danger')
-            logger.warning(f"Super admin access denied for user: {current_user}")
+            logger.warning("Super admin access denied for user: %s", current_user)
             return redirect(url_for('auth.login'))
         return f(*args, **kwargs)
     return decorated_function
@@ -43,57 +90,54 @@ def sensitive_data_access_required(f):
     def decorated_function(*args, **kwargs):
         if not current_user.is_authenticated or not isinstance(current_user, Admin) or not current_user.can_view_sensitive_data:
             flash('You do not have permission to view sensitive data.', 'danger')
-            logger.warning(f"Sensitive data access denied for user: {current_user}")
+            logger.warning("Sensitive data access denied for user: %s", current_user)
             return redirect(url_for('admin.dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
+# Pagination helpers
+def wants_json():
+    return request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best == 'application/json'
+
+def paginate_query(query, sort_column, id_column, per_page, total=None):
+    """Keyset pagination on (sort_column, id) by default; OFFSET pagination when ?page= is given."""
+    if 'page' in request.args:
+        page = request.args.get('page', 1, type=int)
+        return query.order_by(sort_column.desc(), id_column.desc()).paginate(page=page, per_page=per_page)
+    try:
+        return KeysetPage(query, sort_column, id_column,
+                          cursor=request.args.get('cursor') or None,
+                          per_page=per_page,
+                          total=total if request.args.get('with_total', type=int) else None)
+    except InvalidCursor as e:
+        logger.warning("Rejected pagination cursor: %s", e)
+        abort(400)
+
+def page_to_dict(page, serialize):
+    if getattr(page, 'is_keyset', False):
+        return page.to_dict(serialize)
+    return {
+        'items': [serialize(item) for item in page.items],
+        'page': page.page,
+        'pages': page.pages,
+        'has_next': page.has_next,
+        'has_prev': page.has_prev,
+        'per_page': page.per_page,
+        'total': page.total,
+    }
+
 # Routes
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
-    logger.info(f"Accessing dashboard for user: {current_user.email}")
+    logger.info("Accessing dashboard for user: %s", current_user.email)
     try:
-        # Flag high-risk transactions and create alerts
-        high_risk_txns = Transaction.query.filter(Transaction.risk_level == 'High', Transaction.is_flagged == False).all()
-        Transaction.query.filter_by(risk_level='High').update({'is_flagged': True})
-        db.session.commit()
-
-        for txn in high_risk_txns:
-            txn.is_flagged = True
-            if not any(alert.message.startswith(f"High risk transaction: {txn.transaction_id[:8]}") 
-                      for alert in Alert.query.filter_by(user_id=txn.user_id).all()):
-                alert = Alert(
-                    user_id=txn.user_id,
-                    message=f"High risk transaction: {txn.transaction_id[:8]}... (₹{txn.amount}) to {txn.recipient_upi}",
-                    alert_type="fraud_alert",
-                    priority="high"
-                )
-                db.session.add(alert)
-        db.session.commit()
-
-        # Get all transactions and flagged transactions
-        all_transactions = Transaction.query.order_by(Transaction.timestamp.desc()).all()
-        flagged_transactions_list = Transaction.query.filter_by(is_flagged=True).order_by(Transaction.timestamp.desc()).all()
-
-        # Get recent alerts (prioritize unread, then fill with read if needed)
-        recent_alerts = Alert.query.filter_by(is_read=False).order_by(Alert.timestamp.desc()).limit(10).all()
-        if len(recent_alerts) < 10:
-            additional_alerts = Alert.query.filter_by(is_read=True).order_by(Alert.timestamp.desc()).limit(10 - len(recent_alerts)).all()
-            recent_alerts.extend(additional_alerts)
-
-        # Calculate stats for all users
-        stats = {
-            'total_users': User.query.count(),
-            'new_users': User.query.filter(User.created_at >= (datetime.utcnow() - timedelta(days=7))).count(),
-            'total_transactions': Transaction.query.count(),
-            'flagged_transactions': len(flagged_transactions_list),
-            'high_risk': Transaction.query.filter_by(risk_level='High').count(),
-            'medium_risk': Transaction.query.filter_by(risk_level='Medium').count(),
-            'low_risk': Transaction.query.filter_by(risk_level='Low').count(),
-            'registered_emails': User.query.count(),
-        }
+        # Calculate stats for all users with grouped aggregates
+        stats = get_user_stats()
+        stats.update(get_transaction_stats())
+        stats['registered_emails'] = stats['total_users']
 
         # Risk distribution for pie chart
         risk_distribution = {
@@ -101,63 +145,29 @@ def dashboard():
             'medium': stats['medium_risk'],
             'high': stats['high_risk']
         }
-        logger.debug(f"Risk Distribution: {risk_distribution}")
+        logger.debug("Risk Distribution: %s", risk_distribution)
 
         # Monthly transaction data for line chart
-        monthly_transactions = []
-        current_date = datetime.utcnow()
-        current_year = current_date.year
-        first_day_of_year = datetime(current_year, 1, 1)
-
-        for month in range(1, 13):
-            month_start = datetime(current_year, month, 1)
-            if month == 12:
-                month_end = datetime(current_year + 1, 1, 1) - timedelta(seconds=1)
-            else:
-                month_end = datetime(current_year, month + 1, 1) - timedelta(seconds=1)
-            
-            count = Transaction.query.filter(
-                Transaction.timestamp >= month_start,
-                Transaction.timestamp <= month_end
-            ).count()
-            monthly_transactions.append(count)
-
-        # Feature importance data
-        feature_importance = {
-            "transaction_amount": 0.35,
-            "recipient_frequency": 0.25,
-            "time_of_day": 0.20,
-            "location_match": 0.15,
-            "device_fingerprint": 0.05
-        }
+        current_year = datetime.utcnow().year
+        monthly_transactions = get_monthly_transaction_counts(current_year)
 
-        # Calculate flagged transactions per user
-        users = User.query.all()
-        user_flagged_counts = {}
-        for user in users:
-            flagged_count = Transaction.query.filter_by(user_id=user.id, is_flagged=True).count()
-            user_flagged_counts[user.username] = flagged_count
+        # Feature importance is computed offline (flask admin compute-feature-importance)
+        importance = get_feature_importance(current_app.config.get('MODEL_PATH', MODEL_PATH)) \
+            if feature_importance_enabled(current_app.config) else None
+        feature_importance = importance['importance'] if importance else {}
 
-        # Get recent alerts for promoted users
+        # Recent alerts (of promoted users, if any), unread for this admin first
         promoted_user_ids = [user.id for user in current_user.promoted_users]
-        if promoted_user_ids:
-            recent_alerts = Alert.query.filter(Alert.user_id.in_(promoted_user_ids)).order_by(Alert.timestamp.desc()).limit(10).all()
-        else:
-            recent_alerts = Alert.query.order_by(Alert.timestamp.desc()).limit(10).all()
+        recent_alerts = recent_alerts_for(current_user.id, promoted_user_ids or None)
 
-        recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-        users = User.query.order_by(User.created_at.desc()).all()
-        for user in users:
-            user.transaction_count = Transaction.query.filter_by(user_id=user.id).count()
+        recent_users = recent_users_query().all()
 
-        current_year = datetime.utcnow().year
-        logger.debug(f"Current Year: {current_year}")
+        logger.debug("Current Year: %s", current_year)
 
         return render_template('admin_dashboard.html',
                              total_users=stats['total_users'],
                              total_transactions=stats['total_transactions'],
                              flagged_transactions=stats['flagged_transactions'],
-                             flagged_transactions_list=flagged_transactions_list,
                              registered_emails=stats['registered_emails'],
                              high_risk=stats['high_risk'],
                              medium_risk=stats['medium_risk'],
@@ -166,99 +176,299 @@ def dashboard():
                              risk_distribution=risk_distribution,
                              recent_alerts=recent_alerts,
                              recent_users=recent_users,
-                             users=users,
-                             user_flagged_counts=user_flagged_counts,
+                             lazy_tables=True,
                              current_user=current_user,
-                             all_transactions=all_transactions,
                              current_year=current_year,
                              feature_importance=feature_importance)
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error updating transactions: {str(e)}")
-        flash('Error updating transaction status', 'danger')
+        logger.error("Error loading dashboard: %s", e)
+        flash('Error loading dashboard data', 'danger')
         return render_template('admin_dashboard.html', **{key: 0 for key in [
             'total_users', 'total_transactions', 'flagged_transactions', 'registered_emails',
             'high_risk', 'medium_risk', 'low_risk'
         ]}, monthly_transactions=[0]*12, risk_distribution={'low': 0, 'medium': 0, 'high': 0}, 
         recent_alerts=[], feature_importance={})
 
+@admin_bp.route('/tables/<name>')
+@login_required
+@admin_required
+def data_table(name):
+    try:
+        return jsonify(table_page(name, request.args))
+    except (DataTableError, InvalidCursor) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@admin_bp.route('/search')
+@login_required
+@admin_required
+def search_records():
+    scope = request.args.get('scope', 'users')
+    try:
+        results = search(scope, request.args.get('q'),
+                         page=request.args.get('page', 1, type=int),
+                         per_page=request.args.get('per_page', 20, type=int))
+    except SearchError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    serialize = serialize_user if scope == 'users' else serialize_transaction
+    results['items'] = [serialize(item) for item in results['items']]
+    return jsonify(results)
+
 @admin_bp.route('/dashboard-data')
 @login_required
 @admin_required
+@response_cache.cached('dashboard')
 def dashboard_data():
     try:
-        current_date = datetime.utcnow()
-        current_year = current_date.year
-        monthly_transactions = []
-        
-        for month in range(1, 13):
-            month_start = datetime(current_year, month, 1)
-            if month == 12:
-                month_end = datetime(current_year + 1, 1, 1) - timedelta(seconds=1)
-            else:
-                month_end = datetime(current_year, month + 1, 1) - timedelta(seconds=1)
-            
-            count = Transaction.query.filter(
-                Transaction.timestamp >= month_start,
-                Transaction.timestamp <= month_end
-            ).count()
-            monthly_transactions.append(count)
-        
-        risk_distribution = {
-            'low': Transaction.query.filter_by(risk_level='Low').count(),
-            'medium': Transaction.query.filter_by(risk_level='Medium').count(),
-            'high': Transaction.query.filter_by(risk_level='High').count()
-        }
-        
-        return jsonify({
-            'monthlyTransactions': monthly_transactions,
-            'riskDistribution': risk_distribution,
-            'total': Transaction.query.count(),
-            'flagged': Transaction.query.filter_by(is_flagged=True).count()
-        })
+        return jsonify(dashboard_snapshot())
     except Exception as e:
-        logger.error(f"Error fetching dashboard data: {str(e)}")
+        logger.error("Error fetching dashboard data: %s", e)
         return jsonify({'error': 'Failed to fetch data'}), 500
 
+@admin_bp.route('/timeseries')
+@login_required
+@admin_required
+@response_cache.cached('dashboard')
+def timeseries():
+    granularity = request.args.get('granularity', 'day')
+    risk_level = request.args.get('risk_level')
+    user_id = request.args.get('user_id', type=int)
+    try:
+        start, end = parse_range(request.args.get('start'), request.args.get('end'), granularity)
+        series = get_time_series(start, end, granularity,
+                                 risk_level=risk_level.capitalize() if risk_level else None,
+                                 user_id=user_id)
+    except TimeSeriesError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        # Hourly series cover live transactions only
+        'includes_archived': includes_archived(granularity),
+        'series': series
+    })
+
+@admin_bp.route('/dashboard-stream')
+@login_required
+@admin_required
+def dashboard_stream():
+    snapshot = dashboard_snapshot()
+    initial = f"retry: 5000\nevent: stats\ndata: {json.dumps(snapshot)}\n\n"
+    subscriber = change_feed.subscribe(snapshot)
+
+    def stream():
+        try:
+            yield initial
+            while True:
+                try:
+                    message = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is STREAM_CLOSED:
+                    return
+                yield message
+        finally:
+            change_feed.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @admin_bp.route('/user/dashboard-data')
 @login_required
 @admin_required
+@response_cache.cached('dashboard')
 def user_dashboard_data():
     try:
+        stats = get_transaction_stats()
         risk_distribution = {
-            'low': Transaction.query.filter_by(risk_level='Low').count(),
-            'medium': Transaction.query.filter_by(risk_level='Medium').count(),
-            'high': Transaction.query.filter_by(risk_level='High').count()
+            'low': stats['low_risk'],
+            'medium': stats['medium_risk'],
+            'high': stats['high_risk']
         }
         return jsonify({
             'success': True,
             'riskDistribution': risk_distribution
         })
     except Exception as e:
-        logger.error(f"Error fetching user dashboard data: {str(e)}")
+        logger.error("Error fetching user dashboard data: %s", e)
         return jsonify({
             'success': False,
             'message': f'Failed to load dashboard data: {str(e)}'
         }), 500
 
+@admin_bp.route('/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+    return jsonify({**response_cache.stats(), 'identity': identity_cache.stats()})
+
+@admin_bp.route('/metrics')
+def metrics():
+    # Scrapers authenticate with METRICS_TOKEN; otherwise an admin session is required
+    token = current_app.config.get('METRICS_TOKEN')
+    if not (token and request.headers.get('Authorization') == f"Bearer {token}"):
+        if not current_user.is_authenticated or not isinstance(current_user, Admin):
+            return Response('Forbidden\n', status=403, mimetype='text/plain')
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@admin_bp.route('/score', methods=['POST'])
+@login_required
+@admin_required
+def score_transaction():
+    data = request.get_json(silent=True) or {}
+    features = data.get('features')
+    if not isinstance(features, list):
+        return jsonify({'success': False, 'message': 'features must be a list of numbers'}), 400
+    try:
+        with timed_inference():
+            probability, risk_level = score_features(features, current_app.config)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except ScoringQueueFull as e:
+        logger.warning("Scoring rejected: %s", e)
+        return jsonify({'success': False, 'message': 'Scoring service is busy, retry shortly'}), 503
+    except FuturesTimeoutError:
+        logger.warning("Scoring timed out waiting for the batch scorer")
+        return jsonify({'success': False, 'message': 'Scoring timed out, retry shortly'}), 503
+    return jsonify({'success': True, 'fraud_probability': probability, 'risk_level': risk_level})
+
+@admin_bp.route('/scoring-metrics')
+@login_required
+@admin_required
+def scoring_metrics():
+    return jsonify(get_scorer(current_app.config).stats())
+
+@admin_bp.route('/features/<int:user_id>')
+@login_required
+@admin_required
+def user_features(user_id):
+    recipient = request.args.get('recipient', '')
+    amount = request.args.get('amount', 0.0, type=float)
+    return jsonify({
+        'user_id': user_id,
+        'features': feature_store.features(user_id, amount, recipient),
+        'store': feature_store.stats()
+    })
+
+@admin_bp.route('/feature-importance')
+@login_required
+@admin_required
+def feature_importance_data():
+    if not feature_importance_enabled(current_app.config):
+        return jsonify({'success': False, 'message': FEATURE_IMPORTANCE_DISABLED}), 404
+    importance = get_feature_importance(current_app.config.get('MODEL_PATH', MODEL_PATH))
+    return jsonify(importance or {'importance': {}, 'computed_at': None})
+
+@admin_bp.route('/feature-importance/refresh', methods=['POST'])
+@login_required
+@admin_required
+def refresh_feature_importance():
+    if not feature_importance_enabled(current_app.config):
+        return jsonify({'success': False, 'message': FEATURE_IMPORTANCE_DISABLED}), 404
+    thread = start_background_computation(
+        current_app._get_current_object(),
+        samples=current_app.config.get('FEATURE_IMPORTANCE_SAMPLES', 2000),
+        repeats=current_app.config.get('FEATURE_IMPORTANCE_REPEATS', 5))
+    if thread is None:
+        return jsonify({'success': False, 'message': 'A computation is already running'}), 409
+    logger.info("Feature importance recomputation started by %s", current_user.email)
+    return jsonify({'success': True, 'message': 'Feature importance recomputation started'}), 202
+
+@admin_bp.route('/bulk-score', methods=['POST'])
+@login_required
+@admin_required
+def bulk_score_upload():
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'message': 'No file uploaded'}), 400
+    fmt = request.form.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'success': False, 'message': 'File must be CSV or JSONL'}), 400
+
+    job_id = f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    upload_dir = os.path.join(current_app.instance_path, 'bulk_uploads')
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{job_id}.{fmt}")
+    upload.save(path)
+
+    start_background_job(current_app._get_current_object(), path, fmt, job_id,
+                         chunk_size=current_app.config.get('BULK_SCORING_CHUNK_SIZE', 5000))
+    logger.info("Bulk scoring job %s started by %s", job_id, current_user.email)
+    return jsonify({'success': True, 'job_id': job_id,
+                    'status_url': url_for('admin.bulk_score_status', job_id=job_id)}), 202
+
+@admin_bp.route('/bulk-score/<job_id>')
+@login_required
+@admin_required
+def bulk_score_status(job_id):
+    progress = get_state(job_key(job_id))
+    if progress is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    return jsonify({'success': True, 'job_id': job_id, **progress})
+
+@admin_bp.route('/bulk-score/<job_id>/resume', methods=['POST'])
+@login_required
+@admin_required
+def bulk_score_resume(job_id):
+    try:
+        resume_background_job(current_app._get_current_object(), job_id,
+                              chunk_size=current_app.config.get('BULK_SCORING_CHUNK_SIZE', 5000))
+    except KeyError:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 409
+    logger.info("Bulk scoring job %s resumed by %s", job_id, current_user.email)
+    return jsonify({'success': True, 'job_id': job_id,
+                    'status_url': url_for('admin.bulk_score_status', job_id=job_id)}), 202
+
 @admin_bp.route('/mark_all_read', methods=['POST'])
 @login_required
 @admin_required
 def mark_all_read():
-    Alert.query.update({'is_read': True})
-    db.session.commit()
-    flash('All alerts marked as read', 'success')
+    try:
+        mark_all_alerts_read(current_user.id)
+        db.session.commit()
+        response_cache.invalidate('dashboard')
+        flash('All alerts marked as read', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error marking alerts read: %s", e)
+        flash('Error marking alerts as read', 'danger')
     return redirect(url_for('admin.dashboard'))
 
+@admin_bp.route('/alerts/<int:alert_id>/<any(read, unread):state>', methods=['POST'])
+@login_required
+@admin_required
+def mark_alert(alert_id, state):
+    alert = Alert.query.get_or_404(alert_id)
+    try:
+        set_alert_read(current_user.id, alert, state == 'read')
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error marking alert %s %s: %s", alert_id, state, e)
+        return jsonify({'success': False, 'message': 'Failed to update alert'}), 500
+    return jsonify({'success': True, 'alert_id': alert_id, 'is_read': state == 'read',
+                    'unread': unread_count(current_user.id)})
+
 @admin_bp.route('/flagged-transactions')
 @login_required
 @admin_required
 def flagged_transactions():
-    page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    flagged_txns = Transaction.query.filter_by(is_flagged=True).order_by(Transaction.timestamp.desc()).paginate(page=page, per_page=per_page)
+    query = flagged_transactions_query()
+    flagged_txns = paginate_query(query, Transaction.timestamp, Transaction.id, per_page,
+                                  total=lambda: get_transaction_stats()['flagged_transactions'])
     
+    if wants_json():
+        return jsonify(page_to_dict(flagged_txns, serialize_transaction))
+    if getattr(flagged_txns, 'is_keyset', False):
+        return render_template('admin_dashboard.html',
+                             flagged_transactions_list=flagged_txns.items,
+                             flagged_pagination=flagged_txns)
     return render_template('admin_dashboard.html', 
                          flagged_transactions_list=flagged_txns.items,
                          pagination=flagged_txns)
@@ -271,6 +481,7 @@ def unflag_transaction(txn_id):
     try:
         txn.is_flagged = False
         db.session.commit()
+        response_cache.invalidate('dashboard')
         flash('Transaction unflagged successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -286,6 +497,7 @@ def delete_transaction(txn_id):
     try:
         db.session.delete(txn)
         db.session.commit()
+        response_cache.invalidate('dashboard')
         flash('Transaction deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -302,12 +514,35 @@ def flag_transaction(txn_id):
         txn.is_flagged = True
         txn.flagged_by_id = current_user.id
         db.session.commit()
+        response_cache.invalidate('dashboard')
         flash('Transaction flagged successfully', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error flagging transaction: {str(e)}', 'danger')
     return redirect(url_for('admin.dashboard'))
 
+@admin_bp.route('/transactions/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_moderate_transactions():
+    data = request.get_json(silent=True) or {}
+    filters = data.get('filter') or {}
+    try:
+        criteria = build_criteria(
+            ids=data.get('ids'),
+            risk_level=filters.get('risk_level'),
+            user_id=filters.get('user_id'),
+            start=filters.get('start'),
+            end=filters.get('end')
+        )
+        summary = bulk_moderate(data.get('action'), criteria, current_user.id)
+    except ModerationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error("Bulk moderation failed: %s", e)
+        return jsonify({'success': False, 'message': 'Bulk moderation failed'}), 500
+    return jsonify({'success': True, **summary})
+
 @admin_bp.route('/delete_user/<int:user_id>', methods=['POST'])
 @login_required
 @admin_required
@@ -315,18 +550,19 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     
     if user.id == current_user.id:
-        logger.warning(f"Admin {current_user.email} attempted to delete their own account")
+        logger.warning("Admin %s attempted to delete their own account", current_user.email)
         flash('You cannot delete your own account.', 'danger')
         return redirect(url_for('admin.dashboard'))
     
     try:
         db.session.delete(user)
         db.session.commit()
-        logger.info(f"User {user.email} deleted by admin {current_user.email}")
+        response_cache.invalidate('dashboard')
+        logger.info("User %s deleted by admin %s", user.email, current_user.email)
         flash(f'User {user.email} and all associated data deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error deleting user {user.email}: {str(e)}")
+        logger.error("Error deleting user %s: %s", user.email, e)
         flash(f'Error deleting user: {str(e)}', 'danger')
     
     return redirect(url_for('admin.dashboard'))
@@ -335,32 +571,27 @@ def delete_user(user_id):
 @login_required
 @admin_required
 def user_management():
-    page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     search = request.args.get('search', '').strip()
     
     query = User.query
     
     if search:
-        query = query.filter(
-            (User.username.ilike(f'%{search}%')) |
-            (User.email.ilike(f'%{search}%'))
-        )
+        query = query.filter(user_search_criteria(search))
     
-    users = query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page)
+    users = paginate_query(query, User.created_at, User.id, per_page, total=query.count)
     
+    user_ids = [user.id for user in users.items]
+    user_counts = get_user_transaction_counts(user_ids)
+    risk_profiles = get_user_risk_profiles(user_ids)
     for user in users.items:
-        user.transaction_count = Transaction.query.filter_by(user_id=user.id).count()
-        high_risk = Transaction.query.filter_by(user_id=user.id, risk_level='High').count()
-        medium_risk = Transaction.query.filter_by(user_id=user.id, risk_level='Medium').count()
-        
-        if high_risk > 3:
-            user.risk_profile = 'high'
-        elif medium_risk > 5 or high_risk > 0:
-            user.risk_profile = 'medium'
-        else:
-            user.risk_profile = 'low'
+        user.transaction_count = user_counts[user.id][0]
+        user.risk_profile = risk_profiles[user.id]
     
+    if wants_json():
+        return jsonify(page_to_dict(users, serialize_user))
+    if getattr(users, 'is_keyset', False):
+        return render_template('admin_dashboard.html', users=users, user_pagination=users, search=search)
     return render_template('admin_dashboard.html', users=users, search=search)
 
 @admin_bp.route('/view-user-security/<int:user_id>')
@@ -382,7 +613,7 @@ def view_user_security(user_id):
             'password_hash': '********' if user.password_hash else 'Not set'
         })
     except Exception as e:
-        logger.error(f"Error fetching security details for user {user_id}: {str(e)}")
+        logger.error("Error fetching security details for user %s: %s", user_id, e)
         return jsonify({
             'success': False,
             'message': 'Failed to load security details'
@@ -392,21 +623,18 @@ def view_user_security(user_id):
 @login_required
 @admin_required
 def transaction_management():
-    page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     risk_level = request.args.get('risk_level', 'all')
     user_id = request.args.get('user_id', type=int)
     
-    query = Transaction.query
-    
-    if risk_level != 'all':
-        query = query.filter_by(risk_level=risk_level.capitalize())
-    
-    if user_id:
-        query = query.filter_by(user_id=user_id)
+    query = transactions_query(None if risk_level == 'all' else risk_level.capitalize(), user_id)
     
-    transactions = query.order_by(Transaction.timestamp.desc()).paginate(page=page, per_page=per_page)
+    transactions = paginate_query(query, Transaction.timestamp, Transaction.id, per_page,
+                                  total=lambda: get_transaction_total(
+                                      None if risk_level == 'all' else risk_level, user_id))
     
+    if wants_json():
+        return jsonify(page_to_dict(transactions, serialize_transaction))
     return render_template('admin_dashboard.html', transactions=transactions)
 
 @admin_bp.route('/create-admin', methods=['POST'])
@@ -414,16 +642,16 @@ def transaction_management():
 @admin_required
 def create_admin():
     email = request.form.get('email')
-    logger.debug(f"Attempting to create admin for email: {email}")
+    logger.debug("Attempting to create admin for email: %s", email)
     user = User.query.filter_by(email=email).first()
     if not user:
-        logger.error(f"No user found with email: {email}")
+        logger.error("No user found with email: %s", email)
         flash('No user found with this email', 'danger')
         return redirect(url_for('admin.dashboard'))
     
     existing_admin = Admin.query.filter_by(email=email).first()
     if existing_admin:
-        logger.warning(f"Admin already exists for email: {email}")
+        logger.warning("Admin already exists for email: %s", email)
         flash('This user is already an admin', 'warning')
         return redirect(url_for('admin.dashboard'))
     
@@ -443,11 +671,11 @@ def create_admin():
         db.session.flush()
         user.promoted_by_id = new_admin.id
         db.session.commit()
-        logger.info(f"Admin created successfully for email: {email}")
+        logger.info("Admin created successfully for email: %s", email)
         flash(f'Successfully created admin account for {email}', 'success')
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error creating admin: {str(e)}")
+        logger.error("Error creating admin: %s", e)
         flash(f'Error creating admin: {str(e)}', 'danger')
     
     return redirect(url_for('admin.dashboard'))
@@ -460,7 +688,7 @@ def promote_to_admin(user_id):
     
     existing_admin = Admin.query.filter_by(email=user.email).first()
     if existing_admin:
-        logger.warning(f"User {user.email} is already an admin")
+        logger.warning("User %s is already an admin", user.email)
         return jsonify({'success': False, 'message': 'User is already an admin'}), 400
     
     new_admin = Admin(
@@ -480,21 +708,119 @@ def promote_to_admin(user_id):
         db.session.flush()
         user.promoted_by_id = new_admin.id
         db.session.commit()
-        logger.info(f"User {user.email} promoted to admin")
+        logger.info("User %s promoted to admin", user.email)
         return jsonify({'success': True, 'message': 'User promoted to admin successfully'})
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error promoting user {user.email}: {str(e)}")
+        logger.error("Error promoting user %s: %s", user.email, e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @login_manager.user_loader
 def load_user(user_id):
-    print(f"Loading user with ID: {user_id}")
-    admin = db.session.get(Admin, int(user_id))
-    if admin:
-        print(f"Loaded Admin: {admin.email}")
-        return admin
-    user = db.session.get(User, int(user_id))
-    if user:
-        print(f"Loaded User: {user.email}")
-    return user
+    return load_principal(user_id)
+
+# CLI commands
+@admin_bp.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """Rebuild the risk counters from the transactions table."""
+    rows = reconcile_counters()
+    click.echo(f"Risk counters rebuilt: {rows} rows")
+
+@admin_bp.cli.command('flag-high-risk')
+@click.option('--batch-size', default=500, show_default=True, help='Transactions per committed batch.')
+@click.option('--interval', type=int, default=None, help='Keep running, one pass every INTERVAL seconds.')
+def flag_high_risk_command(batch_size, interval):
+    """Flag new High risk transactions and raise their alerts."""
+    while True:
+        flagged = run_flagging_pass(batch_size)
+        click.echo(f"Flagged {flagged} high risk transactions")
+        if not interval:
+            break
+        time.sleep(interval)
+
+@admin_bp.cli.command('explain-queries')
+@click.option('--verbose', is_flag=True, help='Print the plan of every query, not only failures.')
+def explain_queries_command(verbose):
+    """EXPLAIN each admin query and fail if any falls back to a full table scan."""
+    failures = []
+    for name, rows, full_scan in explain_admin_queries():
+        if full_scan:
+            failures.append(name)
+        if full_scan or verbose:
+            click.echo(f"{'FULL SCAN' if full_scan else 'ok'}: {name}")
+            for row in rows:
+                click.echo(f"    {row}")
+    if failures:
+        raise click.ClickException(f"{len(failures)} admin queries use a full table scan: {', '.join(failures)}")
+    click.echo("All admin queries use an index")
+
+@admin_bp.cli.command('check-model-parity')
+@click.option('--samples', default=1000, show_default=True, help='Random rows to compare.')
+@click.option('--tolerance', default=1e-5, show_default=True, help='Largest allowed absolute difference.')
+def check_model_parity_command(samples, tolerance):
+    """Compare the NumPy inference engine with Keras (requires TensorFlow)."""
+    max_diff = check_parity(samples=samples)
+    click.echo(f"Max absolute difference over {samples} rows: {max_diff:.3g}")
+    if max_diff > tolerance:
+        raise click.ClickException(f"NumPy engine differs from Keras by more than {tolerance}")
+
+@admin_bp.cli.command('bulk-score')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (default: from the file extension).')
+@click.option('--job-id', default=None, help='Progress key; re-use it to resume (default: the file name).')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows scored and inserted per chunk.')
+def bulk_score_command(path, fmt, job_id, chunk_size):
+    """Score a CSV/JSONL transaction file and store the results."""
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    job_id = job_id or os.path.basename(path)
+    with open(path, 'rb') as stream:
+        summary = score_stream(stream, fmt, job_id, chunk_size, current_app.config)
+    response_cache.invalidate('dashboard')
+    click.echo(json.dumps(summary, indent=2))
+
+@admin_bp.cli.command('compute-feature-importance')
+@click.option('--samples', default=2000, show_default=True, help='Stored transactions to sample.')
+@click.option('--repeats', default=5, show_default=True, help='Shuffles per feature.')
+@click.option('--seed', default=0, show_default=True)
+def compute_feature_importance_command(samples, repeats, seed):
+    """Compute permutation feature importance for the deployed model and store it."""
+    if not feature_importance_enabled(current_app.config):
+        raise click.ClickException(f"{FEATURE_IMPORTANCE_DISABLED} (set FEATURE_IMPORTANCE_ENABLED)")
+    result = compute_feature_importance(samples, repeats, seed, current_app.config.get('MODEL_PATH', MODEL_PATH))
+    for name, share in sorted(result['importance'].items(), key=lambda item: -item[1]):
+        click.echo(f"{name:<24} {share:.4f}")
+    click.echo(f"model {result['model_version']}, {result['samples']} samples, {result['duration_seconds']}s")
+
+@admin_bp.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the user and transaction search index from the tables."""
+    backend = rebuild_search_index()
+    click.echo(f"Search index rebuilt ({backend})")
+
+@admin_bp.cli.command('archive-transactions')
+@click.option('--older-than-days', type=int, default=None,
+              help='Archive transactions older than this (default: ARCHIVE_AFTER_DAYS, 365).')
+@click.option('--chunk-size', default=1000, show_default=True, help='Transactions moved per transaction.')
+def archive_transactions_command(older_than_days, chunk_size):
+    """Move old transactions to the archive table, keeping daily rollups for the charts."""
+    if older_than_days is None:
+        older_than_days = current_app.config.get('ARCHIVE_AFTER_DAYS', 365)
+    archived = archive_transactions(older_than_days, chunk_size)
+    response_cache.invalidate('dashboard')
+    click.echo(f"Archived {archived} transactions older than {older_than_days} days")
+
+@admin_bp.cli.command('restore-transactions')
+@click.argument('start_id', type=int)
+@click.argument('end_id', type=int)
+@click.option('--chunk-size', default=1000, show_default=True, help='Transactions moved per transaction.')
+def restore_transactions_command(start_id, end_id, chunk_size):
+    """Move archived transactions with START_ID <= id <= END_ID back to the live table."""
+    restored = restore_transactions(start_id, end_id, chunk_size)
+    response_cache.invalidate('dashboard')
+    click.echo(f"Restored {restored} transactions")
+
+@admin_bp.cli.command('archive-status')
+def archive_status_command():
+    """Show archive table and rollup sizes and the last archival run."""
+    click.echo(json.dumps(get_archive_status(), indent=2))
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Alert
+import model_patches  # Alert.source_transaction_id and its unique index
+
+alerts_table = Alert.__table__
+ALERT_SOURCE_KEY = ('source_transaction_id', 'alert_type')
+
+FRAUD_ALERT = 'fraud_alert'
+
+
+def transaction_alert(txn, alert_type=FRAUD_ALERT, priority='high', now=None):
+    """Build the alert row for a high-risk transaction."""
+    return {
+        'user_id': txn.user_id,
+        'message': f"High risk transaction: {txn.transaction_id[:8]}... (₹{txn.amount}) to {txn.recipient_upi}",
+        'is_read': False,
+        'alert_type': alert_type,
+        'timestamp': now or datetime.utcnow(),
+        'priority': priority,
+        'source_transaction_id': txn.id,
+    }
+
+
+def _insert_ignoring_duplicates(dialect):
+    """INSERT that leaves an existing (source_transaction_id, alert_type) alert in place, or None."""
+    if dialect == 'mysql':
+        return mysql.insert(alerts_table).on_duplicate_key_update(id=alerts_table.c.id)
+    if dialect == 'postgresql':
+        return postgresql.insert(alerts_table).on_conflict_do_nothing(index_elements=ALERT_SOURCE_KEY)
+    if dialect == 'sqlite':
+        return sqlite.insert(alerts_table).on_conflict_do_nothing(index_elements=ALERT_SOURCE_KEY)
+    return None
+
+
+def _new_sources_only(rows):
+    """Drop rows whose source already has an alert of that type, or repeats one earlier in `rows`."""
+    source_ids = {row['source_transaction_id'] for row in rows if row.get('source_transaction_id') is not None}
+    seen = set(db.session.execute(
+        sa.select(alerts_table.c.source_transaction_id, alerts_table.c.alert_type)
+        .where(alerts_table.c.source_transaction_id.in_(source_ids))
+    ).all()) if source_ids else set()
+    new_rows = []
+    for row in rows:
+        key = (row.get('source_transaction_id'), row['alert_type'])
+        if key[0] is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        new_rows.append(row)
+    return new_rows
+
+
+def insert_alerts(rows):
+    """Insert alert rows, skipping any whose source already has an alert of that type.
+
+    One statement on MySQL, PostgreSQL and SQLite. Elsewhere existing sources
+    are filtered out first, and a row raced in by another writer is skipped
+    through a savepoint.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    statement = _insert_ignoring_duplicates(dialect)
+    if statement is not None:
+        db.session.execute(statement, rows)
+        return
+    rows = _new_sources_only(rows)
+    if not rows:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(sa.insert(alerts_table), rows)
+    except IntegrityError:
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(sa.insert(alerts_table), row)
+            except IntegrityError:
+                # Another writer raised this alert first
+                pass
@@ -0,0 +1,183 @@
+import logging
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from alerts import alerts_table
+from extensions import db
+from models import Transaction
+from state_store import get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = 'archival.progress'
+
+# Columns copied verbatim between the hot and archive tables (ids are preserved)
+TRANSACTION_COLUMNS = (
+    'id', 'user_id', 'transaction_id', 'amount', 'recipient_upi', 'sender_upi', 'timestamp',
+    'fraud_probability', 'risk_level', 'status', 'description', 'is_flagged', 'flagged_by_id',
+)
+
+
+class ArchivedTransaction(db.Model):
+    __tablename__ = 'transactions_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    transaction_id = db.Column(db.String(50), nullable=False, unique=True)
+    amount = db.Column(db.Float, nullable=False)
+    recipient_upi = db.Column(db.String(100), nullable=False)
+    sender_upi = db.Column(db.String(100))
+    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    fraud_probability = db.Column(db.Float, nullable=False)
+    risk_level = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20))
+    description = db.Column(db.String(200))
+    is_flagged = db.Column(db.Boolean)
+    flagged_by_id = db.Column(db.Integer)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class TransactionRollup(db.Model):
+    """Per-day, per-user, per-risk aggregates of archived transactions."""
+    __tablename__ = 'transaction_rollups_daily'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'user_id', 'risk_level', 'is_flagged', name='uq_transaction_rollups_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    risk_level = db.Column(db.String(20), nullable=False)
+    is_flagged = db.Column(db.Boolean, nullable=False, default=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount_sum = db.Column(db.Float, nullable=False, default=0.0)
+    probability_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+
+def _aggregate(source, ids):
+    """Rows of (day, user_id, risk_level, is_flagged, count, amount_sum, probability_sum) for `ids`."""
+    day = func.date(source.c.timestamp)
+    flagged = func.coalesce(source.c.is_flagged, False)
+    return db.session.execute(
+        sa.select(day, source.c.user_id, source.c.risk_level, flagged, func.count(),
+                  func.sum(source.c.amount), func.sum(source.c.fraud_probability))
+        .where(source.c.id.in_(ids))
+        .group_by(day, source.c.user_id, source.c.risk_level, flagged)
+    ).all()
+
+
+def _apply_rollups(rows, sign):
+    """Add (sign=1) or subtract (sign=-1) aggregates, creating missing rollup rows."""
+    table = TransactionRollup.__table__
+    connection = db.session.connection()
+    for day, user_id, risk_level, is_flagged, count, amount_sum, probability_sum in rows:
+        if isinstance(day, str):
+            day = datetime.strptime(day, '%Y-%m-%d').date()
+        criteria = (
+            (table.c.day == day) &
+            (table.c.user_id == user_id) &
+            (table.c.risk_level == risk_level) &
+            (table.c.is_flagged == bool(is_flagged))
+        )
+        values = dict(count=table.c.count + sign * count,
+                      amount_sum=table.c.amount_sum + sign * (amount_sum or 0.0),
+                      probability_sum=table.c.probability_sum + sign * (probability_sum or 0.0))
+        if connection.execute(table.update().where(criteria).values(**values)).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(
+                    day=day, user_id=user_id, risk_level=risk_level, is_flagged=bool(is_flagged),
+                    count=sign * count, amount_sum=sign * (amount_sum or 0.0),
+                    probability_sum=sign * (probability_sum or 0.0)))
+        except IntegrityError:
+            # Another archiver created the row first
+            connection.execute(table.update().where(criteria).values(**values))
+    connection.execute(table.delete().where(table.c.count <= 0))
+
+
+def _move(source, target, ids, sign):
+    """Roll up (or un-roll) `ids`, copy them from `source` to `target` and delete them from `source`.
+
+    Alerts keep their link to the transaction: archived_transaction_id holds
+    it while the transaction is archived (source_transaction_id references
+    the hot table only), and restoring puts it back, so the
+    (source_transaction_id, alert_type) dedupe key survives the round trip.
+    """
+    _apply_rollups(_aggregate(source, ids), sign)
+    columns = [source.c[name] for name in TRANSACTION_COLUMNS]
+    if sign > 0:
+        db.session.execute(alerts_table.update().where(alerts_table.c.source_transaction_id.in_(ids)).values(
+            archived_transaction_id=alerts_table.c.source_transaction_id, source_transaction_id=None))
+    db.session.execute(target.insert().from_select(
+        list(TRANSACTION_COLUMNS), sa.select(*columns).where(source.c.id.in_(ids))))
+    db.session.execute(source.delete().where(source.c.id.in_(ids)))
+    if sign < 0:
+        db.session.execute(alerts_table.update().where(alerts_table.c.archived_transaction_id.in_(ids)).values(
+            source_transaction_id=alerts_table.c.archived_transaction_id, archived_transaction_id=None))
+
+
+def archive_transactions(older_than_days=365, chunk_size=1000, now=None):
+    """Move transactions older than `older_than_days` to the archive table, chunk by chunk.
+
+    Each chunk's daily rollups, copy and delete commit together with the
+    progress record, so an interrupted run resumes after the last chunk.
+    Core statements are used throughout: the risk counters keep counting
+    archived rows, so dashboard totals and monthly charts are unchanged.
+    Returns the number of transactions archived.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    hot = Transaction.__table__
+    archived = 0
+    while True:
+        ids = [row_id for (row_id,) in db.session.execute(
+            sa.select(hot.c.id).where(hot.c.timestamp < cutoff).order_by(hot.c.id).limit(chunk_size))]
+        if not ids:
+            break
+        try:
+            _move(hot, ArchivedTransaction.__table__, ids, 1)
+            progress = get_state(PROGRESS_KEY, {'archived': 0})
+            progress.update(archived=progress['archived'] + len(ids), last_id=ids[-1],
+                            cutoff=cutoff.isoformat(), updated_at=datetime.utcnow().isoformat())
+            set_state(PROGRESS_KEY, progress)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        archived += len(ids)
+        logger.info("Archived %d transactions up to id %d", len(ids), ids[-1])
+        if len(ids) < chunk_size:
+            break
+    return archived
+
+
+def restore_transactions(start_id, end_id, chunk_size=1000):
+    """Move archived transactions with start_id <= id <= end_id back to the hot table."""
+    cold = ArchivedTransaction.__table__
+    restored = 0
+    while True:
+        ids = [row_id for (row_id,) in db.session.execute(
+            sa.select(cold.c.id).where(cold.c.id >= start_id, cold.c.id <= end_id)
+            .order_by(cold.c.id).limit(chunk_size))]
+        if not ids:
+            break
+        try:
+            _move(cold, Transaction.__table__, ids, -1)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        restored += len(ids)
+        logger.info("Restored %d archived transactions up to id %d", len(ids), ids[-1])
+    return restored
+
+
+def get_archive_status():
+    return {
+        'archived_transactions': db.session.query(func.count(ArchivedTransaction.id)).scalar(),
+        'rollup_rows': db.session.query(func.count(TransactionRollup.id)).scalar(),
+        'progress': get_state(PROGRESS_KEY),
+    }
@@ -0,0 +1,4 @@
+"""Reproducible load tests for the admin routes and model scoring.
+
+Run `python -m benchmarks --help` from the repository root.
+"""
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.load import REPO_ROOT, ROUTES, create_app, current_rss_mb, peak_rss_mb, run_route
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Seed a SQLite database and load-test the admin routes.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--alerts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'upi_benchmark.db'),
+                        help='SQLite file; recreated on every run unless --reuse-data is given.')
+    parser.add_argument('--reuse-data', action='store_true', help='Keep an existing database instead of reseeding.')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per route.')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients per route.')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per route.')
+    parser.add_argument('--routes', nargs='+', choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument('--response-cache', action='store_true', help='Measure with the response cache enabled.')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout.')
+    parser.add_argument('--compare', help='Earlier JSON report to print deltas against (on stderr).')
+    return parser.parse_args(argv)
+
+
+def _compare(report, baseline):
+    lines = [f"{'route':<30}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>18}{'sql':>18}"]
+    for name, current in report['routes'].items():
+        previous = baseline['routes'].get(name)
+        if previous is None:
+            continue
+        cells = []
+        for old, new in ((previous['latency_ms'][key], current['latency_ms'][key]) for key in ('p50', 'p95', 'p99')):
+            cells.append(f"{old:>7.1f}→{new:<7.1f}{(new - old) / old * 100 if old else 0:+.0f}%")
+        cells.append(f"{previous['throughput_rps']:>6.0f}→{current['throughput_rps']:<6.0f}")
+        cells.append(f"{previous['sql_statements']['mean']:>5.1f}→{current['sql_statements']['mean']:<5.1f}")
+        lines.append(f"{name:<30}" + ''.join(f"{cell:>18}" for cell in cells))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    reseed = not (args.reuse_data and os.path.exists(args.database))
+    if reseed and os.path.exists(args.database):
+        os.remove(args.database)
+
+    app = create_app(f'sqlite:///{os.path.abspath(args.database)}', RESPONSE_CACHE_ENABLED=args.response_cache)
+    with app.app_context():
+        from flask_migrate import upgrade
+        from models import Admin
+        from benchmarks.synthetic import generate_dataset
+
+        # The migrated schema, indexes and FTS tables included, is what production runs on
+        upgrade()
+        if reseed:
+            admin_id = generate_dataset(args.users, args.transactions, args.alerts, args.seed)
+        else:
+            admin_id = Admin.query.filter_by(username='bench_admin').one().id
+
+    report = {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'dataset': {'users': args.users, 'transactions': args.transactions, 'alerts': args.alerts,
+                        'seed': args.seed},
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'response_cache': args.response_cache,
+            'rss_after_seed_mb': current_rss_mb(),
+            'peak_rss_after_seed_mb': peak_rss_mb(),
+        },
+        'routes': {},
+    }
+    for name in args.routes:
+        report['routes'][name] = run_route(app, admin_id, name, args.requests, args.concurrency,
+                                           args.warmup, args.seed)
+        print(f"{name}: p95 {report['routes'][name]['latency_ms']['p95']} ms", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    if args.compare:
+        with open(args.compare) as f:
+            print(_compare(report, json.load(f)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
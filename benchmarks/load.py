@@ -0,0 +1,180 @@
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import Flask
+from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from extensions import db, login_manager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _score_payload(rng):
+    return {'features': [round(rng.random(), 4) for _ in range(10)]}
+
+
+_REPEAT_PAYMENTS = [_score_payload(random.Random(i))['features'] for i in range(20)]
+
+
+def _repeat_score_payload(rng):
+    # Rent- and subscription-like traffic: a small set of identical feature rows
+    return {'features': rng.choice(_REPEAT_PAYMENTS)}
+
+
+# name -> (method, path, JSON body factory or None)
+ROUTES = {
+    'dashboard': ('GET', '/admin/dashboard', None),
+    'dashboard_data': ('GET', '/admin/dashboard-data', None),
+    'user_management': ('GET', '/admin/users?format=json', None),
+    'user_search': ('GET', '/admin/users?format=json&search=user0001', None),
+    'transaction_management': ('GET', '/admin/transactions?format=json', None),
+    'transaction_management_high': ('GET', '/admin/transactions?format=json&risk_level=high', None),
+    'flagged_table': ('GET', '/admin/tables/flagged', None),
+    'score': ('POST', '/admin/score', _score_payload),
+    'score_repeat': ('POST', '/admin/score', _repeat_score_payload),
+}
+
+_sql = threading.local()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _sql.count = getattr(_sql, 'count', 0) + 1
+
+
+def create_app(database_uri, **config):
+    """The admin blueprint on a bare Flask app, as the load driver sees it.
+
+    Links to endpoints outside the blueprint (login pages, the user site)
+    render as '#', so only admin code is measured. The feature store sync
+    thread and the flagging scheduler stay off so no background work competes
+    with the measured requests. The repo's migrations are registered so the
+    schema is built with `flask_migrate.upgrade()`.
+    """
+    import admin
+
+    app = Flask('benchmarks', template_folder=os.path.join(REPO_ROOT, 'templates'),
+                static_folder=os.path.join(REPO_ROOT, 'static'))
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_uri, SECRET_KEY='benchmark', LOG_LEVEL='WARNING',
+                      RESPONSE_CACHE_ENABLED=False, FEATURE_STORE_SYNC=False, FLAGGING_WORKER_INTERVAL=None)
+    app.config.update(config)
+    db.init_app(app)
+    login_manager.init_app(app)
+    Migrate(app, db, directory=os.path.join(REPO_ROOT, 'migrations'))
+    app.register_blueprint(admin.admin_bp)
+    app.url_build_error_handlers.append(lambda error, endpoint, values: '#')
+    return app
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0), 1)
+
+
+def current_rss_mb():
+    """Resident set size of this process right now, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0), 1)
+
+
+def _delta(before, after):
+    return round(after - before, 1) if before is not None and after is not None else None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _client(app, admin_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = f'admin:{admin_id}'
+        session['_fresh'] = True
+    return client
+
+
+def _worker(app, admin_id, method, path, payload, count, seed, results):
+    client = _client(app, admin_id)
+    rng = random.Random(seed)
+    for _ in range(count):
+        body = payload(rng) if payload else None
+        _sql.count = 0
+        started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        elapsed = time.perf_counter() - started
+        results.append((elapsed, _sql.count, response.status_code))
+
+
+def run_route(app, admin_id, name, requests=200, concurrency=4, warmup=5, seed=0):
+    """Drive one route with `concurrency` test clients and summarise latency, throughput and SQL counts."""
+    method, path, payload = ROUTES[name]
+    # Peak RSS is process-wide and never falls, so each route reports how far it
+    # moved the peak and the resident set, not the absolute figures
+    rss_before, peak_before = current_rss_mb(), peak_rss_mb()
+    if warmup:
+        _worker(app, admin_id, method, path, payload, warmup, seed, [])
+
+    results = []
+    threads = [
+        threading.Thread(target=_worker, args=(app, admin_id, method, path, payload,
+                                               requests // concurrency + (i < requests % concurrency),
+                                               seed + i, results))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    rss_after = current_rss_mb()
+
+    latencies = sorted(elapsed * 1000.0 for elapsed, _, _ in results)
+    sql_counts = sorted(count for _, count, _ in results)
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'method': method,
+        'path': path,
+        'requests': len(results),
+        'concurrency': concurrency,
+        'status_codes': statuses,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3),
+            'mean': round(sum(latencies) / len(latencies), 3),
+        },
+        'throughput_rps': round(len(results) / wall, 1) if wall else None,
+        'sql_statements': {
+            'mean': round(sum(sql_counts) / len(sql_counts), 2),
+            'p50': percentile(sql_counts, 0.50),
+            'max': sql_counts[-1],
+        },
+        'rss_mb': {
+            'start': rss_before,
+            'end': rss_after,
+            'delta': _delta(rss_before, rss_after),
+            'peak_growth': _delta(peak_before, peak_rss_mb()),
+        },
+    }
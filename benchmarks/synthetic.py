@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from alerts import FRAUD_ALERT, alerts_table
+from extensions import db
+from models import Admin, Transaction, User
+from risk_stats import reconcile_counters
+
+# Share of transactions per risk level and the fraud_probability band each is drawn from
+RISK_MIX = (
+    ('Low', 0.80, 0.0, 0.3),
+    ('Medium', 0.15, 0.3, 0.7),
+    ('High', 0.05, 0.7, 1.0),
+)
+FLAGGED_SHARE = {'Low': 0.0, 'Medium': 0.02, 'High': 0.4}
+BATCH_SIZE = 5000
+# Placeholder that never matches a bcrypt hash; benchmark clients log in through the session
+PASSWORD_HASH = '!benchmark'
+
+
+def _risk(rng):
+    roll = rng.random()
+    for risk_level, share, low, high in RISK_MIX:
+        if roll < share:
+            return risk_level, rng.uniform(low, high)
+        roll -= share
+    return risk_level, rng.uniform(low, high)
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(sa.insert(table), rows[start:start + BATCH_SIZE])
+
+
+def generate_dataset(users=1000, transactions=50000, alerts=5000, seed=42, days=365, now=None):
+    """Fill an empty database with seeded synthetic admins, users, transactions and alerts.
+
+    The same arguments always produce the same rows (timestamps are relative
+    to `now`, midnight UTC today by default). Risk counters are reconciled
+    afterwards. Returns the benchmark admin's id.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    admin = Admin(username='bench_admin', email='bench_admin@example.com', password_hash=PASSWORD_HASH,
+                  is_super_admin=True, can_view_sensitive_data=True, created_at=now)
+    db.session.add(admin)
+    db.session.flush()
+
+    _insert(User.__table__, [
+        {'id': i, 'username': f'user{i:06d}', 'email': f'user{i:06d}@example.com',
+         'password_hash': PASSWORD_HASH, 'created_at': now - timedelta(seconds=rng.randint(0, days * 86400))}
+        for i in range(1, users + 1)
+    ])
+
+    # A few recipients per user, reused, so repeat payments look like real traffic
+    recipients = {i: [f'merchant{rng.randint(1, users * 3)}@upi' for _ in range(3)] for i in range(1, users + 1)}
+    rows = []
+    high_risk_ids = []
+    for i in range(1, transactions + 1):
+        user_id = rng.randint(1, users)
+        risk_level, probability = _risk(rng)
+        is_flagged = rng.random() < FLAGGED_SHARE[risk_level]
+        rows.append({
+            'id': i, 'user_id': user_id, 'transaction_id': f'TXN{seed:04d}{i:010d}',
+            'amount': round(rng.lognormvariate(7, 1.2), 2), 'recipient_upi': rng.choice(recipients[user_id]),
+            'sender_upi': f'user{user_id:06d}@upi', 'timestamp': now - timedelta(seconds=rng.randint(0, days * 86400)),
+            'fraud_probability': probability, 'risk_level': risk_level, 'status': 'completed',
+            'description': rng.choice(('rent', 'groceries', 'subscription', 'transfer', None)),
+            'is_flagged': is_flagged, 'flagged_by_id': admin.id if is_flagged else None,
+        })
+        if risk_level == 'High':
+            high_risk_ids.append((i, user_id, rows[-1]['timestamp']))
+    _insert(Transaction.__table__, rows)
+
+    sources = rng.sample(high_risk_ids, min(alerts, len(high_risk_ids)))
+    alert_rows = [
+        {'user_id': user_id, 'message': f'High risk transaction {txn_id}', 'is_read': rng.random() < 0.5,
+         'alert_type': FRAUD_ALERT, 'timestamp': timestamp, 'priority': 'high', 'source_transaction_id': txn_id}
+        for txn_id, user_id, timestamp in sources
+    ]
+    for _ in range(alerts - len(alert_rows)):
+        alert_rows.append({
+            'user_id': rng.randint(1, users), 'message': 'New device login', 'is_read': rng.random() < 0.5,
+            'alert_type': 'security_alert', 'timestamp': now - timedelta(seconds=rng.randint(0, days * 86400)),
+            'priority': 'medium', 'source_transaction_id': None,
+        })
+    _insert(alerts_table, alert_rows)
+    db.session.commit()
+
+    reconcile_counters()
+    return admin.id
@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+from sqlalchemy import insert
+
+from extensions import db
+from models import Transaction
+from response_cache import response_cache
+from risk_stats import record_inserted_rows
+from scoring import N_FEATURES, get_scorer, risk_level_for
+from state_store import get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = [f"feature_{i}" for i in range(N_FEATURES)]
+
+
+def job_key(job_id):
+    return f"bulk_scoring.{job_id}"
+
+
+def iter_records(stream, fmt):
+    """Yield one dict per CSV row / JSONL line of a binary stream without reading it all."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        yield from csv.DictReader(text)
+    elif fmt == 'jsonl':
+        for line in text:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _features(record):
+    # JSONL rows carry a `features` list, CSV rows feature_0..feature_9 columns
+    features = record.get('features')
+    if features is None:
+        features = [record[column] for column in FEATURE_COLUMNS]
+    elif isinstance(features, str):
+        features = json.loads(features)
+    if len(features) != N_FEATURES:
+        raise ValueError(f"Expected {N_FEATURES} features, got {len(features)}")
+    return [float(value) for value in features]
+
+
+def _transaction_row(record, now):
+    timestamp = record.get('timestamp')
+    return {
+        'user_id': int(record['user_id']),
+        'transaction_id': str(record['transaction_id']),
+        'amount': float(record['amount']),
+        'recipient_upi': str(record['recipient_upi']),
+        'sender_upi': record.get('sender_upi') or None,
+        'timestamp': datetime.fromisoformat(timestamp) if timestamp else now,
+        'description': record.get('description') or None,
+        'status': record.get('status') or 'completed',
+        'is_flagged': False,
+    }
+
+
+def _empty_summary():
+    return {'rows_read': 0, 'inserted': 0, 'skipped_existing': 0, 'invalid': 0,
+            'risk_levels': {'Low': 0, 'Medium': 0, 'High': 0}}
+
+
+def _score_chunk(records, predict, summary):
+    now = datetime.utcnow()
+    rows, features, seen = [], [], set()
+    for record in records:
+        try:
+            row_features = _features(record)
+            row = _transaction_row(record, now)
+        except (KeyError, ValueError, TypeError) as e:
+            summary['invalid'] += 1
+            logger.debug("Skipping invalid bulk scoring row: %s", e)
+            continue
+        if row['transaction_id'] in seen:
+            summary['skipped_existing'] += 1
+            continue
+        seen.add(row['transaction_id'])
+        rows.append(row)
+        features.append(row_features)
+    if not rows:
+        return
+
+    # One indexed lookup per chunk for transaction ids already stored
+    existing = {
+        transaction_id for (transaction_id,) in db.session.query(Transaction.transaction_id).filter(
+            Transaction.transaction_id.in_([row['transaction_id'] for row in rows]))
+    }
+    keep = [i for i, row in enumerate(rows) if row['transaction_id'] not in existing]
+    summary['skipped_existing'] += len(rows) - len(keep)
+    if not keep:
+        return
+
+    rows = [rows[i] for i in keep]
+    probabilities = predict(np.asarray([features[i] for i in keep], dtype=np.float32))
+    for row, probability in zip(rows, probabilities):
+        row['fraud_probability'] = float(probability)
+        row['risk_level'] = risk_level_for(row['fraud_probability'])
+        summary['risk_levels'][row['risk_level']] += 1
+
+    db.session.execute(insert(Transaction), rows)
+    record_inserted_rows(rows)
+    summary['inserted'] += len(rows)
+
+
+def score_stream(stream, fmt, job_id, chunk_size=5000, config=None):
+    """Score and store every record of `stream` chunk by chunk.
+
+    Progress (rows consumed and the running summary) is committed with each
+    chunk under the job id, so re-running the same job on the same file
+    resumes after the last committed chunk. Returns the summary.
+    """
+    predict = get_scorer(config).predict
+    progress = get_state(job_key(job_id)) or {'rows_done': 0, 'status': 'running', 'summary': _empty_summary()}
+    if progress['status'] == 'completed':
+        return progress['summary']
+    summary = progress['summary']
+    records = islice(iter_records(stream, fmt), progress['rows_done'], None)
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        try:
+            _score_chunk(chunk, predict, summary)
+            summary['rows_read'] += len(chunk)
+            progress['rows_done'] += len(chunk)
+            set_state(job_key(job_id), progress)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        logger.info("Bulk scoring job %s: %s rows done", job_id, progress['rows_done'])
+
+    progress['status'] = 'completed'
+    progress['finished_at'] = datetime.utcnow().isoformat()
+    set_state(job_key(job_id), progress)
+    db.session.commit()
+    return summary
+
+
+def start_background_job(app, path, fmt, job_id, chunk_size=5000):
+    """Score a saved upload on a background thread; poll progress with get_state(job_key(job_id)).
+
+    The upload is deleted once the job completes. A failed job keeps it, along
+    with its path and format in the job state, so resume_background_job can
+    continue from the last committed chunk.
+    """
+    def run():
+        with app.app_context():
+            try:
+                progress = get_state(job_key(job_id)) or {'rows_done': 0, 'summary': _empty_summary()}
+                progress.update(status='running', path=path, format=fmt)
+                progress.pop('error', None)
+                set_state(job_key(job_id), progress)
+                db.session.commit()
+                with open(path, 'rb') as stream:
+                    score_stream(stream, fmt, job_id, chunk_size, app.config)
+            except Exception as e:
+                logger.error("Bulk scoring job %s failed: %s", job_id, e)
+                db.session.rollback()
+                progress = get_state(job_key(job_id)) or {'rows_done': 0, 'summary': _empty_summary()}
+                progress.update(status='failed', error=str(e), path=path, format=fmt)
+                set_state(job_key(job_id), progress)
+                db.session.commit()
+            else:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("Could not remove bulk scoring upload %s: %s", path, e)
+            finally:
+                # Committed chunks changed the counters even if the job failed part way
+                response_cache.invalidate('dashboard')
+                db.session.remove()
+
+    thread = threading.Thread(target=run, name=f"bulk-scoring-{job_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def resume_background_job(app, job_id, chunk_size=5000):
+    """Restart a failed job on its kept upload, continuing after `rows_done`.
+
+    Raises KeyError for an unknown job and ValueError when the job has not
+    failed or its upload is gone. Call within an app context.
+    """
+    progress = get_state(job_key(job_id))
+    if progress is None:
+        raise KeyError(job_id)
+    if progress.get('status') != 'failed':
+        raise ValueError(f"Job {job_id} is {progress.get('status')}, not failed")
+    path = progress.get('path')
+    if not path or not os.path.exists(path):
+        raise ValueError(f"The upload for job {job_id} is no longer available")
+    return start_background_job(app, path, progress['format'], job_id, chunk_size)
@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from extensions import db
+from models import Alert
+from dashboard_stats import get_transaction_stats, get_monthly_transaction_counts
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of messages when a subscriber is dropped; the stream ends on it
+STREAM_CLOSED = object()
+
+
+def dashboard_snapshot():
+    """Figures pushed to dashboard streams, read from the risk counters."""
+    totals = get_transaction_stats()
+    return {
+        'monthlyTransactions': get_monthly_transaction_counts(datetime.utcnow().year),
+        'riskDistribution': {
+            'low': totals['low_risk'],
+            'medium': totals['medium_risk'],
+            'high': totals['high_risk']
+        },
+        'total': totals['total_transactions'],
+        'flagged': totals['flagged_transactions']
+    }
+
+
+def _serialize_alert(alert):
+    return {
+        'id': alert.id,
+        'user_id': alert.user_id,
+        'message': alert.message,
+        'priority': alert.priority,
+        'alert_type': alert.alert_type,
+        'timestamp': alert.timestamp.strftime('%Y-%m-%d %H:%M') if alert.timestamp else None,
+    }
+
+
+class ChangeFeed:
+    """One poller per worker process fanning dashboard changes out to every subscriber.
+
+    The poller reads the counters and the alerts newer than the last seen id
+    every `interval` seconds, whatever the number of subscribers, and only
+    publishes when something changed.
+    """
+
+    def __init__(self, interval=2.0, queue_size=100):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.snapshot = None
+        self.last_alert_id = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+
+    def init_app(self, app):
+        self._app = app
+        self.interval = app.config.get('DASHBOARD_STREAM_INTERVAL', self.interval)
+
+    def subscribe(self, snapshot=None):
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                # The new subscriber already has `snapshot`; only publish changes to it.
+                # Alerts raised while nobody was listening are not replayed either.
+                self.snapshot = snapshot
+                self.last_alert_id = None
+                self._thread = threading.Thread(target=self._run, name='dashboard-change-feed', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def close(self, subscriber):
+        """Drop a subscriber and make its stream end instead of idling on keep-alives."""
+        self.unsubscribe(subscriber)
+        with subscriber.mutex:
+            subscriber.queue.clear()
+        subscriber.put_nowait(STREAM_CLOSED)
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Slow client: drop it, the browser reconnects and gets a fresh snapshot
+                self.close(subscriber)
+
+    def poll(self):
+        snapshot = dashboard_snapshot()
+        if snapshot != self.snapshot:
+            self.snapshot = snapshot
+            self.publish('stats', snapshot)
+
+        if self.last_alert_id is None:
+            self.last_alert_id = db.session.query(db.func.max(Alert.id)).scalar() or 0
+            return
+        new_alerts = Alert.query.filter(Alert.id > self.last_alert_id).order_by(Alert.id).limit(50).all()
+        if new_alerts:
+            self.last_alert_id = new_alerts[-1].id
+            self.publish('alerts', [_serialize_alert(alert) for alert in new_alerts])
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            with self._app.app_context():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error("Dashboard change feed poll failed: %s", e)
+                finally:
+                    db.session.remove()
+            time.sleep(self.interval)
+
+
+change_feed = ChangeFeed()
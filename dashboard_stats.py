@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from extensions import db
+from models import User
+from risk_stats import get_global_totals, get_monthly_counts, get_user_count, get_user_totals
+
+
+def new_users_query(now=None):
+    """Count of users created in the last 7 days: a range scan on ix_users_created_at_id."""
+    now = now or datetime.utcnow()
+    return db.session.query(func.count(User.id)).filter(User.created_at >= now - timedelta(days=7))
+
+
+def recent_users_query(limit=5):
+    return User.query.order_by(User.created_at.desc()).limit(limit)
+
+
+def get_user_stats(now=None):
+    """Total users from the users counter and users created in the last 7 days."""
+    return {'total_users': get_user_count(), 'new_users': new_users_query(now).scalar()}
+
+
+def get_transaction_stats():
+    """Totals, flagged count and per-risk-level counts from the risk counters."""
+    return get_global_totals()
+
+
+def get_monthly_transaction_counts(year):
+    """Twelve monthly counts for `year` from the month-scoped risk counters."""
+    return get_monthly_counts(year)
+
+
+def get_user_transaction_counts(user_ids=None):
+    """Map user_id -> (transaction_count, flagged_count) from the user-scoped risk counters."""
+    return {
+        user_id: (totals['total_transactions'], totals['flagged_transactions'])
+        for user_id, totals in get_user_totals(user_ids).items()
+    }
+
+
+def get_user_risk_profiles(user_ids):
+    """Map user_id -> 'high' / 'medium' / 'low' from the user-scoped risk counters."""
+    profiles = {}
+    for user_id, totals in get_user_totals(user_ids).items():
+        if totals['high_risk'] > 3:
+            profiles[user_id] = 'high'
+        elif totals['medium_risk'] > 5 or totals['high_risk'] > 0:
+            profiles[user_id] = 'medium'
+        else:
+            profiles[user_id] = 'low'
+    return profiles
+
+
+def get_transaction_total(risk_level=None, user_id=None):
+    """Count of transactions, optionally for one risk level and/or user, from the risk counters."""
+    totals = get_user_totals([user_id])[user_id] if user_id else get_global_totals()
+    if not risk_level:
+        return totals['total_transactions']
+    return totals.get(f"{risk_level.lower()}_risk", 0)
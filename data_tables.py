@@ -0,0 +1,167 @@
+from sqlalchemy.orm import joinedload
+
+from dashboard_stats import get_transaction_stats, get_transaction_total, get_user_transaction_counts
+from models import Transaction, User
+from pagination import KeysetPage
+from search_index import SearchError, search_ids
+from serializers import serialize_transaction, serialize_user
+
+MAX_PER_PAGE = 100
+RISK_LEVELS = ('Low', 'Medium', 'High')
+
+
+class DataTableError(ValueError):
+    pass
+
+
+def flagged_transactions_query():
+    return Transaction.query.filter(Transaction.is_flagged == True)
+
+
+def transactions_query(risk_level=None, user_id=None):
+    """Transactions, optionally of one (capitalised) risk level and/or user."""
+    query = Transaction.query
+    if risk_level:
+        query = query.filter(Transaction.risk_level == risk_level)
+    if user_id:
+        query = query.filter(Transaction.user_id == user_id)
+    return query
+
+
+def _serialize_flagged(txn):
+    data = serialize_transaction(txn)
+    data['username'] = txn.user.username if txn.user else None
+    return data
+
+
+def _transaction_filters(query, args):
+    risk_level = args.get('risk_level')
+    if risk_level:
+        if risk_level.capitalize() not in RISK_LEVELS:
+            raise DataTableError(f"Unknown risk level: {risk_level}")
+        query = query.filter(Transaction.risk_level == risk_level.capitalize())
+    user_id = args.get('user_id', type=int)
+    if user_id:
+        query = query.filter(Transaction.user_id == user_id)
+    search = args.get('search', '').strip()
+    if search:
+        # Prefix match so the unique transaction_id index can serve it; wildcards in the input are literal
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.filter(Transaction.transaction_id.like(f"{escaped}%", escape='\\'))
+    upi = args.get('upi', '').strip()
+    if upi:
+        try:
+            query = query.filter(Transaction.id.in_(search_ids('transactions', upi)))
+        except SearchError as e:
+            raise DataTableError(str(e)) from e
+    return query
+
+
+def user_search_criteria(term):
+    """Filter for users matching `term` through the search index; prefix match for short terms."""
+    try:
+        return User.id.in_(search_ids('users', term))
+    except SearchError:
+        return User.username.startswith(term) | User.email.startswith(term)
+
+
+def _user_filters(query, args):
+    search = args.get('search', '').strip()
+    if search:
+        query = query.filter(user_search_criteria(search))
+    return query
+
+
+def _flagged_total(args):
+    if any(args.get(name) for name in ('risk_level', 'user_id', 'search', 'upi')):
+        return None
+    return get_transaction_stats()['flagged_transactions']
+
+
+def _transactions_total(args):
+    if args.get('search') or args.get('upi'):
+        return None
+    risk_level = args.get('risk_level')
+    return get_transaction_total(risk_level.capitalize() if risk_level else None, args.get('user_id', type=int))
+
+
+def _annotate_users(users):
+    counts = get_user_transaction_counts([user.id for user in users])
+    for user in users:
+        user.transaction_count, user.flagged_count = counts[user.id]
+
+
+def _serialize_table_user(user):
+    data = serialize_user(user)
+    data['flagged_count'] = getattr(user, 'flagged_count', None)
+    return data
+
+
+# Every table: base query, filters, sortable (non-null) columns, default sort, serializer
+TABLES = {
+    'flagged': {
+        'query': lambda: flagged_transactions_query().options(joinedload(Transaction.user)),
+        'filters': _transaction_filters,
+        'sort_columns': {'timestamp': Transaction.timestamp, 'amount': Transaction.amount,
+                         'fraud_probability': Transaction.fraud_probability},
+        'default_sort': 'timestamp',
+        'id_column': Transaction.id,
+        'serialize': _serialize_flagged,
+        'total': _flagged_total,
+    },
+    'transactions': {
+        'query': transactions_query,
+        'filters': _transaction_filters,
+        'sort_columns': {'timestamp': Transaction.timestamp, 'amount': Transaction.amount,
+                         'fraud_probability': Transaction.fraud_probability},
+        'default_sort': 'timestamp',
+        'id_column': Transaction.id,
+        'serialize': serialize_transaction,
+        'total': _transactions_total,
+    },
+    'users': {
+        'query': lambda: User.query,
+        'filters': _user_filters,
+        'sort_columns': {'created_at': User.created_at, 'username': User.username, 'email': User.email},
+        'default_sort': 'created_at',
+        'id_column': User.id,
+        'serialize': _serialize_table_user,
+        'annotate': _annotate_users,
+        'total': lambda args: None,
+    },
+}
+
+
+def table_page(name, args):
+    """One server-sorted, filtered keyset page of a dashboard table as a JSON-ready dict.
+
+    `args` are the request args: sort, order (asc/desc), cursor, per_page,
+    with_total and the table's filters. Raises DataTableError (and
+    InvalidCursor) for bad input.
+    """
+    table = TABLES.get(name)
+    if table is None:
+        raise DataTableError(f"Unknown table: {name}")
+    sort = args.get('sort') or table['default_sort']
+    if sort not in table['sort_columns']:
+        raise DataTableError(f"Cannot sort {name} by {sort}")
+    order = args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise DataTableError(f"Unknown order: {order}")
+    per_page = min(max(args.get('per_page', 10, type=int), 1), MAX_PER_PAGE)
+
+    query = table['filters'](table['query'](), args)
+    total = None
+    if args.get('with_total', type=int):
+        total = table['total'](args)
+        if total is None:
+            total = query.order_by(None).count
+    page = KeysetPage(query, table['sort_columns'][sort], table['id_column'],
+                      cursor=args.get('cursor') or None, per_page=per_page, total=total,
+                      descending=order == 'desc')
+    if 'annotate' in table:
+        table['annotate'](page.items)
+
+    data = page.to_dict(table['serialize'])
+    data.update(table=name, sort=sort, order=order)
+    return data
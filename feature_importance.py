@@ -0,0 +1,142 @@
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func
+
+from extensions import db
+from feature_store import FEATURE_NAMES, FeatureStore
+from models import Transaction
+from scoring import MODEL_PATH, load_numpy_predict, model_version
+from state_store import get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+FEATURE_IMPORTANCE_KEY = 'feature_importance'
+
+# The model's input columns are not documented in this tree, so the sampled
+# vectors are the feature store's behavioural features and the scores say
+# nothing about the deployed model. Nothing is computed or shown unless
+# FEATURE_IMPORTANCE_ENABLED is set, which should wait for the real input schema.
+DISABLED_MESSAGE = 'Feature importance is disabled until the model input schema is wired in'
+
+
+def feature_importance_enabled(config):
+    return bool(config.get('FEATURE_IMPORTANCE_ENABLED', False))
+
+_run_lock = threading.Lock()
+
+
+def sample_feature_matrix(samples=2000, seed=0, batch_size=5000):
+    """Point-in-time feature vectors for a random sample of stored transactions.
+
+    Up to `samples` ids are drawn at random (ids lost to deletes shrink the
+    sample). Only the sampled users' history up to the last sampled id is
+    replayed, in id order, through a private FeatureStore, and each sampled
+    transaction's vector is taken just before it is applied, so no sample sees
+    its own or later transactions. Recipient popularity therefore counts the
+    sampled users' payments only.
+    """
+    max_id = db.session.query(func.max(Transaction.id)).scalar()
+    if not max_id:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    sampled = set(rng.integers(1, max_id + 1, size=min(samples, max_id)).tolist())
+    user_ids = [user_id for (user_id,) in db.session.query(Transaction.user_id).filter(
+        Transaction.id.in_(sampled)).distinct()]
+    if not user_ids:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32)
+
+    store = FeatureStore(batch_size=batch_size)
+    rows = []
+    last_id = 0
+    while True:
+        batch = db.session.query(
+            Transaction.id, Transaction.user_id, Transaction.amount,
+            Transaction.recipient_upi, Transaction.timestamp
+        ).filter(
+            Transaction.user_id.in_(user_ids), Transaction.id > last_id, Transaction.id <= max(sampled)
+        ).order_by(Transaction.id).limit(batch_size).all()
+        for txn in batch:
+            if txn.id in sampled:
+                rows.append(store.feature_vector(txn.user_id, txn.amount or 0.0, txn.recipient_upi, txn.timestamp))
+            store.apply(*txn)
+        if len(batch) < batch_size:
+            break
+        last_id = batch[-1].id
+    return np.asarray(rows, dtype=np.float32)
+
+
+def permutation_importance(predict, matrix, repeats=5, seed=0):
+    """Mean absolute change in predicted probability when each column is shuffled.
+
+    The stored transactions carry no fraud labels, so importance is measured
+    against the model's own predictions. All shuffled copies of one column go
+    through a single batched predict call.
+    """
+    rng = np.random.default_rng(seed)
+    baseline = predict(matrix)
+    n_rows, n_features = matrix.shape
+    scores = np.zeros(n_features)
+    for column in range(n_features):
+        shuffled = np.repeat(matrix[np.newaxis], repeats, axis=0)
+        for copy in shuffled:
+            copy[:, column] = rng.permutation(copy[:, column])
+        predictions = predict(shuffled.reshape(-1, n_features)).reshape(repeats, n_rows)
+        scores[column] = np.abs(predictions - baseline).mean()
+    return scores
+
+
+def compute_feature_importance(samples=2000, repeats=5, seed=0, path=MODEL_PATH):
+    """Compute and store permutation importance for the deployed model. Returns the stored result."""
+    with _run_lock:
+        started = datetime.utcnow()
+        matrix = sample_feature_matrix(samples, seed)
+        if not len(matrix):
+            raise ValueError("No stored transactions to compute feature importance from")
+        scores = permutation_importance(load_numpy_predict(path), matrix, repeats, seed)
+        total = scores.sum()
+        shares = scores / total if total else scores
+
+        result = {
+            'model_version': model_version(path),
+            'computed_at': datetime.utcnow().isoformat(),
+            'duration_seconds': round((datetime.utcnow() - started).total_seconds(), 3),
+            'samples': int(len(matrix)),
+            'repeats': repeats,
+            'importance': {name: round(float(share), 4) for name, share in zip(FEATURE_NAMES, shares)},
+        }
+        set_state(FEATURE_IMPORTANCE_KEY, result)
+        db.session.commit()
+        logger.info("Feature importance computed for model %s from %s transactions",
+                    result['model_version'], result['samples'])
+        return result
+
+
+def get_feature_importance(path=MODEL_PATH):
+    """The stored result for the current model version, or None. One primary-key lookup."""
+    result = get_state(FEATURE_IMPORTANCE_KEY)
+    if result is None or result.get('model_version') != model_version(path):
+        return None
+    return result
+
+
+def start_background_computation(app, samples=2000, repeats=5):
+    """Run `compute_feature_importance` on a daemon thread unless a run is already in progress."""
+    if _run_lock.locked():
+        return None
+
+    def run():
+        with app.app_context():
+            try:
+                compute_feature_importance(samples, repeats, path=app.config.get('MODEL_PATH', MODEL_PATH))
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Feature importance computation failed: %s", e)
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=run, name='feature-importance', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,300 @@
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from extensions import db
+from models import Transaction
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# Ids are allocated at INSERT but become visible at COMMIT, so each sync
+# re-reads this many ids below the last applied one to pick up late commits
+DEFAULT_LOOKBACK = 1000
+# Recipient counts kept per user and across all users; past the limit the
+# less frequent half is dropped, so rare recipients can read as new again
+DEFAULT_MAX_USER_RECIPIENTS = 256
+DEFAULT_MAX_RECIPIENTS = 100000
+
+# Order of `FeatureStore.feature_vector`
+FEATURE_NAMES = [
+    'transaction_amount',
+    'amount_zscore',
+    'recipient_frequency',
+    'recipient_is_new',
+    'recipient_popularity',
+    'time_of_day',
+    'hour_share',
+    'velocity_1h',
+    'velocity_24h',
+    'user_transaction_count',
+]
+
+
+def _trim(counts, limit):
+    """Keep the `limit // 2` largest counts once `counts` grows past `limit`."""
+    if len(counts) <= limit:
+        return counts
+    keep = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit // 2]
+    return dict(keep)
+
+
+def _epoch(moment):
+    # Timestamps are naive UTC throughout the app
+    if isinstance(moment, datetime):
+        return moment.replace(tzinfo=timezone.utc).timestamp()
+    return float(moment)
+
+
+class UserState:
+    """Rolling behaviour of one user; every update is O(1) amortised."""
+
+    __slots__ = ('count', 'mean', 'm2', 'hours', 'recipients', 'window_1h', 'window_24h')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hours = [0] * 24
+        self.recipients = {}
+        self.window_1h = deque()
+        self.window_24h = deque()
+
+    def update(self, amount, recipient, at, max_recipients=DEFAULT_MAX_USER_RECIPIENTS):
+        # Welford's running mean / variance
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+        self.hours[datetime.utcfromtimestamp(at).hour] += 1
+        self.recipients[recipient] = self.recipients.get(recipient, 0) + 1
+        self.recipients = _trim(self.recipients, max_recipients)
+        self.window_1h.append(at)
+        self.window_24h.append(at)
+        self.expire(at)
+
+    def expire(self, now):
+        while self.window_1h and self.window_1h[0] <= now - HOUR:
+            self.window_1h.popleft()
+        while self.window_24h and self.window_24h[0] <= now - DAY:
+            self.window_24h.popleft()
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2, 'hours': self.hours,
+            'recipients': self.recipients, 'window_24h': list(self.window_24h),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.count, state.mean, state.m2 = data['count'], data['mean'], data['m2']
+        state.hours = data['hours']
+        state.recipients = data['recipients']
+        state.window_24h = deque(data['window_24h'])
+        if state.window_24h:
+            last = state.window_24h[-1]
+            state.window_1h = deque(at for at in state.window_24h if at > last - HOUR)
+        return state
+
+
+class FeatureStore:
+    """In-memory per-user and per-recipient behavioural state, one per worker process.
+
+    A sync thread applies transactions newer than the last applied id every
+    `interval` seconds (one indexed range query, each row an O(1) update) and
+    writes a JSON snapshot every `snapshot_interval` seconds, so a restarted
+    process loads the snapshot and only replays what came after it. Scoring
+    reads feature vectors from memory without touching the database.
+
+    The ids applied within `lookback` of the newest one are remembered, so the
+    overlapping re-read applies late commits exactly once.
+    """
+
+    def __init__(self, interval=1.0, snapshot_interval=300.0, batch_size=5000, lookback=DEFAULT_LOOKBACK,
+                 max_user_recipients=DEFAULT_MAX_USER_RECIPIENTS, max_recipients=DEFAULT_MAX_RECIPIENTS):
+        self.interval = interval
+        self.snapshot_interval = snapshot_interval
+        self.batch_size = batch_size
+        self.lookback = lookback
+        self.max_user_recipients = max_user_recipients
+        self.max_recipients = max_recipients
+        self.snapshot_path = None
+        self.last_transaction_id = 0
+        self.recent_ids = set()
+        self.users = {}
+        self.recipients = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self._last_snapshot = time.monotonic()
+
+    def init_app(self, app):
+        self._app = app
+        self.interval = app.config.get('FEATURE_STORE_SYNC_INTERVAL', self.interval)
+        self.snapshot_interval = app.config.get('FEATURE_STORE_SNAPSHOT_INTERVAL', self.snapshot_interval)
+        self.lookback = app.config.get('FEATURE_STORE_LOOKBACK', self.lookback)
+        self.max_user_recipients = app.config.get('FEATURE_STORE_MAX_USER_RECIPIENTS', self.max_user_recipients)
+        self.max_recipients = app.config.get('FEATURE_STORE_MAX_RECIPIENTS', self.max_recipients)
+        self.snapshot_path = app.config.get('FEATURE_STORE_SNAPSHOT_PATH',
+                                            os.path.join(app.instance_path, 'feature_store.json'))
+        if app.config.get('FEATURE_STORE_SYNC', True):
+            self.start()
+            # Threads do not survive a pre-fork server's fork; restart in each worker
+            app.before_request(self.start)
+
+    def apply(self, transaction_id, user_id, amount, recipient, timestamp):
+        """Fold one transaction into the user and recipient state."""
+        at = _epoch(timestamp)
+        amount = float(amount or 0.0)
+        with self._lock:
+            state = self.users.get(user_id)
+            if state is None:
+                state = self.users[user_id] = UserState()
+            state.update(amount, recipient, at, self.max_user_recipients)
+            self.recipients[recipient] = self.recipients.get(recipient, 0) + 1
+            self.recipients = _trim(self.recipients, self.max_recipients)
+            self.recent_ids.add(transaction_id)
+            if transaction_id > self.last_transaction_id:
+                self.last_transaction_id = transaction_id
+
+    def sync(self):
+        """Apply every committed transaction not yet applied, from `lookback` ids below the newest.
+
+        Returns the number applied.
+        """
+        applied = 0
+        after = max(0, self.last_transaction_id - self.lookback)
+        while True:
+            rows = db.session.query(
+                Transaction.id, Transaction.user_id, Transaction.amount,
+                Transaction.recipient_upi, Transaction.timestamp
+            ).filter(Transaction.id > after).order_by(Transaction.id).limit(self.batch_size).all()
+            for row in rows:
+                if row.id not in self.recent_ids:
+                    self.apply(*row)
+                    applied += 1
+            if rows:
+                after = rows[-1].id
+            if len(rows) < self.batch_size:
+                break
+        with self._lock:
+            floor = self.last_transaction_id - self.lookback
+            self.recent_ids = {transaction_id for transaction_id in self.recent_ids if transaction_id > floor}
+        return applied
+
+    def features(self, user_id, amount, recipient, timestamp=None):
+        """Feature dict (keys in FEATURE_NAMES) for a prospective transaction, from memory only."""
+        at = _epoch(timestamp or datetime.utcnow())
+        amount = float(amount)
+        with self._lock:
+            state = self.users.get(user_id) or UserState()
+            state.expire(at)
+            hour = datetime.utcfromtimestamp(at).hour
+            recipient_count = state.recipients.get(recipient, 0)
+            std = state.std
+            return {
+                'transaction_amount': amount,
+                'amount_zscore': (amount - state.mean) / std if std else 0.0,
+                'recipient_frequency': recipient_count / state.count if state.count else 0.0,
+                'recipient_is_new': 0.0 if recipient_count else 1.0,
+                'recipient_popularity': float(self.recipients.get(recipient, 0)),
+                'time_of_day': hour / 23.0,
+                'hour_share': state.hours[hour] / state.count if state.count else 0.0,
+                'velocity_1h': float(len(state.window_1h)),
+                'velocity_24h': float(len(state.window_24h)),
+                'user_transaction_count': float(state.count),
+            }
+
+    def feature_vector(self, user_id, amount, recipient, timestamp=None):
+        features = self.features(user_id, amount, recipient, timestamp)
+        return [features[name] for name in FEATURE_NAMES]
+
+    def snapshot(self):
+        """Write the state to `snapshot_path` atomically."""
+        with self._lock:
+            data = {
+                'last_transaction_id': self.last_transaction_id,
+                'recent_ids': sorted(self.recent_ids),
+                'users': {str(user_id): state.to_dict() for user_id, state in self.users.items()},
+                'recipients': self.recipients,
+            }
+            payload = json.dumps(data, separators=(',', ':'))
+        directory = os.path.dirname(self.snapshot_path)
+        os.makedirs(directory, exist_ok=True)
+        # Every worker process writes its own snapshot; give each write its own temp file
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix=os.path.basename(self.snapshot_path) + '.',
+                                         suffix='.tmp', delete=False) as f:
+            f.write(payload)
+        try:
+            os.replace(f.name, self.snapshot_path)
+        except OSError:
+            os.remove(f.name)
+            raise
+        self._last_snapshot = time.monotonic()
+
+    def load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        with open(self.snapshot_path) as f:
+            data = json.load(f)
+        with self._lock:
+            self.last_transaction_id = data['last_transaction_id']
+            # Snapshots without the list predate the lookback; treat the whole window as applied
+            self.recent_ids = set(data.get('recent_ids') or range(
+                max(0, self.last_transaction_id - self.lookback) + 1, self.last_transaction_id + 1))
+            self.users = {int(user_id): UserState.from_dict(state) for user_id, state in data['users'].items()}
+            self.recipients = data['recipients']
+        logger.info("Feature store loaded snapshot up to transaction %s", self.last_transaction_id)
+        return True
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='feature-store-sync', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        try:
+            self.load_snapshot()
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Feature store snapshot could not be loaded: %s", e)
+        while True:
+            with self._app.app_context():
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.error("Feature store sync failed: %s", e)
+                finally:
+                    db.session.remove()
+            if time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                try:
+                    self.snapshot()
+                except OSError as e:
+                    logger.error("Feature store snapshot failed: %s", e)
+            time.sleep(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self.users),
+                'recipients': len(self.recipients),
+                'last_transaction_id': self.last_transaction_id,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,103 @@
+import logging
+import threading
+
+from alerts import insert_alerts, transaction_alert
+from extensions import db
+from models import Transaction
+from response_cache import response_cache
+from risk_stats import record_bulk_flag_change
+from state_store import get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATER_MARK_KEY = 'flagging.last_transaction_id'
+SEEN_IDS_KEY = 'flagging.seen_transaction_ids'
+
+# Ids are allocated at INSERT but become visible at COMMIT, so a transaction
+# committed after a higher id was scanned would sit below the mark forever.
+# Each pass re-reads this many ids below the mark. The High rows already seen
+# in that window are remembered and skipped, so only late commits are flagged
+# and a row an admin has since unflagged stays unflagged.
+DEFAULT_LOOKBACK = 1000
+
+
+def _flag_batch(batch):
+    unflagged = [txn for txn in batch if not txn.is_flagged]
+    if not unflagged:
+        return 0
+
+    criteria = [Transaction.id.in_([txn.id for txn in unflagged])]
+    record_bulk_flag_change(criteria, True)
+    Transaction.query.filter(*criteria).update({'is_flagged': True}, synchronize_session=False)
+    insert_alerts([transaction_alert(txn) for txn in unflagged])
+    return len(unflagged)
+
+
+def high_risk_batch_query(last_id, batch_size):
+    """The next `batch_size` High risk transactions after `last_id`, in id order."""
+    return db.session.query(
+        Transaction.id, Transaction.user_id, Transaction.transaction_id,
+        Transaction.amount, Transaction.recipient_upi, Transaction.is_flagged
+    ).filter(
+        Transaction.id > last_id,
+        Transaction.risk_level == 'High'
+    ).order_by(Transaction.id).limit(batch_size)
+
+
+def run_flagging_pass(batch_size=500, lookback=DEFAULT_LOOKBACK):
+    """Flag High risk transactions above (or `lookback` ids below) the high-water mark and raise their alerts.
+
+    Each batch is committed together with the advanced high-water mark, so an
+    interrupted pass resumes where it stopped. Returns the number of
+    transactions flagged.
+    """
+    flagged = 0
+    high_water = get_state(HIGH_WATER_MARK_KEY, 0)
+    last_id = max(0, high_water - lookback)
+    seen = get_state(SEEN_IDS_KEY)
+    # Marks saved before the seen list existed: treat the whole window as seen
+    seen = set(range(last_id + 1, high_water + 1) if seen is None else seen)
+    while True:
+        batch = high_risk_batch_query(last_id, batch_size).all()
+        if not batch:
+            break
+
+        try:
+            flagged += _flag_batch([txn for txn in batch if txn.id not in seen])
+            last_id = batch[-1].id
+            high_water = max(high_water, last_id)
+            seen = {txn_id for txn_id in seen | {txn.id for txn in batch} if txn_id > high_water - lookback}
+            set_state(HIGH_WATER_MARK_KEY, high_water)
+            set_state(SEEN_IDS_KEY, sorted(seen))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if len(batch) < batch_size:
+            break
+
+    if flagged:
+        response_cache.invalidate('dashboard')
+        logger.info("Flagging pass flagged %s high risk transactions (last id %s)", flagged, last_id)
+    return flagged
+
+
+def start_flagging_scheduler(app, interval=60, batch_size=500, lookback=DEFAULT_LOOKBACK):
+    """Run `run_flagging_pass` every `interval` seconds on a daemon thread."""
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.is_set():
+            with app.app_context():
+                try:
+                    run_flagging_pass(batch_size, lookback)
+                except Exception as e:
+                    logger.error("Flagging pass failed: %s", e)
+                finally:
+                    db.session.remove()
+            stop_event.wait(interval)
+
+    thread = threading.Thread(target=loop, name='flagging-worker', daemon=True)
+    thread.start()
+    return stop_event
@@ -0,0 +1,168 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached, object_session
+
+from extensions import db
+from model_patches import principal_id
+from models import Admin, User
+from state_store import AppState
+
+logger = logging.getLogger(__name__)
+
+# The prefixes of principal_id (model_patches), back to the model
+PRINCIPAL_TYPES = {'admin': Admin, 'user': User}
+
+# Changed on every admin update or delete, by any process. Cached admins are
+# only served while it matches, so a deleted or demoted admin loses access on
+# their next request rather than when the cache entry expires.
+ADMIN_VERSION_KEY = 'identity.admin_version'
+
+
+def _detached_copy(principal):
+    """Column-only copy that can be merged into any session without SQL."""
+    model = type(principal)
+    copy = model(**{attr.key: getattr(principal, attr.key) for attr in inspect(model).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class IdentityCache:
+    """Per-process LRU of principals keyed by session id.
+
+    Entries expire after `ttl` seconds so changes committed by other
+    processes are picked up; changes made in this process invalidate the
+    entry directly through the mapper events below. An entry stored with a
+    `version` is only returned to a lookup with the same version.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic() or entry[2] != version:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, principal, version=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, _detached_copy(principal), version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+identity_cache = IdentityCache()
+
+
+def init_identity(app):
+    identity_cache.maxsize = app.config.get('IDENTITY_CACHE_SIZE', identity_cache.maxsize)
+    identity_cache.ttl = app.config.get('IDENTITY_CACHE_TTL', identity_cache.ttl)
+
+
+def invalidate_principal(principal):
+    """Drop a cached principal; call after changing an account outside the ORM unit of work."""
+    identity_cache.invalidate(principal_id(principal))
+
+
+def admin_version():
+    """The current admin version stamp: one primary-key read, bypassing the identity map."""
+    return db.session.execute(select(AppState.value).where(AppState.key == ADMIN_VERSION_KEY)).scalar()
+
+
+def _bump_admin_version(connection):
+    table = AppState.__table__
+    values = {'value': json.dumps(uuid.uuid4().hex), 'updated_at': datetime.utcnow()}
+    if connection.execute(table.update().where(table.c.key == ADMIN_VERSION_KEY).values(**values)).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(key=ADMIN_VERSION_KEY, **values))
+    except IntegrityError:
+        # Another process created the stamp first
+        connection.execute(table.update().where(table.c.key == ADMIN_VERSION_KEY).values(**values))
+
+
+def _parse(session_id):
+    kind, _, pk = session_id.partition(':')
+    if not pk:
+        # Sessions created before ids carried their type
+        return None, int(kind)
+    return PRINCIPAL_TYPES[kind], int(pk)
+
+
+def load_principal(session_id):
+    """Resolve a session id to an Admin or User with at most one primary-key lookup.
+
+    Admin sessions also read the admin version stamp, so a cached admin is
+    never served after another process changed or deleted an admin.
+    """
+    try:
+        model, pk = _parse(session_id)
+    except (KeyError, ValueError):
+        return None
+
+    # Admins are checked against the version stamp; users' entries only expire
+    version = admin_version() if model is not User else None
+    if model is not None:
+        cached = identity_cache.get(session_id, version)
+        if cached is not None:
+            return db.session.merge(cached, load=False)
+
+    if model is None:
+        principal = db.session.get(Admin, pk) or db.session.get(User, pk)
+    else:
+        principal = db.session.get(model, pk)
+    if principal is not None:
+        identity_cache.put(principal_id(principal), principal, version if isinstance(principal, Admin) else None)
+    return principal
+
+
+@event.listens_for(Admin, 'after_update')
+@event.listens_for(Admin, 'after_delete')
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_change(mapper, connection, target):
+    key = principal_id(target)
+    identity_cache.invalidate(key)
+    if isinstance(target, Admin):
+        _bump_admin_version(connection)
+    # Again after commit/rollback, in case the row was re-cached mid-transaction
+    object_session(target).info.setdefault('identity_invalidations', set()).add(key)
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_soft_rollback')
+def _invalidate_after_transaction(session, *args):
+    for key in session.info.pop('identity_invalidations', ()):
+        identity_cache.invalidate(key)
@@ -0,0 +1,119 @@
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+_lock = threading.Lock()
+
+
+def _most_specific(table, name):
+    """Value configured for `name` or its nearest dotted parent, else None."""
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition('.')[0]
+    return table.get('')
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING, per logger: {'admin': 0.1} keeps ~10%."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _most_specific(self.rates, record.name)
+        return rate is None or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per logger call site for records below WARNING: {'admin': 20} allows 20/s."""
+
+    def __init__(self, limits):
+        super().__init__()
+        self.limits = limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        limit = _most_specific(self.limits, record.name)
+        if limit is None:
+            return True
+        key = (record.name, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (limit, now))
+            tokens = min(limit, tokens + (now - last) * limit)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """Enqueue records with only their message merged; the listener thread formats the rest.
+
+    The arguments are merged in the caller because they may be context-bound
+    proxies (current_user, request) that resolve to nothing on the listener
+    thread. Records below the level or dropped by sampling never get this far,
+    and the formatter, timestamps and tracebacks stay off the request thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(app):
+    """Route all logging through a queue to a background writer thread.
+
+    LOG_LEVEL sets the root level (default INFO); LOG_SAMPLE_RATES and
+    LOG_RATE_LIMITS map logger names to a kept fraction and a per-call-site
+    rate for records below WARNING; LOG_FILE adds a file next to stderr.
+    Handlers already on the root logger are kept unless LOG_CONFIGURE_ROOT
+    is set, in which case the queue handler replaces them.
+    Safe to call more than once.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = logging.Formatter(app.config.get('LOG_FORMAT', DEFAULT_FORMAT))
+        handlers = [logging.StreamHandler()]
+        if app.config.get('LOG_FILE'):
+            handlers.append(logging.FileHandler(app.config['LOG_FILE']))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+        if app.config.get('LOG_SAMPLE_RATES'):
+            queue_handler.addFilter(SamplingFilter(app.config['LOG_SAMPLE_RATES']))
+        if app.config.get('LOG_RATE_LIMITS'):
+            queue_handler.addFilter(RateLimitFilter(app.config['LOG_RATE_LIMITS']))
+
+        root = logging.getLogger()
+        if app.config.get('LOG_CONFIGURE_ROOT'):
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
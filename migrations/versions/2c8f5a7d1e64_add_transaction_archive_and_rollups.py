@@ -0,0 +1,58 @@
+"""Add transactions_archive and transaction_rollups_daily
+
+Revision ID: 2c8f5a7d1e64
+Revises: 6b0e4d9f2a31
+Create Date: 2026-10-17 18:26:44.530871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8f5a7d1e64'
+down_revision = '6b0e4d9f2a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transactions_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.String(length=50), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('recipient_upi', sa.String(length=100), nullable=False),
+    sa.Column('sender_upi', sa.String(length=100), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('fraud_probability', sa.Float(), nullable=False),
+    sa.Column('risk_level', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('description', sa.String(length=200), nullable=True),
+    sa.Column('is_flagged', sa.Boolean(), nullable=True),
+    sa.Column('flagged_by_id', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transaction_id')
+    )
+    op.create_index('ix_transactions_archive_user_id', 'transactions_archive', ['user_id'], unique=False)
+    op.create_index('ix_transactions_archive_timestamp', 'transactions_archive', ['timestamp'], unique=False)
+    op.create_table('transaction_rollups_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('risk_level', sa.String(length=20), nullable=False),
+    sa.Column('is_flagged', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('amount_sum', sa.Float(), nullable=False),
+    sa.Column('probability_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'user_id', 'risk_level', 'is_flagged', name='uq_transaction_rollups_key')
+    )
+
+
+def downgrade():
+    op.drop_table('transaction_rollups_daily')
+    op.drop_index('ix_transactions_archive_timestamp', table_name='transactions_archive')
+    op.drop_index('ix_transactions_archive_user_id', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
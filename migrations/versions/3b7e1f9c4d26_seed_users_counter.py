@@ -0,0 +1,35 @@
+"""Seed the registered-users counter in risk_counters
+
+Revision ID: 3b7e1f9c4d26
+Revises: 7d2e9b4a1c58
+Create Date: 2026-10-17 23:05:41.207315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1f9c4d26'
+down_revision = '7d2e9b4a1c58'
+branch_labels = None
+depends_on = None
+
+risk_counters = sa.table(
+    'risk_counters',
+    sa.column('scope', sa.String), sa.column('scope_key', sa.String), sa.column('risk_level', sa.String),
+    sa.column('is_flagged', sa.Boolean), sa.column('count', sa.Integer),
+)
+users = sa.table('users', sa.column('id', sa.Integer))
+
+
+def upgrade():
+    op.execute(risk_counters.delete().where(risk_counters.c.scope == 'users'))
+    op.execute(risk_counters.insert().from_select(
+        ['scope', 'scope_key', 'risk_level', 'is_flagged', 'count'],
+        sa.select(sa.literal('users'), sa.literal(''), sa.literal(''), sa.false(), sa.func.count(users.c.id))
+    ))
+
+
+def downgrade():
+    op.execute(risk_counters.delete().where(risk_counters.c.scope == 'users'))
@@ -0,0 +1,28 @@
+"""Add alerts.archived_transaction_id to keep alert links across archiving
+
+Revision ID: 5a1d7c3e9f42
+Revises: 3b7e1f9c4d26
+Create Date: 2026-10-18 00:12:37.604518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1d7c3e9f42'
+down_revision = '3b7e1f9c4d26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.add_column(sa.Column('archived_transaction_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_alerts_archived_transaction_id', ['archived_transaction_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.drop_index('ix_alerts_archived_transaction_id')
+        batch_op.drop_column('archived_transaction_id')
@@ -0,0 +1,29 @@
+"""Add app_state table
+
+Revision ID: 5e8b2f0c4a17
+Revises: c7d1e5a93f20
+Create Date: 2026-10-17 11:40:03.527816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b2f0c4a17'
+down_revision = 'c7d1e5a93f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('app_state',
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('app_state')
@@ -0,0 +1,60 @@
+"""Add full-text search indexes on users and transaction UPI ids
+
+Revision ID: 6b0e4d9f2a31
+Revises: d41f7a2c9e08
+Create Date: 2026-10-17 17:41:09.215304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b0e4d9f2a31'
+down_revision = 'd41f7a2c9e08'
+branch_labels = None
+depends_on = None
+
+# (fts table, content table, columns)
+SEARCH_TABLES = [
+    ('users_fts', 'users', ['username', 'email']),
+    ('transactions_fts', 'transactions', ['recipient_upi', 'sender_upi', 'description']),
+]
+
+
+def _sqlite_upgrade(fts, table, columns):
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    # External-content FTS5 table kept in step with its table by triggers
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, content='{table}', "
+               f"content_rowid='id', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+               f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END")
+    op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END")
+    op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+               f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END")
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for fts, table, columns in SEARCH_TABLES:
+        if dialect == 'sqlite':
+            _sqlite_upgrade(fts, table, columns)
+        elif dialect in ('mysql', 'mariadb'):
+            op.execute(f"CREATE FULLTEXT INDEX ft_{table}_search ON {table} ({', '.join(columns)}) WITH PARSER ngram")
+        # Other databases use the in-process n-gram index in search_index.py
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for fts, table, columns in SEARCH_TABLES:
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+        elif dialect in ('mysql', 'mariadb'):
+            op.drop_index(f'ft_{table}_search', table_name=table)
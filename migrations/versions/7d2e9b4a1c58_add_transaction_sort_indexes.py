@@ -0,0 +1,26 @@
+"""Add (amount, id) and (fraud_probability, id) indexes for the data table sorts
+
+Revision ID: 7d2e9b4a1c58
+Revises: f3a9c2e8b150
+Create Date: 2026-10-17 21:26:13.540871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e9b4a1c58'
+down_revision = 'f3a9c2e8b150'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transactions_amount_id', 'transactions', ['amount', 'id'], unique=False)
+    op.create_index('ix_transactions_fraud_probability_id', 'transactions', ['fraud_probability', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transactions_fraud_probability_id', table_name='transactions')
+    op.drop_index('ix_transactions_amount_id', table_name='transactions')
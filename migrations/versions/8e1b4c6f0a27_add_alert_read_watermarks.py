@@ -0,0 +1,39 @@
+"""Add per-admin alert read watermarks and overrides
+
+Revision ID: 8e1b4c6f0a27
+Revises: 2c8f5a7d1e64
+Create Date: 2026-10-17 19:12:31.407556
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e1b4c6f0a27'
+down_revision = '2c8f5a7d1e64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('alert_read_watermarks',
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_alert_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('admin_id')
+    )
+    op.create_table('alert_read_overrides',
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('alert_id', sa.Integer(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('admin_id', 'alert_id')
+    )
+
+
+def downgrade():
+    op.drop_table('alert_read_overrides')
+    op.drop_table('alert_read_watermarks')
@@ -0,0 +1,32 @@
+"""Add source_transaction_id to alerts with a unique (source, type) index
+
+Revision ID: 9a3c6d1e7b52
+Revises: 5e8b2f0c4a17
+Create Date: 2026-10-17 13:05:51.604392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3c6d1e7b52'
+down_revision = '5e8b2f0c4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.add_column(sa.Column('source_transaction_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_alerts_source_transaction_id', 'transactions',
+                                    ['source_transaction_id'], ['id'], ondelete='SET NULL')
+        batch_op.create_index('uq_alerts_source_transaction_type',
+                              ['source_transaction_id', 'alert_type'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.drop_index('uq_alerts_source_transaction_type')
+        batch_op.drop_constraint('fk_alerts_source_transaction_id', type_='foreignkey')
+        batch_op.drop_column('source_transaction_id')
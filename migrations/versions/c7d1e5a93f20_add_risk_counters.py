@@ -0,0 +1,36 @@
+"""Add risk_counters table
+
+Revision ID: c7d1e5a93f20
+Revises: 8c02120848f1
+Create Date: 2026-10-17 09:12:40.118233
+
+Run `flask admin reconcile-stats` after upgrading to populate the counters
+from the existing transactions.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d1e5a93f20'
+down_revision = '8c02120848f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('risk_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('scope_key', sa.String(length=20), nullable=False),
+    sa.Column('risk_level', sa.String(length=20), nullable=False),
+    sa.Column('is_flagged', sa.Boolean(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'scope_key', 'risk_level', 'is_flagged', name='uq_risk_counters_key')
+    )
+
+
+def downgrade():
+    op.drop_table('risk_counters')
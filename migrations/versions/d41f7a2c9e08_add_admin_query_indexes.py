@@ -0,0 +1,54 @@
+"""Add indexes for the admin query access paths
+
+Revision ID: d41f7a2c9e08
+Revises: 9a3c6d1e7b52
+Create Date: 2026-10-17 15:22:17.842905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f7a2c9e08'
+down_revision = '9a3c6d1e7b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 8c02120848f1 (autogenerated) drops transactions.risk_level, which the model and the
+    # indexes below rely on; put it back on databases built from the migrations alone
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('transactions')}
+    if 'risk_level' not in columns:
+        op.add_column('transactions', sa.Column('risk_level', sa.String(length=20), nullable=False,
+                                                server_default='Low'))
+    op.create_index('ix_transactions_risk_level_id', 'transactions', ['risk_level', 'id'], unique=False)
+    op.create_index('ix_transactions_user_id_is_flagged', 'transactions', ['user_id', 'is_flagged'], unique=False)
+    op.create_index('ix_transactions_user_id_risk_level', 'transactions', ['user_id', 'risk_level'], unique=False)
+    op.create_index('ix_transactions_user_id_timestamp', 'transactions', ['user_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_transactions_timestamp_id', 'transactions', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_transactions_is_flagged_timestamp', 'transactions', ['is_flagged', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_transactions_risk_level_timestamp', 'transactions', ['risk_level', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_alerts_is_read_timestamp', 'alerts', ['is_read', 'timestamp'], unique=False)
+    op.create_index('ix_alerts_user_id_timestamp', 'alerts', ['user_id', 'timestamp'], unique=False)
+    op.create_index('ix_alerts_timestamp', 'alerts', ['timestamp'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_alerts_timestamp', table_name='alerts')
+    op.drop_index('ix_alerts_user_id_timestamp', table_name='alerts')
+    op.drop_index('ix_alerts_is_read_timestamp', table_name='alerts')
+    op.drop_index('ix_transactions_risk_level_timestamp', table_name='transactions')
+    op.drop_index('ix_transactions_is_flagged_timestamp', table_name='transactions')
+    op.drop_index('ix_transactions_timestamp_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_timestamp', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_risk_level', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_is_flagged', table_name='transactions')
+    op.drop_index('ix_transactions_risk_level_id', table_name='transactions')
+    # Mirror upgrade(): at the previous revision the column does not exist (8c02120848f1 dropped it)
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('transactions')}
+    if 'risk_level' in columns:
+        op.drop_column('transactions', 'risk_level')
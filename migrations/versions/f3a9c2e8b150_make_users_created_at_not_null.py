@@ -0,0 +1,49 @@
+"""Backfill users.created_at and make it NOT NULL
+
+Revision ID: f3a9c2e8b150
+Revises: 8e1b4c6f0a27
+Create Date: 2026-10-17 21:04:52.118093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c2e8b150'
+down_revision = '8e1b4c6f0a27'
+branch_labels = None
+depends_on = None
+
+
+def _sqlite_triggers(table):
+    # Batch mode rebuilds the table on SQLite, which drops its triggers (the FTS sync ones)
+    if op.get_bind().dialect.name != 'sqlite':
+        return []
+    return [row[0] for row in op.get_bind().execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {'table': table})]
+
+
+def _alter_created_at(nullable):
+    triggers = _sqlite_triggers('users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=nullable)
+    remaining = set(_sqlite_triggers('users'))
+    for trigger in triggers:
+        if trigger not in remaining:
+            op.execute(trigger)
+
+
+def upgrade():
+    # Keyset pagination over (created_at, id) cannot seek past NULLs; date
+    # legacy rows by their first transaction, or now if they have none
+    op.execute(
+        "UPDATE users SET created_at = COALESCE("
+        "(SELECT MIN(transactions.timestamp) FROM transactions WHERE transactions.user_id = users.id), "
+        "CURRENT_TIMESTAMP) WHERE created_at IS NULL"
+    )
+    _alter_created_at(nullable=False)
+
+
+def downgrade():
+    _alter_created_at(nullable=True)
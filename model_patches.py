@@ -0,0 +1,36 @@
+"""Every change this package makes to the classes in models.py, in one place.
+
+models.py is shared with the main application and predates some of the
+admin migrations, so the columns and indexes those migrations add, and the
+admin-specific behaviour, are attached here at import time. Each patch is
+guarded so it is a no-op once models.py declares the same thing. Modules that
+rely on a patched attribute import this module first (alerts, identity).
+"""
+import sqlalchemy as sa
+
+from extensions import db
+from models import Admin, Alert, User
+
+# Migration 9a3c6d1e7b52: the transaction an alert was raised for, unique per alert type
+if 'source_transaction_id' not in Alert.__table__.c:
+    Alert.source_transaction_id = db.Column(
+        db.Integer, db.ForeignKey('transactions.id', ondelete='SET NULL', name='fk_alerts_source_transaction_id'))
+if not any(index.name == 'uq_alerts_source_transaction_type' for index in Alert.__table__.indexes):
+    sa.Index('uq_alerts_source_transaction_type', Alert.__table__.c.source_transaction_id,
+             Alert.__table__.c.alert_type, unique=True)
+
+# Migration 5a1d7c3e9f42: the source transaction of an alert while that transaction is archived
+if 'archived_transaction_id' not in Alert.__table__.c:
+    Alert.archived_transaction_id = db.Column(db.Integer, index=True)
+
+# Session ids look like "admin:3" / "user:3" so the two tables' ids never collide
+PRINCIPAL_PREFIXES = {Admin: 'admin', User: 'user'}
+
+
+def principal_id(principal):
+    return f"{PRINCIPAL_PREFIXES[type(principal)]}:{principal.id}"
+
+
+# Flask-Login stores get_id() in the session and hands it back to the user_loader
+Admin.get_id = principal_id
+User.get_id = principal_id
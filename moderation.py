@@ -0,0 +1,134 @@
+import logging
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from alerts import FRAUD_ALERT, alerts_table, insert_alerts, transaction_alert
+from extensions import db
+from models import Transaction
+from response_cache import response_cache
+from risk_stats import record_bulk_delete, record_bulk_flag_change
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('flag', 'unflag', 'delete')
+RISK_LEVELS = ('Low', 'Medium', 'High')
+MAX_IDS = 10000
+ALERT_BATCH_SIZE = 1000
+
+
+class ModerationError(ValueError):
+    pass
+
+
+def build_criteria(ids=None, risk_level=None, user_id=None, start=None, end=None):
+    """Transaction filter for a bulk action; at least one condition is required."""
+    criteria = []
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(txn_id, int) for txn_id in ids):
+            raise ModerationError("ids must be a list of integers")
+        if len(ids) > MAX_IDS:
+            raise ModerationError(f"At most {MAX_IDS} ids per request")
+        criteria.append(Transaction.id.in_(ids))
+    if risk_level:
+        if risk_level not in RISK_LEVELS:
+            raise ModerationError(f"Unknown risk level: {risk_level}")
+        criteria.append(Transaction.risk_level == risk_level)
+    if user_id:
+        try:
+            criteria.append(Transaction.user_id == int(user_id))
+        except (TypeError, ValueError) as e:
+            raise ModerationError(f"Invalid user id: {user_id!r}") from e
+    try:
+        if start:
+            criteria.append(Transaction.timestamp >= datetime.fromisoformat(start))
+        if end:
+            criteria.append(Transaction.timestamp < datetime.fromisoformat(end))
+    except (TypeError, ValueError) as e:
+        raise ModerationError(f"Invalid date: {str(e)}") from e
+    if not criteria:
+        raise ModerationError("Provide ids or at least one filter")
+    return criteria
+
+
+def _matching_ids(criteria):
+    return sa.select(Transaction.id).where(*criteria).scalar_subquery()
+
+
+def _insert_flag_alerts(unflagged):
+    """Raise fraud alerts for the High risk rows among `unflagged`, in id-ordered batches."""
+    last_id = 0
+    while True:
+        batch = db.session.query(
+            Transaction.id, Transaction.user_id, Transaction.transaction_id,
+            Transaction.amount, Transaction.recipient_upi
+        ).filter(*unflagged).filter(
+            Transaction.risk_level == 'High', Transaction.id > last_id
+        ).order_by(Transaction.id).limit(ALERT_BATCH_SIZE).all()
+        insert_alerts([transaction_alert(txn) for txn in batch])
+        if len(batch) < ALERT_BATCH_SIZE:
+            return
+        last_id = batch[-1].id
+
+
+def _flag(criteria, admin_id):
+    unflagged = [*criteria, (Transaction.is_flagged == False) | Transaction.is_flagged.is_(None)]
+    newly_flagged = db.session.query(sa.func.count(Transaction.id)).filter(*unflagged).scalar()
+    # High risk transactions carry a fraud alert, as they do when the flagging worker flags them
+    _insert_flag_alerts(unflagged)
+    record_bulk_flag_change(criteria, True)
+    # Rows already flagged keep the admin who flagged them
+    updated = Transaction.query.filter(*unflagged).update(
+        {'is_flagged': True, 'flagged_by_id': admin_id}, synchronize_session=False)
+    return {'updated': updated, 'newly_flagged': newly_flagged}
+
+
+def _unflag(criteria):
+    # Unflagging resolves the transactions' fraud alerts through the global
+    # Alert.is_read flag, so they read as read for every admin. An admin who
+    # explicitly marked one unread keeps it unread: per-admin overrides win
+    # (see read_state).
+    record_bulk_flag_change(criteria, False)
+    updated = Transaction.query.filter(*criteria).update({'is_flagged': False}, synchronize_session=False)
+    resolved = db.session.execute(
+        alerts_table.update().where(
+            alerts_table.c.source_transaction_id.in_(_matching_ids(criteria)),
+            alerts_table.c.alert_type == FRAUD_ALERT,
+            alerts_table.c.is_read == False
+        ).values(is_read=True)
+    ).rowcount
+    return {'updated': updated, 'alerts_resolved': resolved}
+
+
+def _delete(criteria):
+    record_bulk_delete(criteria)
+    alerts_deleted = db.session.execute(
+        alerts_table.delete().where(alerts_table.c.source_transaction_id.in_(_matching_ids(criteria)))
+    ).rowcount
+    deleted = Transaction.query.filter(*criteria).delete(synchronize_session=False)
+    return {'deleted': deleted, 'alerts_deleted': alerts_deleted}
+
+
+def bulk_moderate(action, criteria, admin_id):
+    """Apply `action` to every transaction matching `criteria` in one transaction.
+
+    Each action is a single set-based UPDATE or DELETE; risk counters and the
+    transactions' fraud alerts are adjusted in the same transaction.
+    Returns a summary dict.
+    """
+    if action not in ACTIONS:
+        raise ModerationError(f"Unknown action: {action}")
+    try:
+        if action == 'flag':
+            summary = _flag(criteria, admin_id)
+        elif action == 'unflag':
+            summary = _unflag(criteria)
+        else:
+            summary = _delete(criteria)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    response_cache.invalidate('dashboard')
+    logger.info("Bulk %s by admin %s: %s", action, admin_id, summary)
+    return {'action': action, **summary}
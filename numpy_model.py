@@ -0,0 +1,94 @@
+import json
+
+import h5py
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    # Split by sign so large magnitudes do not overflow exp()
+    out = np.empty_like(x)
+    positive = x >= 0
+    out[positive] = 1.0 / (1.0 + np.exp(-x[positive]))
+    exp_x = np.exp(x[~positive])
+    out[~positive] = exp_x / (1.0 + exp_x)
+    return out
+
+
+def _softmax(x):
+    shifted = np.exp(x - x.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    None: lambda x: x,
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'softmax': _softmax,
+}
+
+# Layers that are the identity at inference time
+PASSTHROUGH_LAYERS = ('InputLayer', 'Dropout', 'GaussianNoise', 'GaussianDropout', 'ActivityRegularization')
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class NumpyModel:
+    """Forward pass of a Keras Sequential model of Dense layers, in NumPy."""
+
+    def __init__(self, layers):
+        # layers: [(kernel, bias, activation_name)]
+        self.layers = layers
+        self.input_dim = layers[0][0].shape[0]
+
+    def predict(self, x):
+        """Probabilities for one row (shape (n_features,)) or a batch (shape (n, n_features))."""
+        batch = np.array(x, dtype=np.float32, ndmin=2)
+        if batch.shape[1] != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim} features, got {batch.shape[1]}")
+        for kernel, bias, activation in self.layers:
+            batch = ACTIVATIONS[activation](batch @ kernel + bias)
+        return batch.reshape(-1) if batch.shape[1] == 1 else batch
+
+
+def load_numpy_model(path):
+    """Read Dense layer weights and activations straight from a Keras HDF5 file."""
+    with h5py.File(path, 'r') as f:
+        config = json.loads(_decode(f.attrs['model_config']))
+        if config['class_name'] != 'Sequential':
+            raise ValueError(f"Unsupported model class: {config['class_name']}")
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+
+        layers = []
+        for layer in config['config']['layers']:
+            class_name = layer['class_name']
+            layer_config = layer['config']
+            if class_name in PASSTHROUGH_LAYERS:
+                continue
+            if class_name != 'Dense':
+                raise ValueError(f"Unsupported layer type: {class_name}")
+            activation = layer_config.get('activation')
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+
+            group = weights_group[layer_config['name']]
+            weights = {}
+            for weight_name in group.attrs['weight_names']:
+                weight_name = _decode(weight_name)
+                short_name = weight_name.split('/')[-1].split(':')[0]
+                weights[short_name] = np.asarray(group[weight_name], dtype=np.float32)
+            bias = weights.get('bias')
+            if bias is None:
+                bias = np.zeros(weights['kernel'].shape[1], dtype=np.float32)
+            layers.append((weights['kernel'], bias, activation))
+
+    if not layers:
+        raise ValueError(f"No Dense layers found in {path}")
+    return NumpyModel(layers)
@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id, direction, sort_key, order):
+    # The sort column and order travel with the position so a cursor cannot be
+    # replayed against a different ordering. Datetimes travel as ISO strings;
+    # other sort values (text, numbers) as-is with a 'v' tag
+    if isinstance(sort_value, datetime):
+        payload = [sort_value.isoformat(), row_id, direction, sort_key, order]
+    else:
+        payload = [sort_value, row_id, direction, sort_key, order, 'v']
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, sort_key, order):
+    """Return (sort_value, row_id, direction); InvalidCursor if malformed or issued for another sort/order."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value, row_id, direction, cursor_sort, cursor_order = payload[:5]
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        if len(payload) == 5:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif len(payload) != 6 or payload[5] != 'v' or sort_value is None:
+            raise ValueError(payload[5:])
+        row_id = int(row_id)
+    except (ValueError, TypeError, IndexError) as e:
+        raise InvalidCursor(f"Invalid pagination cursor: {token!r}") from e
+    if (cursor_sort, cursor_order) != (sort_key, order):
+        raise InvalidCursor(f"Pagination cursor is for sort {cursor_sort} {cursor_order}, not {sort_key} {order}")
+    return sort_value, row_id, direction
+
+
+def seek(query, sort_column, id_column, cursor=None, per_page=20, descending=True):
+    """Return (query, direction): `query` filtered past the cursor, ordered and limited to per_page + 1 rows."""
+    sort_key = sort_column.key
+    order = 'desc' if descending else 'asc'
+    direction = 'next'
+    if cursor:
+        sort_value, row_id, direction = decode_cursor(cursor, sort_key, order)
+        # Seek towards the end of the ordering for 'next', towards the start for 'prev'
+        if (direction == 'next') == descending:
+            query = query.filter(or_(sort_column < sort_value,
+                                     and_(sort_column == sort_value, id_column < row_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value,
+                                     and_(sort_column == sort_value, id_column > row_id)))
+
+    if (direction == 'next') == descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    return query.limit(per_page + 1), direction
+
+
+class KeysetPage:
+    """One page of a keyset (seek) pagination over (sort_column, id), descending by default.
+
+    Exposes `items`, `has_next`/`has_prev` and opaque `next_cursor`/`prev_cursor`
+    tokens; iterating a page yields its items like a Flask-SQLAlchemy Pagination.
+    """
+    is_keyset = True
+
+    def __init__(self, query, sort_column, id_column, cursor=None, per_page=20, total=None, descending=True):
+        self.per_page = per_page
+        self.cursor = cursor
+        sort_key = sort_column.key
+        id_key = id_column.key
+        order = 'desc' if descending else 'asc'
+        query, direction = seek(query, sort_column, id_column, cursor, per_page, descending)
+        rows = query.all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if direction == 'prev':
+            rows.reverse()
+
+        self.items = rows
+        if direction == 'next':
+            self.has_prev = cursor is not None
+            self.has_next = has_more
+        else:
+            self.has_prev = has_more
+            self.has_next = True
+
+        self.next_cursor = encode_cursor(getattr(rows[-1], sort_key), getattr(rows[-1], id_key), 'next',
+                                         sort_key, order) if self.has_next and rows else None
+        self.prev_cursor = encode_cursor(getattr(rows[0], sort_key), getattr(rows[0], id_key), 'prev',
+                                         sort_key, order) if self.has_prev and rows else None
+        self.total = total() if callable(total) else total
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def to_dict(self, serialize):
+        return {
+            'items': [serialize(item) for item in self.items],
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+            'has_next': self.has_next,
+            'has_prev': self.has_prev,
+            'per_page': self.per_page,
+            'total': self.total,
+        }
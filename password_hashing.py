@@ -0,0 +1,197 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from flask import Response, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+# Workers forked from a threaded web process can inherit held locks; forkserver
+# forks them from a clean single-threaded server instead (spawn where unavailable)
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HashingPoolFull(RuntimeError):
+    pass
+
+
+def _hashpw(secret, rounds):
+    return bcrypt.hashpw(secret, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(secret, hashed):
+    return bcrypt.checkpw(secret, hashed)
+
+
+def _encode(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def hash_rounds(hashed):
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it is not one."""
+    try:
+        return int(_encode(hashed).split(b'$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a bounded process pool.
+
+    At most `workers` hashes run at once and `max_pending` more may wait;
+    beyond that calls raise HashingPoolFull instead of queueing, so a login
+    burst cannot tie up every web worker thread behind bcrypt. A call that
+    waits longer than `timeout` also raises HashingPoolFull; its slot stays
+    taken until the task is cancelled or finishes.
+    """
+
+    def __init__(self, workers=None, max_pending=None, rounds=DEFAULT_ROUNDS, timeout=10.0):
+        self._pool = None
+        self._lock = threading.Lock()
+        self.metrics = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0, 'timed_out': 0, 'pool_restarts': 0}
+        self.configure(workers, max_pending, rounds, timeout)
+
+    def configure(self, workers=None, max_pending=None, rounds=DEFAULT_ROUNDS, timeout=10.0):
+        self.shutdown()
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * 4 if max_pending is None else max_pending
+        self.rounds = rounds
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+    def _executor(self):
+        # Created lazily so the worker processes are started after a pre-fork server forks
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(START_METHOD))
+        return self._pool
+
+    def _discard(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self.metrics['pool_restarts'] += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def _run(self, fn, *args, retry=True):
+        if not self._slots.acquire(blocking=False):
+            self.metrics['rejected'] += 1
+            raise HashingPoolFull(f"Password hashing pool is saturated ({self.workers + self.max_pending} in flight)")
+        pool = self._executor()
+        future = None
+        try:
+            future = pool.submit(fn, *args)
+            # Released when the task ends, not when the caller stops waiting for it
+            future.add_done_callback(self._release_slot)
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError as e:
+            # Still queued: cancelling frees the slot now; running: bcrypt finishes and frees it
+            future.cancel()
+            self.metrics['timed_out'] += 1
+            raise HashingPoolFull(f"Password hashing did not finish within {self.timeout}s") from e
+        except BrokenProcessPool:
+            # A worker died (OOM killer, signal); every later submit would fail too
+            self._discard(pool)
+            if not retry:
+                raise
+            logger.warning("Password hashing pool broke, starting a new one")
+        finally:
+            if future is None:
+                self._slots.release()
+        return self._run(fn, *args, retry=False)
+
+    def hash(self, secret):
+        """bcrypt hash of `secret` at the configured cost factor."""
+        hashed = self._run(_hashpw, _encode(secret), self.rounds)
+        self.metrics['hashed'] += 1
+        return hashed
+
+    def verify(self, secret, hashed):
+        if not secret or not hashed:
+            return False
+        try:
+            matches = self._run(_checkpw, _encode(secret), _encode(hashed))
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+        self.metrics['verified'] += 1
+        return matches
+
+    def needs_rehash(self, hashed):
+        return hash_rounds(hashed) != self.rounds
+
+    def verify_and_update(self, principal, secret, attribute='password_hash'):
+        """Check `secret` against `principal.<attribute>`, rehashing it if the cost factor changed.
+
+        The caller commits; the new hash is only set on a successful check.
+        """
+        hashed = getattr(principal, attribute)
+        if not self.verify(secret, hashed):
+            return False
+        if self.needs_rehash(hashed):
+            try:
+                setattr(principal, attribute, self.hash(secret))
+                self.metrics['rehashed'] += 1
+            except HashingPoolFull:
+                # The check passed; upgrade on a later login instead
+                logger.info("Deferred rehash of %s: hashing pool is saturated", attribute)
+        return True
+
+    def stats(self):
+        stats = dict(self.metrics)
+        stats.update(workers=self.workers, max_pending=self.max_pending, rounds=self.rounds)
+        return stats
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
+
+
+def _saturated(error):
+    logger.warning("Rejected request: %s", error)
+    message = 'Too many sign-in requests are being processed, retry shortly'
+    if request.is_json or request.accept_mimetypes.best == 'application/json':
+        response = jsonify({'success': False, 'message': message})
+    else:
+        response = Response(message + '\n', mimetype='text/plain')
+    response.status_code = 429
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def init_password_hasher(app):
+    """Configure the shared hasher and answer HashingPoolFull with 429 Too Many Requests.
+
+    Settings: BCRYPT_ROUNDS (default 12), PASSWORD_HASH_WORKERS (default: CPU
+    count), PASSWORD_HASH_MAX_PENDING (default 4 per worker) and
+    PASSWORD_HASH_TIMEOUT (seconds, default 10).
+    """
+    password_hasher.configure(
+        workers=app.config.get('PASSWORD_HASH_WORKERS'),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING'),
+        rounds=app.config.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10.0),
+    )
+    app.register_error_handler(HashingPoolFull, _saturated)
+
+
+def hash_password(secret):
+    return password_hasher.hash(secret)
+
+
+def verify_password(secret, hashed):
+    return password_hasher.verify(secret, hashed)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from dashboard_stats import new_users_query, recent_users_query
+from extensions import db
+from data_tables import TABLES, flagged_transactions_query, transactions_query
+from flagging_worker import high_risk_batch_query
+from models import Transaction, User
+from pagination import encode_cursor, seek
+from read_state import newest_alerts_query, overridden_unread_alerts_query, unread_alerts_query
+from risk_stats import SCOPE_GLOBAL, SCOPE_USER, SCOPE_USERS, counter_query
+
+
+def admin_query_shapes(now=None):
+    """Named queries built by the same helpers the admin routes use, with representative arguments."""
+    now = now or datetime.utcnow()
+    per_page = 20
+
+    def page(query, sort_column, id_column, sort_value):
+        # A page past a cursor, as KeysetPage fetches it
+        cursor = encode_cursor(sort_value, 1000, 'next', sort_column.key, 'desc')
+        return seek(query, sort_column, id_column, cursor, per_page)[0]
+
+    transactions_table = TABLES['transactions']
+    return {
+        'dashboard.unread_alerts': unread_alerts_query(1, 1000),
+        'dashboard.unread_overrides': overridden_unread_alerts_query(1, 1000),
+        'dashboard.recent_alerts': newest_alerts_query(),
+        'dashboard.promoted_user_alerts': newest_alerts_query([1, 2, 3]),
+        'dashboard.recent_users': recent_users_query(),
+        'dashboard.new_users': new_users_query(now),
+        'flagged_transactions.keyset':
+            page(flagged_transactions_query(), Transaction.timestamp, Transaction.id, now),
+        'transaction_management.keyset': page(transactions_query(), Transaction.timestamp, Transaction.id, now),
+        'transaction_management.risk_level':
+            seek(transactions_query(risk_level='High'), Transaction.timestamp, Transaction.id, per_page=per_page)[0],
+        'transaction_management.user_id':
+            seek(transactions_query(user_id=1), Transaction.timestamp, Transaction.id, per_page=per_page)[0],
+        'transactions_table.amount':
+            page(transactions_table['query'](), transactions_table['sort_columns']['amount'], Transaction.id, 500.0),
+        'transactions_table.fraud_probability':
+            page(transactions_table['query'](), transactions_table['sort_columns']['fraud_probability'],
+                 Transaction.id, 0.5),
+        'user_management.keyset': page(User.query, User.created_at, User.id, now),
+        'flagging_worker.high_risk_batch': high_risk_batch_query(1000, 500),
+        'risk_counters.global': counter_query(SCOPE_GLOBAL, ''),
+        'risk_counters.users': counter_query(SCOPE_USER, ['1', '2']),
+        'risk_counters.user_total': counter_query(SCOPE_USERS, ''),
+    }
+
+
+def _plan_rows(statement):
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = {
+        key: str(value) if isinstance(value, datetime) else value
+        for key, value in compiled.params.items()
+    }
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if dialect.name == 'sqlite':
+        result = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row._mapping['detail'] for row in result]
+    result = connection.exec_driver_sql(f"EXPLAIN {compiled}", params)
+    return [dict(row._mapping) for row in result]
+
+
+def _is_full_scan(row):
+    if isinstance(row, str):
+        # SQLite: "SCAN transactions" / "SCAN TABLE transactions" without an index
+        return row.startswith('SCAN') and 'INDEX' not in row and 'CONSTANT ROW' not in row
+    # MySQL: access type ALL is a full table scan
+    return str(row.get('type', '')).upper() == 'ALL'
+
+
+def explain_admin_queries(now=None):
+    """Return [(name, plan_rows, full_scan)] for every admin query shape."""
+    results = []
+    for name, query in admin_query_shapes(now).items():
+        rows = _plan_rows(query.statement)
+        results.append((name, rows, any(_is_full_scan(row) for row in rows)))
+    return results
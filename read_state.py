@@ -0,0 +1,144 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Alert
+
+
+class AlertReadWatermark(db.Model):
+    """Every alert with id <= last_read_alert_id is read for this admin (unless overridden)."""
+    __tablename__ = 'alert_read_watermarks'
+
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id', ondelete='CASCADE'), primary_key=True)
+    last_read_alert_id = db.Column(db.Integer, nullable=False, default=0)
+    read_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class AlertReadOverride(db.Model):
+    """Sparse exceptions to the watermark: alerts read above it, or marked unread at or below it."""
+    __tablename__ = 'alert_read_overrides'
+
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id', ondelete='CASCADE'), primary_key=True)
+    alert_id = db.Column(db.Integer, db.ForeignKey('alerts.id', ondelete='CASCADE'), primary_key=True)
+    is_read = db.Column(db.Boolean, nullable=False)
+
+
+# Alert ids only grow, so the watermark is an id rather than a timestamp: alerts
+# inserted later with older timestamps (bulk scoring, backfills) still show up
+# as unread. Alert.is_read remains a global "resolved for everyone" flag.
+
+def watermark(admin_id):
+    return db.session.query(AlertReadWatermark.last_read_alert_id).filter_by(admin_id=admin_id).scalar() or 0
+
+
+def override_alert_ids(admin_id, is_read):
+    return sa.select(AlertReadOverride.alert_id).where(
+        AlertReadOverride.admin_id == admin_id, AlertReadOverride.is_read == is_read)
+
+
+def unread_alert_criteria(admin_id, last_read):
+    """Unread alerts above the watermark: a range scan on the alerts primary key."""
+    # Legacy alerts may have is_read NULL; they are not resolved
+    return (Alert.id > last_read, or_(Alert.is_read == False, Alert.is_read.is_(None)),
+            Alert.id.notin_(override_alert_ids(admin_id, True)))
+
+
+def _scoped(query, user_ids):
+    return query.filter(Alert.user_id.in_(user_ids)) if user_ids is not None else query
+
+
+def mark_all_read(admin_id):
+    """Move the admin's watermark to the newest alert: one row written, plus any overrides it supersedes.
+
+    The caller commits.
+    """
+    latest = db.session.query(func.max(Alert.id)).scalar() or 0
+    row = db.session.get(AlertReadWatermark, admin_id)
+    if row is None:
+        try:
+            with db.session.begin_nested():
+                row = AlertReadWatermark(admin_id=admin_id, last_read_alert_id=0)
+                db.session.add(row)
+        except IntegrityError:
+            # A concurrent first mark_all_read created the row; update that one
+            row = db.session.get(AlertReadWatermark, admin_id, populate_existing=True)
+    row.last_read_alert_id = max(row.last_read_alert_id or 0, latest)
+    row.read_at = datetime.utcnow()
+    AlertReadOverride.query.filter(AlertReadOverride.admin_id == admin_id,
+                                   AlertReadOverride.alert_id <= row.last_read_alert_id
+                                   ).delete(synchronize_session=False)
+    return row.last_read_alert_id
+
+
+def set_alert_read(admin_id, alert, is_read=True):
+    """Mark one alert read or unread for one admin, storing an override only where it differs from the default.
+
+    The caller commits.
+    """
+    default = alert.id <= watermark(admin_id) or bool(alert.is_read)
+    override = db.session.get(AlertReadOverride, (admin_id, alert.id))
+    if is_read == default:
+        if override is not None:
+            db.session.delete(override)
+    elif override is None:
+        db.session.add(AlertReadOverride(admin_id=admin_id, alert_id=alert.id, is_read=is_read))
+    else:
+        override.is_read = is_read
+
+
+def overridden_unread_criteria(admin_id, last_read):
+    """Alerts explicitly marked unread that unread_alert_criteria does not already cover.
+
+    That is those at or below the watermark, and resolved (is_read) ones above it.
+    """
+    return (Alert.id.in_(override_alert_ids(admin_id, False)),
+            or_(Alert.id <= last_read, Alert.is_read == True))
+
+
+def unread_count(admin_id, user_ids=None):
+    last_read = watermark(admin_id)
+    count = _scoped(db.session.query(func.count(Alert.id)).filter(*unread_alert_criteria(admin_id, last_read)),
+                    user_ids).scalar()
+    count += _scoped(db.session.query(func.count(Alert.id)).filter(*overridden_unread_criteria(admin_id, last_read)),
+                     user_ids).scalar()
+    return count
+
+
+def unread_alerts_query(admin_id, last_read, user_ids=None, limit=10):
+    return _scoped(Alert.query.filter(*unread_alert_criteria(admin_id, last_read)), user_ids) \
+        .order_by(Alert.timestamp.desc()).limit(limit)
+
+
+def overridden_unread_alerts_query(admin_id, last_read, user_ids=None, limit=10):
+    return _scoped(Alert.query.filter(*overridden_unread_criteria(admin_id, last_read)),
+                   user_ids).order_by(Alert.timestamp.desc()).limit(limit)
+
+
+def newest_alerts_query(user_ids=None, limit=10):
+    return _scoped(Alert.query, user_ids).order_by(Alert.timestamp.desc()).limit(limit)
+
+
+def recent_alerts_for(admin_id, user_ids=None, limit=10):
+    """Newest alerts for an admin, unread first, each with an `unread` attribute.
+
+    `user_ids` restricts the alerts to those users (None means all).
+    """
+    last_read = watermark(admin_id)
+    unread = unread_alerts_query(admin_id, last_read, user_ids, limit).all()
+    # Alerts explicitly marked unread below the watermark or after being resolved are rare
+    unread += overridden_unread_alerts_query(admin_id, last_read, user_ids, limit).all()
+    unread = sorted(unread, key=lambda alert: (alert.timestamp, alert.id), reverse=True)[:limit]
+
+    unread_ids = {alert.id for alert in unread}
+    alerts = list(unread)
+    if len(alerts) < limit:
+        # Fill with the newest read alerts
+        newest = newest_alerts_query(user_ids, limit - len(alerts) + len(unread_ids)).all()
+        alerts.extend(alert for alert in newest if alert.id not in unread_ids)
+        alerts = alerts[:limit]
+    for alert in alerts:
+        alert.unread = alert.id in unread_ids
+    return alerts
@@ -0,0 +1,208 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram, one series per label value."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_name):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {total}')
+                lines.append(f'{self.name}_count{{{label_name}="{label}"}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + 1
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                rendered = ','.join(f'{name}="{value_}"' for name, value_ in zip(label_names, labels))
+                lines.append(f"{self.name}{{{rendered}}} {value}")
+        return lines
+
+
+REQUESTS = Counter('admin_requests_total', 'Admin requests by endpoint and status code.')
+HISTOGRAMS = {
+    'wall': Histogram('admin_request_duration_seconds', 'Wall time per admin request.', TIME_BUCKETS),
+    'sql_count': Histogram('admin_request_sql_statements', 'SQL statements per admin request.', COUNT_BUCKETS),
+    'sql_time': Histogram('admin_request_sql_seconds', 'Total SQL time per admin request.', TIME_BUCKETS),
+    'template': Histogram('admin_request_template_seconds', 'Template render time per admin request.', TIME_BUCKETS),
+    'inference': Histogram('admin_request_inference_seconds', 'Model inference time per admin request.', TIME_BUCKETS),
+}
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'sql_count', 'sql_time', 'statements', 'template', 'inference',
+                 'template_started', 'capture_statements', 'status')
+
+    def __init__(self, capture_statements):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.statements = []
+        self.template = 0.0
+        self.inference = 0.0
+        self.template_started = None
+        self.capture_statements = capture_statements
+        self.status = None
+
+
+def _current():
+    return g.get('_request_metrics') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current() is not None:
+        conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current()
+    if metrics is None or not conn.info.get('_query_started'):
+        return
+    elapsed = time.perf_counter() - conn.info['_query_started'].pop()
+    metrics.sql_count += 1
+    metrics.sql_time += elapsed
+    if metrics.capture_statements:
+        metrics.statements.append((elapsed, statement))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so the next statement on this pooled connection is not timed from it
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('_query_started'):
+        conn.info['_query_started'].pop()
+
+
+def _before_render(sender, template, context, **extra):
+    metrics = _current()
+    if metrics is not None:
+        metrics.template_started = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    metrics = _current()
+    if metrics is not None and metrics.template_started is not None:
+        metrics.template += time.perf_counter() - metrics.template_started
+        metrics.template_started = None
+
+
+@contextmanager
+def timed_inference():
+    """Attribute the enclosed model call to the current request's inference time."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current()
+        if metrics is not None:
+            metrics.inference += time.perf_counter() - started
+
+
+def _start_request():
+    g._request_metrics = RequestMetrics(current_app.config.get('SLOW_REQUEST_MS') is not None)
+
+
+def _finish_request(response):
+    metrics = _current()
+    if metrics is not None:
+        metrics.status = response.status_code
+    return response
+
+
+def _record_request(exc):
+    # teardown_request runs even when the view raised and after_request did not
+    metrics = g.pop('_request_metrics', None)
+    if metrics is None:
+        return
+    wall = time.perf_counter() - metrics.started
+    endpoint = request.endpoint or 'unknown'
+    status = metrics.status if metrics.status is not None and exc is None else 500
+    REQUESTS.inc((endpoint, str(status)))
+    HISTOGRAMS['wall'].observe(endpoint, wall)
+    HISTOGRAMS['sql_count'].observe(endpoint, metrics.sql_count)
+    HISTOGRAMS['sql_time'].observe(endpoint, metrics.sql_time)
+    HISTOGRAMS['template'].observe(endpoint, metrics.template)
+    HISTOGRAMS['inference'].observe(endpoint, metrics.inference)
+
+    threshold = current_app.config.get('SLOW_REQUEST_MS')
+    if threshold is not None and wall * 1000.0 >= threshold:
+        top = sorted(metrics.statements, key=lambda item: item[0], reverse=True)[:5]
+        logger.warning(
+            "Slow request %s %s (%s, %s): %.1f ms, %s SQL statements in %.1f ms, "
+            "template %.1f ms, inference %.1f ms%s",
+            request.method, request.path, endpoint, status, wall * 1000.0,
+            metrics.sql_count, metrics.sql_time * 1000.0,
+            metrics.template * 1000.0, metrics.inference * 1000.0,
+            ''.join(f"\n    {elapsed * 1000.0:.1f} ms: {' '.join(statement.split())[:300]}"
+                    for elapsed, statement in top)
+        )
+
+
+def instrument_blueprint(blueprint):
+    """Record wall, SQL, template and inference time for every route of `blueprint`."""
+    blueprint.before_request(_start_request)
+    blueprint.after_request(_finish_request)
+    blueprint.teardown_request(_record_request)
+
+    @blueprint.record_once
+    def connect_template_signals(state):
+        before_render_template.connect(_before_render, state.app)
+        template_rendered.connect(_rendered, state.app)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = REQUESTS.render(('endpoint', 'status'))
+    for histogram in HISTOGRAMS.values():
+        lines.extend(histogram.render('endpoint'))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+logger = logging.getLogger(__name__)
+
+
+class LocalStore:
+    """In-process LRU with per-entry expiry and namespace generations."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """Cache store in a local SQLite file, shared by every worker process on the host.
+
+    Each thread keeps one connection, opened on first use and closed once the
+    thread has exited; close() closes them all.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        conn = self._connect()
+        # WAL is a property of the file, so it is set once rather than per connection
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_entries '
+                     '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_generations '
+                     '(namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)')
+
+    def _connect(self):
+        if self._pid != os.getpid():
+            # Forked worker: the parent's connections must not be used here
+            self._local = threading.local()
+            self._connections = {}
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                # Close the connections of threads that have exited
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            conn.close()
+        self._local = threading.local()
+
+    def get(self, key):
+        row = self._connect().execute('SELECT value, expires_at FROM cache_entries WHERE key = ?',
+                                      (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+                     (key, json.dumps(value), time.time() + ttl))
+        conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (time.time(),))
+
+    def generation(self, namespace):
+        row = self._connect().execute('SELECT generation FROM cache_generations WHERE namespace = ?',
+                                      (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace):
+        conn = self._connect()
+        conn.execute('INSERT OR IGNORE INTO cache_generations (namespace, generation) VALUES (?, 0)',
+                     (namespace,))
+        conn.execute('UPDATE cache_generations SET generation = generation + 1 WHERE namespace = ?',
+                     (namespace,))
+
+
+class ResponseCache:
+    """TTL + explicit-invalidation cache for JSON view responses.
+
+    Entries are keyed by namespace generation and request path, so
+    `invalidate(namespace)` drops every cached response of that namespace at
+    once. With RESPONSE_CACHE_PATH set, generations and entries live in a
+    shared SQLite file and the local LRU only fronts it.
+    """
+
+    def __init__(self):
+        self.ttl = 30
+        self.local = LocalStore()
+        self.shared = None
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        self.local = LocalStore(app.config.get('RESPONSE_CACHE_SIZE', 256))
+        path = app.config.get('RESPONSE_CACHE_PATH')
+        if self.shared is not None:
+            self.shared.close()
+        self.shared = SQLiteStore(path) if path else None
+
+    def _generation(self, namespace):
+        store = self.shared or self.local
+        try:
+            return store.generation(namespace)
+        except sqlite3.Error as e:
+            logger.warning("Shared response cache unavailable: %s", e)
+            return self.local.generation(namespace)
+
+    def _lookup(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except sqlite3.Error as e:
+                logger.warning("Shared response cache unavailable: %s", e)
+            if value is not None:
+                self.local.set(key, value, self.ttl)
+        return value
+
+    def _store(self, key, value):
+        self.local.set(key, value, self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.ttl)
+            except sqlite3.Error as e:
+                logger.warning("Shared response cache unavailable: %s", e)
+
+    def cached(self, namespace):
+        """Cache successful responses of a view under `namespace`."""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                key = f"{namespace}:{self._generation(namespace)}:{request.full_path}"
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return current_app.response_class(value['body'], status=200, mimetype=value['mimetype'])
+                self.misses += 1
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200:
+                    self._store(key, {'body': response.get_data(as_text=True), 'mimetype': response.mimetype})
+                return response
+            return decorated_function
+        return decorator
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.invalidations += 1
+            self.local.bump(namespace)
+            if self.shared is not None:
+                try:
+                    self.shared.bump(namespace)
+                except sqlite3.Error as e:
+                    logger.warning("Shared response cache unavailable: %s", e)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'local_entries': len(self.local),
+            'shared': self.shared is not None,
+            'ttl': self.ttl,
+        }
+
+
+response_cache = ResponseCache()
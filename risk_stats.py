@@ -0,0 +1,310 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import attributes
+
+from archival import TransactionRollup
+from extensions import db
+from models import Transaction, User
+
+# Counter scopes: one row per (scope, scope_key, risk_level, is_flagged)
+SCOPE_GLOBAL = 'global'
+SCOPE_MONTH = 'month'
+SCOPE_USER = 'user'
+# The registered-user total shares the table under its own scope
+SCOPE_USERS = 'users'
+USERS_KEY = (SCOPE_USERS, '', '', False)
+
+
+class RiskCounter(db.Model):
+    __tablename__ = 'risk_counters'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'scope_key', 'risk_level', 'is_flagged', name='uq_risk_counters_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(10), nullable=False)
+    scope_key = db.Column(db.String(20), nullable=False, default='')
+    risk_level = db.Column(db.String(20), nullable=False)
+    is_flagged = db.Column(db.Boolean, nullable=False, default=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+def month_key(timestamp):
+    return f"{timestamp.year:04d}-{timestamp.month:02d}" if timestamp else None
+
+
+def _counter_keys(user_id, timestamp, risk_level, is_flagged):
+    is_flagged = bool(is_flagged)
+    keys = [(SCOPE_GLOBAL, '', risk_level, is_flagged)]
+    if timestamp is not None:
+        keys.append((SCOPE_MONTH, month_key(timestamp), risk_level, is_flagged))
+    if user_id is not None:
+        keys.append((SCOPE_USER, str(user_id), risk_level, is_flagged))
+    return keys
+
+
+def _add(deltas, values, delta):
+    for key in _counter_keys(*values):
+        deltas[key] += delta
+
+
+def _old_value(txn, name):
+    history = attributes.get_history(txn, name)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(txn, name)
+
+
+TRACKED_COLUMNS = ('user_id', 'timestamp', 'risk_level', 'is_flagged')
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Assigning to an expired attribute (the usual state after a commit) records no
+# old value unless the attribute loads it first; without it the counter for the
+# previous key would never be decremented.
+for _name in TRACKED_COLUMNS:
+    event.listen(getattr(Transaction, _name), 'set', _load_previous_value, active_history=True)
+
+
+def _tracked_values(txn, old=False):
+    names = TRACKED_COLUMNS
+    if old:
+        return tuple(_old_value(txn, name) for name in names)
+    return tuple(getattr(txn, name) for name in names)
+
+
+def apply_deltas(connection, deltas):
+    """Add each delta to its counter row, creating missing rows."""
+    table = RiskCounter.__table__
+    for (scope, scope_key, risk_level, is_flagged), delta in deltas.items():
+        if not delta:
+            continue
+        criteria = (
+            (table.c.scope == scope) &
+            (table.c.scope_key == scope_key) &
+            (table.c.risk_level == risk_level) &
+            (table.c.is_flagged == is_flagged)
+        )
+        result = connection.execute(table.update().where(criteria).values(count=table.c.count + delta))
+        if result.rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(
+                    scope=scope, scope_key=scope_key, risk_level=risk_level,
+                    is_flagged=is_flagged, count=delta))
+        except IntegrityError:
+            # Another worker created the row first
+            connection.execute(table.update().where(criteria).values(count=table.c.count + delta))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_transaction_changes(session, flush_context):
+    deltas = defaultdict(int)
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _add(deltas, _tracked_values(obj), 1)
+        elif isinstance(obj, User):
+            deltas[USERS_KEY] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            _add(deltas, _tracked_values(obj, old=True), -1)
+        elif isinstance(obj, User):
+            deltas[USERS_KEY] -= 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction) or not session.is_modified(obj, include_collections=False):
+            continue
+        old_values = _tracked_values(obj, old=True)
+        new_values = _tracked_values(obj)
+        if _counter_keys(*old_values) == _counter_keys(*new_values):
+            continue
+        _add(deltas, old_values, -1)
+        _add(deltas, new_values, 1)
+
+    if any(deltas.values()):
+        apply_deltas(session.connection(), deltas)
+
+
+def record_bulk_flag_change(criteria, is_flagged):
+    """Adjust counters for a bulk UPDATE setting is_flagged on rows matching `criteria`.
+
+    Must run before the UPDATE itself, in the same transaction.
+    """
+    if is_flagged:
+        changing = (Transaction.is_flagged == False) | Transaction.is_flagged.is_(None)
+    else:
+        changing = Transaction.is_flagged == True
+
+    year = func.extract('year', Transaction.timestamp)
+    month = func.extract('month', Transaction.timestamp)
+    rows = db.session.query(
+        Transaction.user_id, year, month, Transaction.risk_level, func.count(Transaction.id)
+    ).filter(*criteria).filter(changing).group_by(
+        Transaction.user_id, year, month, Transaction.risk_level
+    ).all()
+
+    deltas = defaultdict(int)
+    for user_id, row_year, row_month, risk_level, count in rows:
+        month_start = datetime(int(row_year), int(row_month), 1)
+        _add(deltas, (user_id, month_start, risk_level, not is_flagged), -count)
+        _add(deltas, (user_id, month_start, risk_level, is_flagged), count)
+    apply_deltas(db.session.connection(), deltas)
+
+
+def record_bulk_delete(criteria):
+    """Adjust counters for a bulk DELETE of the transactions matching `criteria`.
+
+    Must run before the DELETE itself, in the same transaction.
+    """
+    year = func.extract('year', Transaction.timestamp)
+    month = func.extract('month', Transaction.timestamp)
+    rows = db.session.query(
+        Transaction.user_id, year, month, Transaction.risk_level, Transaction.is_flagged, func.count(Transaction.id)
+    ).filter(*criteria).group_by(
+        Transaction.user_id, year, month, Transaction.risk_level, Transaction.is_flagged
+    ).all()
+
+    deltas = defaultdict(int)
+    for user_id, row_year, row_month, risk_level, is_flagged, count in rows:
+        _add(deltas, (user_id, datetime(int(row_year), int(row_month), 1), risk_level, is_flagged), -count)
+    apply_deltas(db.session.connection(), deltas)
+
+
+def record_inserted_rows(rows):
+    """Adjust counters for transaction dicts written with a bulk INSERT (which skips flush events)."""
+    deltas = defaultdict(int)
+    for row in rows:
+        _add(deltas, (row['user_id'], row['timestamp'], row['risk_level'], row.get('is_flagged')), 1)
+    apply_deltas(db.session.connection(), deltas)
+
+
+def reconcile_counters():
+    """Rebuild every counter row from the transactions table, the rollups of archived ones and the users table."""
+    year = func.extract('year', Transaction.timestamp)
+    month = func.extract('month', Transaction.timestamp)
+    counts = func.count(Transaction.id)
+    rows = []
+
+    for risk_level, is_flagged, count in db.session.query(
+            Transaction.risk_level, Transaction.is_flagged, counts
+    ).group_by(Transaction.risk_level, Transaction.is_flagged):
+        rows.append((SCOPE_GLOBAL, '', risk_level, is_flagged, count))
+
+    for row_year, row_month, risk_level, is_flagged, count in db.session.query(
+            year, month, Transaction.risk_level, Transaction.is_flagged, counts
+    ).group_by(year, month, Transaction.risk_level, Transaction.is_flagged):
+        rows.append((SCOPE_MONTH, f"{int(row_year):04d}-{int(row_month):02d}", risk_level, is_flagged, count))
+
+    for user_id, risk_level, is_flagged, count in db.session.query(
+            Transaction.user_id, Transaction.risk_level, Transaction.is_flagged, counts
+    ).group_by(Transaction.user_id, Transaction.risk_level, Transaction.is_flagged):
+        rows.append((SCOPE_USER, str(user_id), risk_level, is_flagged, count))
+
+    rollup_year = func.extract('year', TransactionRollup.day)
+    rollup_month = func.extract('month', TransactionRollup.day)
+    for user_id, row_year, row_month, risk_level, is_flagged, count in db.session.query(
+            TransactionRollup.user_id, rollup_year, rollup_month, TransactionRollup.risk_level,
+            TransactionRollup.is_flagged, func.sum(TransactionRollup.count)
+    ).group_by(TransactionRollup.user_id, rollup_year, rollup_month,
+               TransactionRollup.risk_level, TransactionRollup.is_flagged):
+        rows.append((SCOPE_GLOBAL, '', risk_level, is_flagged, count))
+        rows.append((SCOPE_MONTH, f"{int(row_year):04d}-{int(row_month):02d}", risk_level, is_flagged, count))
+        rows.append((SCOPE_USER, str(user_id), risk_level, is_flagged, count))
+
+    # NULL and False flags group separately, so merge them before inserting
+    merged = defaultdict(int)
+    for scope, scope_key, risk_level, is_flagged, count in rows:
+        merged[(scope, scope_key, risk_level, bool(is_flagged))] += count
+    merged[USERS_KEY] = db.session.query(func.count(User.id)).scalar()
+
+    db.session.execute(RiskCounter.__table__.delete())
+    if merged:
+        db.session.execute(RiskCounter.__table__.insert(), [
+            {'scope': scope, 'scope_key': scope_key, 'risk_level': risk_level,
+             'is_flagged': is_flagged, 'count': count}
+            for (scope, scope_key, risk_level, is_flagged), count in merged.items()
+        ])
+    db.session.commit()
+    return len(merged)
+
+
+def counter_query(scope, scope_keys=None):
+    """Counter rows of one scope, optionally for one scope key or a list of them."""
+    query = db.session.query(
+        RiskCounter.scope_key, RiskCounter.risk_level, RiskCounter.is_flagged, RiskCounter.count
+    ).filter(RiskCounter.scope == scope)
+    if isinstance(scope_keys, str):
+        query = query.filter(RiskCounter.scope_key == scope_keys)
+    elif scope_keys is not None:
+        query = query.filter(RiskCounter.scope_key.in_(scope_keys))
+    return query
+
+
+def _read(scope, scope_keys=None):
+    return counter_query(scope, scope_keys).all()
+
+
+def _empty_totals():
+    return {
+        'total_transactions': 0,
+        'flagged_transactions': 0,
+        'high_risk': 0,
+        'medium_risk': 0,
+        'low_risk': 0,
+    }
+
+
+def _accumulate(totals, risk_level, is_flagged, count):
+    totals['total_transactions'] += count
+    if is_flagged:
+        totals['flagged_transactions'] += count
+    key = f"{(risk_level or '').lower()}_risk"
+    if key in totals:
+        totals[key] += count
+
+
+def get_user_count():
+    return db.session.query(RiskCounter.count).filter(
+        RiskCounter.scope == SCOPE_USERS, RiskCounter.scope_key == '').scalar() or 0
+
+
+def get_global_totals():
+    totals = _empty_totals()
+    for _, risk_level, is_flagged, count in _read(SCOPE_GLOBAL, ''):
+        _accumulate(totals, risk_level, is_flagged, count)
+    return totals
+
+
+def get_user_totals(user_ids=None):
+    """Map user_id -> totals dict for the given users, or for every user with transactions."""
+    if user_ids is None:
+        totals = defaultdict(_empty_totals)
+        rows = _read(SCOPE_USER)
+    else:
+        user_ids = list(user_ids)
+        totals = {user_id: _empty_totals() for user_id in user_ids}
+        if not user_ids:
+            return totals
+        rows = _read(SCOPE_USER, [str(user_id) for user_id in user_ids])
+    for scope_key, risk_level, is_flagged, count in rows:
+        _accumulate(totals[int(scope_key)], risk_level, is_flagged, count)
+    return dict(totals)
+
+
+def get_monthly_counts(year):
+    monthly_transactions = [0] * 12
+    keys = [f"{year:04d}-{month:02d}" for month in range(1, 13)]
+    for scope_key, _, _, count in _read(SCOPE_MONTH, keys):
+        monthly_transactions[int(scope_key[5:]) - 1] += count
+    return monthly_transactions
@@ -0,0 +1,340 @@
+import functools
+import hashlib
+import logging
+import numbers
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model', 'project_model1.h5')
+N_FEATURES = 10
+
+
+class ScoringQueueFull(RuntimeError):
+    pass
+
+
+def risk_level_for(probability):
+    """Map a fraud probability to the risk levels used across the app (see view.html)."""
+    if probability < 0.3:
+        return 'Low'
+    if probability < 0.7:
+        return 'Medium'
+    return 'High'
+
+
+@functools.lru_cache(maxsize=8)
+def _file_digest(path, mtime, size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def model_version(path=MODEL_PATH):
+    """Short content hash of the model file; re-hashed only when the file changes."""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+def load_numpy_predict(path=MODEL_PATH):
+    """Load the model weights into the NumPy engine and return a batch predict function."""
+    from numpy_model import load_numpy_model
+
+    return load_numpy_model(path).predict
+
+
+def load_keras_predict(path=MODEL_PATH):
+    """Load the model with TensorFlow and return a batch predict function (training/parity only)."""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(path)
+
+    def predict(batch):
+        return model.predict(batch, verbose=0).reshape(-1)
+    return predict
+
+
+class ScoreCache:
+    """LRU of (probability, risk_level) keyed by the normalised feature row.
+
+    Repeat payments produce the same feature row, so their scores are served
+    without inference. Entries expire after `ttl` seconds and are all dropped
+    when a new model version is loaded; lookups and results from any other
+    version bypass the cache.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600.0, decimals=6):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, row):
+        # Rounding absorbs float noise from feature extraction; + 0.0 folds -0.0 into 0.0
+        return (np.round(row, self.decimals) + 0.0).astype(np.float32).tobytes()
+
+    def set_version(self, version):
+        """Switch to a newly loaded model, dropping every score from the previous one."""
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                    logger.info("Model version changed (%s -> %s), dropping %s cached scores",
+                                self.version, version, len(self._entries))
+                self._entries.clear()
+                self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key) if version == self.version else None
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, result):
+        with self._lock:
+            if version != self.version:
+                # Scored by a model that has since been replaced
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'model_version': self.version,
+            }
+
+
+class BatchScorer:
+    """Queue concurrent scoring requests and run them through one batched predict.
+
+    A batch is dispatched when `max_batch_size` requests are waiting or when
+    the oldest waiting request has waited `max_wait_ms`, whichever is first.
+    Each caller gets back its own (probability, risk_level). With a `cache`,
+    score() answers repeated rows from it and only queues the misses.
+    """
+
+    def __init__(self, predict, max_batch_size=64, max_wait_ms=5, max_queue_depth=10000,
+                 cache=None, model_version=None):
+        self.predict = predict
+        self.cache = cache
+        self.model_version = model_version
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.metrics = {
+            'requests': 0,
+            'batches': 0,
+            'rejected': 0,
+            'errors': 0,
+            'max_queue_depth_seen': 0,
+            'max_batch_size_seen': 0,
+            'inference_seconds': 0.0,
+        }
+
+    def _ensure_worker(self):
+        # Started lazily so the thread is created after a pre-fork server forks
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='batch-scorer', daemon=True)
+                    self._thread.start()
+
+    @staticmethod
+    def _row(features):
+        """One feature row as float32; ValueError unless it is N_FEATURES finite real numbers."""
+        if isinstance(features, np.ndarray):
+            if not np.issubdtype(features.dtype, np.number) or np.issubdtype(features.dtype, np.complexfloating):
+                raise ValueError("Features must be real numbers")
+        else:
+            try:
+                values = list(features)
+            except TypeError:
+                raise ValueError("Features must be a list of numbers") from None
+            # numbers.Real also admits bool; null, strings and objects are rejected here
+            if not all(isinstance(value, numbers.Real) and not isinstance(value, bool) for value in values):
+                raise ValueError("Features must be real numbers")
+            features = values
+        row = np.asarray(features, dtype=np.float32).reshape(-1)
+        if row.shape[0] != N_FEATURES:
+            raise ValueError(f"Expected {N_FEATURES} features, got {row.shape[0]}")
+        if not np.isfinite(row).all():
+            raise ValueError("Features must be finite numbers")
+        return row
+
+    def submit(self, features):
+        """Queue one feature row; returns a Future resolving to (probability, risk_level)."""
+        return self._enqueue(self._row(features))
+
+    def _enqueue(self, row):
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            self.metrics['rejected'] += 1
+            raise ScoringQueueFull(f"Scoring queue is full ({self.max_queue_depth} pending)")
+        depth = self._queue.qsize()
+        if depth > self.metrics['max_queue_depth_seen']:
+            self.metrics['max_queue_depth_seen'] = depth
+        return future
+
+    def score(self, features, timeout=10.0):
+        if self.cache is None:
+            return self.submit(features).result(timeout=timeout)
+        row = self._row(features)
+        key = self.cache.key(row)
+        result = self.cache.get(key, self.model_version)
+        if result is None:
+            result = self._enqueue(row).result(timeout=timeout)
+            self.cache.put(key, self.model_version, result)
+        return result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = np.stack([row for row, _ in batch])
+            started = time.perf_counter()
+            try:
+                probabilities = self.predict(rows)
+            except Exception as e:
+                self.metrics['errors'] += 1
+                logger.error("Batch scoring failed: %s", e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.metrics['inference_seconds'] += time.perf_counter() - started
+            self.metrics['batches'] += 1
+            self.metrics['requests'] += len(batch)
+            if len(batch) > self.metrics['max_batch_size_seen']:
+                self.metrics['max_batch_size_seen'] = len(batch)
+            for (_, future), probability in zip(batch, probabilities):
+                probability = float(probability)
+                future.set_result((probability, risk_level_for(probability)))
+
+    def stats(self):
+        stats = dict(self.metrics)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['mean_batch_size'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000.0
+        stats['max_queue_depth'] = self.max_queue_depth
+        stats['inference_seconds'] = round(stats['inference_seconds'], 6)
+        stats['model_version'] = self.model_version
+        stats['cache'] = self.cache.stats() if self.cache is not None else None
+        return stats
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+_score_cache = None
+
+
+def _current_version(path):
+    try:
+        return model_version(path)
+    except OSError:
+        # Keep serving the loaded model if the file is briefly missing during a deploy
+        return _scorer.model_version if _scorer is not None else None
+
+
+def get_scorer(config=None):
+    """Per-process BatchScorer; the model is loaded on first use and reloaded when its file changes.
+
+    Set SCORE_CACHE_SIZE (default 10000, 0 disables) and SCORE_CACHE_TTL
+    (seconds, default 3600) to bound the score cache.
+    """
+    global _scorer, _score_cache
+    config = config or {}
+    path = config.get('MODEL_PATH', MODEL_PATH)
+    version = _current_version(path)
+    if _scorer is None or _scorer.model_version != version:
+        with _scorer_lock:
+            if _scorer is None or _scorer.model_version != version:
+                if _scorer is not None:
+                    logger.info("Reloading model %s (version %s -> %s)", path, _scorer.model_version, version)
+                if _score_cache is None and config.get('SCORE_CACHE_SIZE', 10000):
+                    _score_cache = ScoreCache(config.get('SCORE_CACHE_SIZE', 10000),
+                                              config.get('SCORE_CACHE_TTL', 3600.0))
+                if _score_cache is not None:
+                    _score_cache.set_version(version)
+                loader = load_keras_predict if config.get('SCORING_BACKEND') == 'keras' else load_numpy_predict
+                _scorer = BatchScorer(
+                    loader(path),
+                    max_batch_size=config.get('SCORING_MAX_BATCH_SIZE', 64),
+                    max_wait_ms=config.get('SCORING_MAX_WAIT_MS', 5),
+                    max_queue_depth=config.get('SCORING_MAX_QUEUE_DEPTH', 10000),
+                    cache=_score_cache,
+                    model_version=version,
+                )
+    return _scorer
+
+
+def check_parity(path=MODEL_PATH, samples=1000, seed=0):
+    """Largest absolute difference between the NumPy engine and Keras on random inputs."""
+    rng = np.random.default_rng(seed)
+    batch = rng.normal(0.0, 1.0, size=(samples, N_FEATURES)).astype(np.float32)
+    batch[: samples // 4] *= 100.0
+    numpy_predict = load_numpy_predict(path)
+    keras_predict = load_keras_predict(path)
+    return float(np.max(np.abs(numpy_predict(batch) - keras_predict(batch))))
+
+
+def score_features(features, config=None):
+    """Score one 10-feature row through the shared batch scorer (and its score cache)."""
+    return get_scorer(config).score(features)
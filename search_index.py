@@ -0,0 +1,244 @@
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event, text
+
+from extensions import db
+from models import Transaction, User
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_LENGTH = 3
+MAX_PER_PAGE = 100
+
+# Searchable columns per scope; the FTS5 tables / FULLTEXT indexes are created
+# by migration 6b0e4d9f2a31 with the same column lists.
+SCOPES = {
+    'users': {'model': User, 'table': 'users', 'fts': 'users_fts', 'columns': ('username', 'email')},
+    'transactions': {'model': Transaction, 'table': 'transactions', 'fts': 'transactions_fts',
+                     'columns': ('recipient_upi', 'sender_upi', 'description')},
+}
+
+
+class SearchError(ValueError):
+    pass
+
+
+def _trigrams(value):
+    value = (value or '').lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class NgramIndex:
+    """In-process trigram index for databases without FTS5 / FULLTEXT.
+
+    Built from the table on first use; flushes of the model keep it current
+    (applied on commit) and rows inserted outside the ORM are picked up by
+    id on the next search. Trigram hits are checked against the rows before
+    they are returned, which drops false positives and prunes ids whose rows
+    were deleted or archived outside the ORM.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.postings = defaultdict(set)
+        self.documents = {}
+        self.last_id = 0
+        self.built = False
+        self._lock = threading.Lock()
+
+    def _grams(self, row):
+        grams = set()
+        for column in SCOPES[self.scope]['columns']:
+            grams |= _trigrams(getattr(row, column))
+        return grams
+
+    def add(self, row_id, grams):
+        self.remove(row_id)
+        self.documents[row_id] = grams
+        for gram in grams:
+            self.postings[gram].add(row_id)
+        if row_id > self.last_id:
+            self.last_id = row_id
+
+    def remove(self, row_id):
+        for gram in self.documents.pop(row_id, ()):
+            self.postings[gram].discard(row_id)
+
+    def catch_up(self, batch_size=5000):
+        model = SCOPES[self.scope]['model']
+        columns = [getattr(model, column) for column in SCOPES[self.scope]['columns']]
+        while True:
+            rows = db.session.query(model.id, *columns).filter(
+                model.id > self.last_id).order_by(model.id).limit(batch_size).all()
+            with self._lock:
+                for row in rows:
+                    self.add(row.id, self._grams(row))
+            if len(rows) < batch_size:
+                break
+        self.built = True
+
+    def apply(self, upserts, deletes):
+        with self._lock:
+            for row_id, grams in upserts:
+                self.add(row_id, grams)
+            for row_id in deletes:
+                self.remove(row_id)
+
+    def _verified(self, candidates, words, wanted):
+        """The first `wanted` candidates whose current column values contain every word."""
+        model = SCOPES[self.scope]['model']
+        names = SCOPES[self.scope]['columns']
+        columns = [getattr(model, name) for name in names]
+        batch_size = min(max(2 * wanted, 100), 1000)
+        matches = []
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates[start:start + batch_size]
+            rows = {row.id: row for row in db.session.query(model.id, *columns).filter(model.id.in_(chunk))}
+            with self._lock:
+                for row_id in chunk:
+                    row = rows.get(row_id)
+                    if row is None:
+                        self.remove(row_id)
+                        continue
+                    values = [(getattr(row, name) or '').lower() for name in names]
+                    if all(any(word in value for value in values) for word in words):
+                        matches.append(row_id)
+                        if len(matches) == wanted:
+                            return matches
+                    else:
+                        # A trigram false positive, or a row updated outside the ORM
+                        grams = self._grams(row)
+                        if grams != self.documents.get(row_id):
+                            self.add(row_id, grams)
+        return matches
+
+    def search(self, term, limit, offset):
+        self.catch_up()
+        query_grams = _trigrams(term)
+        with self._lock:
+            postings = sorted((self.postings.get(gram, set()) for gram in query_grams), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+            # Shorter documents containing every trigram of the term rank first
+            ranked = sorted(candidates, key=lambda row_id: (-len(query_grams) / len(self.documents[row_id]), -row_id))
+        return self._verified(ranked, term.lower().split(), offset + limit)[offset:offset + limit]
+
+
+_ngram_indexes = {scope: NgramIndex(scope) for scope in SCOPES}
+_fts_available = {}
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_search_changes(session, flush_context):
+    pending = session.info.setdefault('search_index_changes', [])
+    for scope, config in SCOPES.items():
+        index = _ngram_indexes[scope]
+        if not index.built:
+            continue
+        model = config['model']
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, model):
+                pending.append((scope, 'upsert', obj.id, index._grams(obj)))
+        for obj in session.deleted:
+            if isinstance(obj, model):
+                pending.append((scope, 'delete', obj.id, None))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_search_changes(session):
+    changes = session.info.pop('search_index_changes', ())
+    for scope in SCOPES:
+        upserts = [(row_id, grams) for s, kind, row_id, grams in changes if s == scope and kind == 'upsert']
+        deletes = [row_id for s, kind, row_id, grams in changes if s == scope and kind == 'delete']
+        if upserts or deletes:
+            _ngram_indexes[scope].apply(upserts, deletes)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_search_changes(session, previous_transaction):
+    session.info.pop('search_index_changes', None)
+
+
+def search_backend():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        if 'sqlite' not in _fts_available:
+            _fts_available['sqlite'] = db.session.execute(text(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'")).scalar() > 0
+        return 'fts5' if _fts_available['sqlite'] else 'ngram'
+    if dialect in ('mysql', 'mariadb'):
+        return 'fulltext'
+    return 'ngram'
+
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _search_ids(scope, term, limit, offset):
+    config = SCOPES[scope]
+    backend = search_backend()
+    if backend == 'fts5':
+        rows = db.session.execute(text(
+            f"SELECT rowid FROM {config['fts']} WHERE {config['fts']} MATCH :query "
+            f"ORDER BY bm25({config['fts']}), rowid DESC LIMIT :limit OFFSET :offset"
+        ), {'query': ' AND '.join(_phrase(word) for word in term.split()), 'limit': limit, 'offset': offset})
+        return [row_id for (row_id,) in rows]
+    if backend == 'fulltext':
+        match = f"MATCH({', '.join(config['columns'])}) AGAINST (:query IN BOOLEAN MODE)"
+        rows = db.session.execute(text(
+            f"SELECT id FROM {config['table']} WHERE {match} ORDER BY {match} DESC, id DESC "
+            f"LIMIT :limit OFFSET :offset"
+        ), {'query': ' '.join('+' + _phrase(word) for word in term.split()), 'limit': limit, 'offset': offset})
+        return [row_id for (row_id,) in rows]
+    return _ngram_indexes[scope].search(term, limit, offset)
+
+
+def _validate(scope, term):
+    if scope not in SCOPES:
+        raise SearchError(f"Unknown search scope: {scope}")
+    term = (term or '').strip()
+    if len(term) < MIN_TERM_LENGTH or any(len(word) < MIN_TERM_LENGTH for word in term.split()):
+        raise SearchError(f"Search terms must be at least {MIN_TERM_LENGTH} characters")
+    return term
+
+
+def search_ids(scope, term, limit=1000):
+    """Ids of the best `limit` matches for `term`, best first."""
+    return _search_ids(scope, _validate(scope, term), limit, 0)
+
+
+def search(scope, term, page=1, per_page=20):
+    """One page of ranked matches: {'items': [model instances], 'page', 'per_page', 'has_next', 'backend'}."""
+    term = _validate(scope, term)
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    ids = _search_ids(scope, term, per_page + 1, (page - 1) * per_page)
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+
+    model = SCOPES[scope]['model']
+    rows = {row.id: row for row in model.query.filter(model.id.in_(ids))} if ids else {}
+    return {
+        'items': [rows[row_id] for row_id in ids if row_id in rows],
+        'page': page,
+        'per_page': per_page,
+        'has_next': has_next,
+        'has_prev': page > 1,
+        'backend': search_backend(),
+    }
+
+
+def rebuild_search_index():
+    """Rebuild the FTS5 tables from their content tables, or reload the in-process index."""
+    backend = search_backend()
+    if backend == 'fts5':
+        for config in SCOPES.values():
+            db.session.execute(text(f"INSERT INTO {config['fts']}({config['fts']}) VALUES ('rebuild')"))
+        db.session.commit()
+    elif backend == 'ngram':
+        for scope in SCOPES:
+            _ngram_indexes[scope] = NgramIndex(scope)
+            _ngram_indexes[scope].catch_up()
+    return backend
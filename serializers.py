@@ -0,0 +1,32 @@
+def _format_timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else None
+
+
+def serialize_transaction(txn):
+    return {
+        'id': txn.id,
+        'transaction_id': txn.transaction_id,
+        'user_id': txn.user_id,
+        'amount': txn.amount,
+        'recipient_upi': txn.recipient_upi,
+        'sender_upi': txn.sender_upi,
+        'timestamp': _format_timestamp(txn.timestamp),
+        'fraud_probability': txn.fraud_probability,
+        'risk_level': txn.risk_level,
+        'status': txn.status,
+        'description': txn.description,
+        'is_flagged': bool(txn.is_flagged),
+    }
+
+
+def serialize_user(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'created_at': _format_timestamp(user.created_at),
+        'last_login': _format_timestamp(user.last_login),
+        'transaction_count': getattr(user, 'transaction_count', None),
+        'risk_profile': getattr(user, 'risk_profile', None),
+        'promoted_by_id': user.promoted_by_id,
+    }
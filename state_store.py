@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+
+from extensions import db
+
+
+class AppState(db.Model):
+    __tablename__ = 'app_state'
+
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def get_state(key, default=None):
+    """Return the JSON-decoded value stored under `key`, or `default`."""
+    entry = db.session.get(AppState, key)
+    if entry is None:
+        return default
+    return json.loads(entry.value)
+
+
+def set_state(key, value):
+    """Store `value` JSON-encoded under `key`. The caller commits."""
+    entry = db.session.get(AppState, key)
+    if entry is None:
+        entry = AppState(key=key, value=json.dumps(value))
+        db.session.add(entry)
+    else:
+        entry.value = json.dumps(value)
+        entry.updated_at = datetime.utcnow()
+    return entry
@@ -1,41 +1,181 @@
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+// Swap the trailing 0 of a url_for(..., id=0) URL for a real id
+function urlFor(template, id) {
+    return template.replace(/0$/, id);
+}
+
+const tableRowRenderers = {
+    flagged(txn, table) {
+        const risk = txn.risk_level === 'High' ? 'high' : txn.risk_level === 'Medium' ? 'medium' : 'low';
+        return `
+            <tr class="risk-${risk}">
+                <td class="txn-id">${escapeHtml(txn.transaction_id.slice(0, 8))}...</td>
+                <td>${escapeHtml(txn.username)}</td>
+                <td class="txn-amount">₹${escapeHtml(txn.amount)}</td>
+                <td class="txn-recipient">${escapeHtml(txn.recipient_upi)}</td>
+                <td><span class="risk-badge ${risk}">${escapeHtml(txn.risk_level)}</span></td>
+                <td class="txn-timestamp">${escapeHtml(txn.timestamp)}</td>
+                <td class="flagged-actions admin-actions">
+                    <div class="btn-group">
+                        <form method="POST" action="${urlFor(table.dataset.unflagUrl, txn.id)}" class="d-inline">
+                            <button type="submit" class="btn btn-sm btn-outline-success">
+                                <i class="fas fa-check me-1"></i> Unflag
+                            </button>
+                        </form>
+                        <form method="POST" action="${urlFor(table.dataset.deleteUrl, txn.id)}" class="d-inline">
+                            <button type="submit" class="btn btn-sm btn-outline-danger">
+                                <i class="fas fa-trash me-1"></i> Delete
+                            </button>
+                        </form>
+                    </div>
+                </td>
+            </tr>`;
+    },
+    users(user, table) {
+        const promote = table.dataset.canPromote === 'true' && !user.promoted_by_id ? `
+            <form method="POST" action="${urlFor(table.dataset.promoteUrl, user.id)}" class="d-inline ms-1">
+                <button type="submit" class="btn btn-sm btn-outline-primary">
+                    <i class="fas fa-user-shield me-1"></i> Promote
+                </button>
+            </form>` : '';
+        return `
+            <tr>
+                <td>${escapeHtml(user.username)}</td>
+                <td>${escapeHtml(user.email)}</td>
+                <td>${escapeHtml(user.created_at)}</td>
+                <td>${escapeHtml(user.transaction_count ?? 0)}</td>
+                <td>
+                    <div class="btn-group admin-actions">
+                        <form method="POST" action="${urlFor(table.dataset.deleteUrl, user.id)}"
+                              onsubmit="return confirm('Are you sure you want to delete this user?');">
+                            <button type="submit" class="btn btn-sm btn-outline-danger">
+                                <i class="fas fa-trash me-1"></i> Delete
+                            </button>
+                        </form>${promote}
+                        <button class="btn btn-sm btn-outline-info ms-1 view-security-btn"
+                                data-user-id="${user.id}" title="View security details">
+                            <i class="fas fa-lock me-1"></i> Security
+                        </button>
+                    </div>
+                </td>
+            </tr>`;
+    }
+};
+
+// Dashboard tables fetch one server-sorted page at a time from /admin/tables/<name>
+function initDataTable(table) {
+    const tbody = table.querySelector('tbody');
+    const columns = table.querySelectorAll('thead th').length;
+    const render = tableRowRenderers[table.dataset.tableRows];
+    const state = { sort: null, order: 'desc', cursor: null };
+
+    const pager = document.createElement('nav');
+    pager.setAttribute('aria-label', 'Table pagination');
+    pager.innerHTML = `
+        <ul class="pagination justify-content-center mt-3">
+            <li class="page-item disabled"><a class="page-link" href="#" data-page="prev">Previous</a></li>
+            <li class="page-item disabled"><a class="page-link" href="#" data-page="next">Next</a></li>
+        </ul>`;
+    table.closest('.table-responsive').after(pager);
+    let cursors = { prev: null, next: null };
+
+    async function load() {
+        const params = new URLSearchParams({ per_page: table.dataset.perPage || 10, order: state.order });
+        if (state.sort) params.set('sort', state.sort);
+        if (state.cursor) params.set('cursor', state.cursor);
+        try {
+            const response = await fetch(`${table.dataset.tableUrl}?${params}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const data = await response.json();
+            tbody.innerHTML = data.items.length
+                ? data.items.map(item => render(item, table)).join('')
+                : `<tr><td colspan="${columns}" class="text-center py-4 text-muted">Nothing to display</td></tr>`;
+            cursors = { prev: data.prev_cursor, next: data.next_cursor };
+            pager.querySelector('[data-page="prev"]').parentElement.classList.toggle('disabled', !data.has_prev);
+            pager.querySelector('[data-page="next"]').parentElement.classList.toggle('disabled', !data.has_next);
+        } catch (error) {
+            console.error('Error loading table:', error);
+            tbody.innerHTML = `<tr><td colspan="${columns}" class="text-center py-4 text-danger">Failed to load data</td></tr>`;
+        }
+    }
+
+    pager.addEventListener('click', event => {
+        const link = event.target.closest('[data-page]');
+        if (!link) return;
+        event.preventDefault();
+        const cursor = cursors[link.dataset.page];
+        if (!cursor) return;
+        state.cursor = cursor;
+        load();
+    });
+
+    table.querySelectorAll('th[data-sort]').forEach(header => {
+        header.style.cursor = 'pointer';
+        header.addEventListener('click', () => {
+            if (state.sort === header.dataset.sort) {
+                state.order = state.order === 'desc' ? 'asc' : 'desc';
+            } else {
+                state.sort = header.dataset.sort;
+                state.order = 'desc';
+            }
+            state.cursor = null;
+            load();
+        });
+    });
+
+    load();
+}
+
 document.addEventListener('DOMContentLoaded', function() {
-    document.querySelectorAll('.view-security-btn').forEach(button => {
-        button.addEventListener('click', async function() {
-            const userId = this.getAttribute('data-user-id');
-            const row = this.closest('tr');
-            
-            const originalText = this.innerHTML;
-            this.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i> Loading...';
-            this.disabled = true;
+    document.querySelectorAll('table[data-table-url]').forEach(initDataTable);
+
+    // Delegated so rows rendered after page load get the handler too
+    document.addEventListener('click', async function(event) {
+        const button = event.target.closest('.view-security-btn');
+        if (!button) return;
+        const userId = button.getAttribute('data-user-id');
+        const row = button.closest('tr');
+        
+        const originalText = button.innerHTML;
+        button.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i> Loading...';
+        button.disabled = true;
+        
+        try {
+            const response = await fetch(`/admin/view-user-security/${userId}`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const data = await response.json();
             
-            try {
-                const response = await fetch(`/admin/view-user-security/${userId}`);
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                const data = await response.json();
+            if (data.success) {
+                document.getElementById('modalUsername').value = data.username;
+                document.getElementById('modalEmail').value = data.email;
+                document.getElementById('modalCreatedAt').value = data.created_at;
+                document.getElementById('modalLastLogin').value = data.last_login;
+                document.getElementById('modalSecurityQuestion').value = data.security_question;
+                document.getElementById('modalSecurityAnswer').value = data.security_answer;
+                document.getElementById('modalPasswordHash').value = data.password_hash;
                 
-                if (data.success) {
-                    document.getElementById('modalUsername').value = data.username;
-                    document.getElementById('modalEmail').value = data.email;
-                    document.getElementById('modalCreatedAt').value = data.created_at;
-                    document.getElementById('modalLastLogin').value = data.last_login;
-                    document.getElementById('modalSecurityQuestion').value = data.security_question;
-                    document.getElementById('modalSecurityAnswer').value = data.security_answer;
-                    document.getElementById('modalPasswordHash').value = data.password_hash;
-                    
-                    const securityModal = new bootstrap.Modal(document.getElementById('securityModal'));
-                    securityModal.show();
-                } else {
-                    alert(data.message || 'You do not have permission to view this data');
-                }
-            } catch (error) {
-                console.error('Error:', error);
-                alert('Failed to load security details. Please check console for details.');
-            } finally {
-                this.innerHTML = originalText;
-                this.disabled = false;
+                const securityModal = new bootstrap.Modal(document.getElementById('securityModal'));
+                securityModal.show();
+            } else {
+                alert(data.message || 'You do not have permission to view this data');
             }
-        });
+        } catch (error) {
+            console.error('Error:', error);
+            alert('Failed to load security details. Please check console for details.');
+        } finally {
+            button.innerHTML = originalText;
+            button.disabled = false;
+        }
     });
 });
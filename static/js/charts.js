@@ -277,6 +277,8 @@ function getPercentTooltipLabel(context) {
 
 // Real-time updates
 function updateCharts(data) {
+    if (!data || !data.riskDistribution) return;
+
     if (chartInstances.transactionChart) {
         let monthlyData = data.monthlyTransactions || Array(12).fill(0);
         monthlyData = monthlyData.map(val => Number(val) || 0);
@@ -333,6 +335,57 @@ async function fetchChartData() {
     }
 }
 
+// Prepend alerts pushed by the dashboard stream to the Recent Alerts list
+function prependAlerts(alerts) {
+    const list = document.getElementById('recentAlertsList');
+    if (!list || !Array.isArray(alerts)) return;
+
+    const placeholder = list.querySelector('.alert-secondary');
+    if (placeholder) placeholder.remove();
+
+    alerts.forEach(alert => {
+        const level = alert.priority === 'high' ? 'danger' : alert.priority === 'medium' ? 'warning' : 'info';
+        const item = document.createElement('div');
+        item.className = `alert alert-${level} mb-0 border-0 rounded-0`;
+        const row = document.createElement('div');
+        row.className = 'd-flex justify-content-between';
+        const message = document.createElement('div');
+        message.textContent = alert.message;
+        const timestamp = document.createElement('small');
+        timestamp.className = 'text-muted';
+        timestamp.textContent = alert.timestamp || '';
+        row.append(message, timestamp);
+        item.appendChild(row);
+        list.prepend(item);
+    });
+
+    while (list.children.length > 10) {
+        list.lastElementChild.remove();
+    }
+}
+
+// Server-sent dashboard updates; falls back to polling without EventSource
+function startDashboardStream() {
+    if (window.dashboardStream) return;
+
+    if (typeof EventSource === 'undefined') {
+        window.dashboardStream = setInterval(fetchChartData, 30000);
+        return;
+    }
+
+    const source = new EventSource('/admin/dashboard-stream');
+    source.addEventListener('stats', event => {
+        updateCharts(parseChartData(event.data, {}));
+    });
+    source.addEventListener('alerts', event => {
+        prependAlerts(parseChartData(event.data, []));
+    });
+    source.onerror = () => {
+        console.warn('Dashboard stream interrupted, the browser will reconnect');
+    };
+    window.dashboardStream = source;
+}
+
 // Initialize charts
 document.addEventListener('DOMContentLoaded', function() {
     try {
@@ -342,5 +395,9 @@ document.addEventListener('DOMContentLoaded', function() {
     } catch (error) {
         console.error('Error initializing charts:', error);
     }
-    setInterval(fetchChartData, 30000);
+    if (document.getElementById('riskDistributionChart')) {
+        startDashboardStream();
+    } else if (document.getElementById('fraudDistributionChart')) {
+        setInterval(fetchChartData, 30000);
+    }
 });
@@ -308,9 +308,13 @@ function debounce(func, timeout = 300) {
     };
 }
 
-// Initialize chart auto-refresh
+// Initialize chart auto-refresh (the dashboard stream lives in charts.js)
 function initChartAutoRefresh() {
-    if (document.getElementById('transactionChart')) {
+    if (!document.getElementById('transactionChart')) return;
+
+    if (typeof startDashboardStream === 'function') {
+        startDashboardStream();
+    } else {
         setInterval(fetchChartData, 30000);
     }
 }
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+
+from extensions import db, login_manager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The admin blueprint on a bare app, over a SQLite database built by the Alembic migrations."""
+    import admin
+
+    app = Flask(__name__, template_folder=os.path.join(REPO_ROOT, 'templates'),
+                static_folder=os.path.join(REPO_ROOT, 'static'))
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SECRET_KEY='test',
+        TESTING=True,
+        LOG_LEVEL='WARNING',
+        RESPONSE_CACHE_ENABLED=False,
+        FEATURE_STORE_SYNC=False,
+    )
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(admin.admin_bp)
+    # Links to the auth and user blueprints, which are not registered here
+    app.url_build_error_handlers.append(lambda error, endpoint, values: '#')
+    Migrate(app, db, directory=os.path.join(REPO_ROOT, 'migrations'))
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin_user(app):
+    from models import Admin
+
+    admin = Admin(username='admin', email='admin@example.com', password_hash='!',
+                  is_super_admin=True, can_view_sensitive_data=True)
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def admin_client(app, admin_user):
+    """Test client logged in as `admin_user`."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = f'admin:{admin_user.id}'
+        session['_fresh'] = True
+    return client
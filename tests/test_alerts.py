@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+import alerts
+from alerts import FRAUD_ALERT, insert_alerts, transaction_alert
+from extensions import db
+from models import Alert, Transaction, User
+
+
+def _high_risk_transactions(count):
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    transactions = [Transaction(user_id=user.id, transaction_id=f'TXN{i}', amount=10.0, recipient_upi='r@upi',
+                                sender_upi='s@upi', timestamp=datetime.utcnow(), fraud_probability=0.9,
+                                risk_level='High', is_flagged=False) for i in range(count)]
+    db.session.add_all(transactions)
+    db.session.commit()
+    return transactions
+
+
+@pytest.fixture(params=['native', 'fallback'])
+def insert_path(request, monkeypatch):
+    # 'fallback' takes the path used for dialects without an upsert
+    if request.param == 'fallback':
+        monkeypatch.setattr(alerts, '_insert_ignoring_duplicates', lambda dialect: None)
+    return request.param
+
+
+def test_same_flag_twice_raises_one_alert(app, insert_path):
+    txn, = _high_risk_transactions(1)
+
+    insert_alerts([transaction_alert(txn)])
+    db.session.commit()
+    insert_alerts([transaction_alert(txn)])
+    db.session.commit()
+
+    assert Alert.query.filter_by(source_transaction_id=txn.id, alert_type=FRAUD_ALERT).count() == 1
+
+
+def test_duplicates_within_one_batch_are_skipped(app, insert_path):
+    first, second = _high_risk_transactions(2)
+    insert_alerts([transaction_alert(first)])
+
+    insert_alerts([transaction_alert(first), transaction_alert(second), transaction_alert(second),
+                   transaction_alert(second, alert_type='review')])
+    db.session.commit()
+
+    assert sorted((alert.source_transaction_id, alert.alert_type) for alert in Alert.query) == \
+        [(first.id, FRAUD_ALERT), (second.id, FRAUD_ALERT), (second.id, 'review')]
+
+
+def test_fallback_skips_a_row_raced_in_by_another_writer(app, monkeypatch):
+    monkeypatch.setattr(alerts, '_insert_ignoring_duplicates', lambda dialect: None)
+    first, second = _high_risk_transactions(2)
+    insert_alerts([transaction_alert(first)])
+    # The pre-filter misses the conflict, as when another writer commits in between
+    monkeypatch.setattr(alerts, '_new_sources_only', lambda rows: rows)
+
+    insert_alerts([transaction_alert(first), transaction_alert(second)])
+    db.session.commit()
+
+    assert sorted(alert.source_transaction_id for alert in Alert.query) == [first.id, second.id]
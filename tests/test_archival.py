@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from alerts import FRAUD_ALERT, insert_alerts, transaction_alert
+from archival import ArchivedTransaction, archive_transactions, restore_transactions
+from extensions import db
+from models import Alert, Transaction, User
+
+
+def _seed(now):
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=now)
+    db.session.add(user)
+    db.session.flush()
+    transactions = [Transaction(user_id=user.id, transaction_id=f'TXN{i}', amount=10.0 + i, recipient_upi='r@upi',
+                                sender_upi='s@upi', timestamp=now - timedelta(days=400 if i < 3 else 1),
+                                fraud_probability=0.9, risk_level='High', is_flagged=True) for i in range(5)]
+    db.session.add_all(transactions)
+    db.session.flush()
+    insert_alerts([transaction_alert(txn) for txn in transactions])
+    db.session.commit()
+    return transactions
+
+
+def _rows():
+    return sorted(tuple(getattr(txn, name) for name in ('id', 'transaction_id', 'amount', 'timestamp', 'is_flagged'))
+                  for txn in Transaction.query)
+
+
+def test_archive_and_restore_round_trip_keeps_alert_links(app):
+    now = datetime.utcnow()
+    transactions = _seed(now)
+    before = _rows()
+    old_ids = sorted(txn.id for txn in transactions[:3])
+
+    assert archive_transactions(older_than_days=365, chunk_size=2, now=now) == 3
+    assert sorted(txn.id for txn in ArchivedTransaction.query) == old_ids
+    archived_alerts = Alert.query.filter(Alert.archived_transaction_id.isnot(None)).all()
+    assert sorted(alert.archived_transaction_id for alert in archived_alerts) == old_ids
+    assert all(alert.source_transaction_id is None for alert in archived_alerts)
+
+    assert restore_transactions(0, 10 ** 9, chunk_size=2) == 3
+    db.session.expire_all()
+
+    assert _rows() == before
+    assert ArchivedTransaction.query.count() == 0
+    links = sorted((alert.source_transaction_id, alert.archived_transaction_id) for alert in Alert.query)
+    assert links == [(txn.id, None) for txn in sorted(transactions, key=lambda txn: txn.id)]
+    # The dedupe key is back: flagging a restored transaction again raises no second alert
+    insert_alerts([transaction_alert(transactions[0])])
+    db.session.commit()
+    assert Alert.query.filter_by(source_transaction_id=transactions[0].id, alert_type=FRAUD_ALERT).count() == 1
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from change_feed import STREAM_CLOSED, ChangeFeed
+from extensions import db
+from models import Alert, User
+
+
+def _feed(app, queue_size=100):
+    feed = ChangeFeed(interval=60, queue_size=queue_size)
+    feed.init_app(app)
+    return feed
+
+
+def test_slow_subscriber_is_closed(app):
+    feed = _feed(app, queue_size=2)
+    subscriber = feed.subscribe()
+    for i in range(3):
+        feed.publish('stats', {'total': i})
+
+    assert subscriber.get_nowait() is STREAM_CLOSED
+    assert subscriber.empty()
+    feed.publish('stats', {'total': 3})
+    assert subscriber.empty()
+
+
+def test_restarted_poller_skips_alerts_raised_while_idle(app):
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([Alert(user_id=user.id, message=f'alert {i}', alert_type='fraud_alert', priority='high',
+                              is_read=False, timestamp=datetime.utcnow()) for i in range(3)])
+    db.session.commit()
+
+    feed = _feed(app)
+    feed.last_alert_id = 1  # left over from an earlier run of the poller
+    subscriber = feed.subscribe()
+    feed.poll()
+    assert feed.last_alert_id == 3
+    feed.unsubscribe(subscriber)
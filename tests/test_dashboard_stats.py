@@ -0,0 +1,134 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from archival import archive_transactions, restore_transactions
+from bulk_scoring import score_stream
+from dashboard_stats import get_user_stats
+from extensions import db
+from flagging_worker import run_flagging_pass
+from models import Transaction, User
+from moderation import build_criteria, bulk_moderate
+from risk_stats import RiskCounter, reconcile_counters
+
+RISK_LEVELS = ('Low', 'Medium', 'High')
+
+
+def _add_users(count, start=0):
+    now = datetime.utcnow()
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='!',
+                  created_at=now - timedelta(days=i)) for i in range(start, start + count)]
+    db.session.add_all(users)
+    db.session.flush()
+    return users
+
+
+def _add_transactions(users, count, start=0, now=None):
+    now = now or datetime.utcnow()
+    transactions = []
+    for i in range(start, start + count):
+        probability = (i * 37 % 100) / 100.0
+        transactions.append(Transaction(
+            user_id=users[i % len(users)].id, transaction_id=f'TXN{i:08d}', amount=10.0 + i,
+            recipient_upi=f'r{i % 9}@upi', sender_upi='s@upi', timestamp=now - timedelta(days=i % 400),
+            fraud_probability=probability,
+            risk_level='Low' if probability < 0.3 else 'Medium' if probability < 0.7 else 'High',
+            is_flagged=i % 11 == 0))
+    db.session.add_all(transactions)
+    db.session.commit()
+    return transactions
+
+
+def _count_queries(client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    client.get(url)  # warm the identity cache and lazy services
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_dashboard_query_count_does_not_grow_with_data(app, admin_client):
+    users = _add_users(5)
+    _add_transactions(users, 20)
+    reconcile_counters()
+    small = _count_queries(admin_client, '/admin/dashboard')
+
+    users += _add_users(60, start=5)
+    _add_transactions(users, 600, start=20)
+    reconcile_counters()
+    assert _count_queries(admin_client, '/admin/dashboard') == small
+
+
+def _counters():
+    return {(row.scope, row.scope_key, row.risk_level, bool(row.is_flagged)): row.count
+            for row in RiskCounter.query if row.count}
+
+
+def _assert_counters_match_reconcile():
+    incremental = _counters()
+    reconcile_counters()
+    assert incremental == _counters()
+
+
+def test_incremental_counters_match_reconcile_on_every_write_path(app, admin_user):
+    users = _add_users(6)
+    transactions = _add_transactions(users, 120)
+    _assert_counters_match_reconcile()
+
+    # ORM updates of every tracked column, then deletes
+    transactions[0].risk_level = 'High'
+    transactions[1].is_flagged = not transactions[1].is_flagged
+    transactions[2].timestamp -= timedelta(days=45)
+    transactions[3].user_id = users[-1].id
+    db.session.commit()
+    _assert_counters_match_reconcile()
+    db.session.delete(transactions[4])
+    db.session.delete(transactions[5])
+    db.session.commit()
+    _assert_counters_match_reconcile()
+
+    # Bulk moderation
+    bulk_moderate('flag', build_criteria(risk_level='Medium'), admin_user.id)
+    _assert_counters_match_reconcile()
+    bulk_moderate('unflag', build_criteria(user_id=users[0].id), admin_user.id)
+    _assert_counters_match_reconcile()
+    bulk_moderate('delete', build_criteria(ids=[txn.id for txn in transactions[10:20]]), admin_user.id)
+    _assert_counters_match_reconcile()
+
+    # Background flagging worker
+    run_flagging_pass(batch_size=7)
+    _assert_counters_match_reconcile()
+
+    # Bulk scoring inserts through Core
+    lines = [json.dumps({'user_id': users[i % 6].id, 'transaction_id': f'BULK{i}', 'amount': 5.0 * i,
+                         'recipient_upi': 'bulk@upi', 'features': [i / 10.0] * 10}) for i in range(30)]
+    score_stream(io.BytesIO('\n'.join(lines).encode()), 'jsonl', 'counters-test', chunk_size=8)
+    _assert_counters_match_reconcile()
+
+    # Archiving keeps archived rows in the counters through the rollups
+    archive_transactions(older_than_days=200, chunk_size=9)
+    _assert_counters_match_reconcile()
+    restore_transactions(0, 10 ** 9)
+    _assert_counters_match_reconcile()
+
+
+def test_user_counter_tracks_registrations_and_deletes(app):
+    users = _add_users(4)
+    users[0].created_at = datetime.utcnow() - timedelta(days=30)
+    db.session.commit()
+    assert get_user_stats() == {'total_users': 4, 'new_users': 3}
+
+    db.session.delete(users[1])
+    db.session.commit()
+    assert get_user_stats()['total_users'] == 3
+    _assert_counters_match_reconcile()
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from data_tables import table_page
+from extensions import db
+from models import Transaction, User
+
+
+def _seed(transaction_ids):
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([Transaction(user_id=user.id, transaction_id=txn_id, amount=float(len(txn_id) + i),
+                                    recipient_upi='r@upi', sender_upi='s@upi', timestamp=datetime.utcnow(),
+                                    fraud_probability=0.1, risk_level='Low', is_flagged=False)
+                        for i, txn_id in enumerate(transaction_ids)])
+    db.session.commit()
+
+
+def test_search_treats_wildcards_literally(app):
+    _seed(['TXN_1', 'TXNA1', 'TX%N1', 'TXZN1'])
+    found = table_page('transactions', MultiDict({'search': 'TXN_'}))
+    assert [item['transaction_id'] for item in found['items']] == ['TXN_1']
+    found = table_page('transactions', MultiDict({'search': 'TX%'}))
+    assert [item['transaction_id'] for item in found['items']] == ['TX%N1']
+
+
+def test_amount_sort_pages_through_every_row(app):
+    _seed([f'TXN{i:03d}' for i in range(25)])
+    seen, cursor = [], None
+    while True:
+        page = table_page('transactions', MultiDict({'sort': 'amount', 'order': 'asc', 'per_page': 10,
+                                                     **({'cursor': cursor} if cursor else {})}))
+        seen += [item['amount'] for item in page['items']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == sorted(seen) and len(seen) == 25
+
+
+@pytest.mark.parametrize('replay', [{'sort': 'timestamp', 'order': 'asc'}, {'sort': 'amount', 'order': 'desc'}])
+def test_cursor_is_rejected_for_another_sort_or_order(admin_client, replay):
+    _seed([f'TXN{i:03d}' for i in range(5)])
+    first = admin_client.get('/admin/tables/transactions?sort=amount&order=asc&per_page=2').get_json()
+    assert first['next_cursor']
+
+    response = admin_client.get('/admin/tables/transactions', query_string={**replay, 'cursor': first['next_cursor']})
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from extensions import db
+from feature_importance import compute_feature_importance, permutation_importance, sample_feature_matrix
+from feature_store import FEATURE_NAMES
+from models import Transaction, User
+
+
+def _seed(count):
+    users = [User(username=f'payer{i}', email=f'payer{i}@example.com', password_hash='!',
+                  created_at=datetime.utcnow()) for i in range(3)]
+    db.session.add_all(users)
+    db.session.flush()
+    start = datetime(2026, 1, 1)
+    db.session.add_all([Transaction(user_id=users[i % 3].id, transaction_id=f'TXN{i}', amount=10.0 + i,
+                                    recipient_upi=f'r{i % 4}@upi', sender_upi='s@upi',
+                                    timestamp=start + timedelta(minutes=i), fraud_probability=0.1,
+                                    risk_level='Low', is_flagged=False) for i in range(count)])
+    db.session.commit()
+
+
+def test_sample_vectors_only_see_earlier_transactions(app):
+    _seed(30)
+    matrix = sample_feature_matrix(samples=30, seed=1, batch_size=7)
+    assert matrix.shape[1] == len(FEATURE_NAMES)
+    assert 0 < len(matrix) <= 30
+    counts = matrix[:, FEATURE_NAMES.index('user_transaction_count')]
+    # A user's n-th transaction sees n - 1 earlier ones; never more than its share of 30
+    assert counts.min() >= 0 and counts.max() <= 9
+
+
+def test_sample_of_an_empty_table(app):
+    assert sample_feature_matrix().shape == (0, len(FEATURE_NAMES))
+
+
+def test_permutation_importance_finds_the_only_column_that_matters():
+    matrix = np.random.default_rng(0).normal(size=(200, 4)).astype(np.float32)
+    scores = permutation_importance(lambda rows: 1 / (1 + np.exp(-rows[:, 2])), matrix, repeats=3)
+    assert scores.argmax() == 2
+    assert scores[[0, 1, 3]].max() == 0
+
+
+def test_routes_are_disabled_by_default(admin_client):
+    assert admin_client.get('/admin/feature-importance').status_code == 404
+    assert admin_client.post('/admin/feature-importance/refresh').status_code == 404
+
+
+def test_enabled_route_serves_the_computed_result(app, admin_client):
+    app.config['FEATURE_IMPORTANCE_ENABLED'] = True
+    assert admin_client.get('/admin/feature-importance').get_json()['computed_at'] is None
+    _seed(30)
+    result = compute_feature_importance(samples=20, repeats=2)
+    assert sum(result['importance'].values()) == pytest.approx(1.0, abs=1e-3)
+    assert admin_client.get('/admin/feature-importance').get_json()['model_version'] == result['model_version']
@@ -0,0 +1,61 @@
+import os
+from datetime import datetime
+
+from extensions import db
+from feature_store import FeatureStore
+from models import Transaction, User
+
+
+def _transaction(user_id, i, recipient='r@upi'):
+    return Transaction(id=i, user_id=user_id, transaction_id=f'TXN{i}', amount=10.0 * i, recipient_upi=recipient,
+                       sender_upi='s@upi', timestamp=datetime.utcnow(), fraud_probability=0.1, risk_level='Low',
+                       is_flagged=False)
+
+
+def _user():
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def test_sync_applies_late_commits_below_the_newest_id_once(app):
+    user = _user()
+    db.session.add_all([_transaction(user.id, i) for i in (1, 2, 4)])
+    db.session.commit()
+    store = FeatureStore(batch_size=2)
+    assert store.sync() == 3
+
+    # id 3 was allocated before 4 but committed after the sync read past it
+    db.session.add(_transaction(user.id, 3))
+    db.session.commit()
+    assert store.sync() == 1
+    assert store.sync() == 0
+    assert store.users[user.id].count == 4
+    assert store.last_transaction_id == 4
+
+
+def test_snapshot_round_trip_keeps_applied_ids(app, tmp_path):
+    user = _user()
+    db.session.add_all([_transaction(user.id, i) for i in range(1, 6)])
+    db.session.commit()
+    store = FeatureStore()
+    store.snapshot_path = str(tmp_path / 'store' / 'feature_store.json')
+    store.sync()
+    store.snapshot()
+    assert os.listdir(tmp_path / 'store') == ['feature_store.json']
+
+    restored = FeatureStore()
+    restored.snapshot_path = store.snapshot_path
+    assert restored.load_snapshot()
+    assert restored.sync() == 0
+    assert restored.users[user.id].count == 5
+
+
+def test_recipient_counts_are_capped(app):
+    store = FeatureStore(max_user_recipients=4, max_recipients=6)
+    for i in range(1, 20):
+        store.apply(i, 1 + i % 2, 10.0, 'regular@upi' if i % 3 == 0 else f'once{i}@upi', datetime.utcnow())
+    assert len(store.recipients) <= 6
+    assert all(len(state.recipients) <= 4 for state in store.users.values())
+    assert store.recipients['regular@upi'] == 6
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from extensions import db
+from flagging_worker import HIGH_WATER_MARK_KEY, SEEN_IDS_KEY, run_flagging_pass
+from models import Alert, Transaction, User
+from moderation import build_criteria, bulk_moderate
+from state_store import get_state, set_state
+
+
+def _seed(count, start=0):
+    user = User(username=f'payer{start}', email=f'payer{start}@example.com', password_hash='!',
+                created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    transactions = [Transaction(user_id=user.id, transaction_id=f'TXN{i}', amount=100.0, recipient_upi='r@upi',
+                                sender_upi='s@upi', timestamp=datetime.utcnow(), fraud_probability=0.9,
+                                risk_level='High', is_flagged=False) for i in range(start, start + count)]
+    db.session.add_all(transactions)
+    db.session.commit()
+    return transactions
+
+
+def test_pass_flags_new_rows_and_advances_the_mark(app):
+    transactions = _seed(12)
+    assert run_flagging_pass(batch_size=5) == 12
+    assert get_state(HIGH_WATER_MARK_KEY) == transactions[-1].id
+    assert Alert.query.count() == 12
+    assert run_flagging_pass(batch_size=5) == 0
+    assert Alert.query.count() == 12
+
+
+def test_rows_committed_below_the_mark_are_picked_up_by_the_lookback(app):
+    transactions = _seed(10)
+    # A scan already moved past the first five rows while they were still uncommitted
+    set_state(HIGH_WATER_MARK_KEY, transactions[-1].id)
+    set_state(SEEN_IDS_KEY, [txn.id for txn in transactions[5:]])
+    db.session.commit()
+
+    assert run_flagging_pass(batch_size=4) == 5
+    assert run_flagging_pass(batch_size=4) == 0
+    assert get_state(HIGH_WATER_MARK_KEY) == transactions[-1].id
+    assert Alert.query.count() == 5
+    assert {txn.id for txn in Transaction.query.filter_by(is_flagged=True)} == {txn.id for txn in transactions[:5]}
+
+
+def test_manual_unflag_survives_later_passes(app, admin_client):
+    transactions = _seed(6)
+    assert run_flagging_pass() == 6
+
+    response = admin_client.post(f'/admin/unflag-transaction/{transactions[2].id}')
+    assert response.status_code == 302
+    bulk_moderate('unflag', build_criteria(ids=[transactions[4].id]), None)
+    _seed(2, start=6)
+
+    assert run_flagging_pass() == 2
+    assert not db.session.get(Transaction, transactions[2].id).is_flagged
+    assert not db.session.get(Transaction, transactions[4].id).is_flagged
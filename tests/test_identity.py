@@ -0,0 +1,80 @@
+import pytest
+
+from extensions import db
+from identity import ADMIN_VERSION_KEY, identity_cache, load_principal
+from model_patches import principal_id
+from models import Admin, User
+from state_store import set_state
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    identity_cache.clear()
+    yield
+    identity_cache.clear()
+
+
+def _user():
+    user = User(username='payer', email='payer@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_get_id_round_trips_through_load_principal(app, admin_user):
+    user = _user()
+    assert admin_user.get_id() == f'admin:{admin_user.id}'
+    assert user.get_id() == f'user:{user.id}'
+
+    assert isinstance(load_principal(admin_user.get_id()), Admin)
+    assert load_principal(user.get_id()).email == 'payer@example.com'
+    assert load_principal('nobody:1') is None
+    assert load_principal('admin:abc') is None
+
+
+def test_second_load_is_a_cache_hit(app, admin_user):
+    user = _user()
+    hits = identity_cache.hits
+    load_principal(user.get_id())
+    db.session.expunge_all()
+
+    assert load_principal(user.get_id()).id == user.id
+    assert identity_cache.hits == hits + 1
+
+
+@pytest.mark.parametrize('change', ['update', 'delete'])
+def test_update_and_delete_invalidate_the_entry(app, admin_user, change):
+    user = _user()
+    key = principal_id(user)
+    load_principal(key)
+    assert identity_cache.stats()['entries'] == 1
+
+    if change == 'update':
+        user.username = 'renamed'
+    else:
+        db.session.delete(user)
+    db.session.commit()
+
+    assert identity_cache.stats()['entries'] == 0
+    db.session.expunge_all()
+    loaded = load_principal(key)
+    assert (loaded.username if loaded else None) == ('renamed' if change == 'update' else None)
+
+
+def test_admin_change_in_another_process_is_seen_on_the_next_request(app, admin_user):
+    key = principal_id(admin_user)
+    load_principal(key)
+    hits = identity_cache.hits
+    db.session.expunge_all()
+    assert load_principal(key) is not None
+    assert identity_cache.hits == hits + 1
+
+    # Another process demotes the admin: its cache here still holds the old row
+    db.session.execute(Admin.__table__.update().where(Admin.__table__.c.id == admin_user.id)
+                       .values(is_super_admin=False))
+    set_state(ADMIN_VERSION_KEY, 'from-another-process')
+    db.session.commit()
+    db.session.expunge_all()
+
+    assert load_principal(key).is_super_admin is False
+    assert identity_cache.hits == hits + 1
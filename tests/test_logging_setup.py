@@ -0,0 +1,53 @@
+import atexit
+import logging
+import queue
+
+import pytest
+from flask import request
+
+from logging_setup import LazyQueueHandler, configure_logging
+
+
+def test_queued_records_carry_arguments_resolved_on_the_calling_thread(app):
+    records = queue.Queue()
+    logger = logging.getLogger('tests.lazy_queue')
+    logger.propagate = False
+    logger.addHandler(LazyQueueHandler(records))
+    try:
+        with app.test_request_context('/admin/users'):
+            logger.warning("Request to %s", request.path)
+    finally:
+        logger.handlers.clear()
+
+    record = records.get_nowait()
+    assert record.getMessage() == 'Request to /admin/users'
+    assert record.args is None
+
+
+@pytest.fixture
+def fresh_root(monkeypatch):
+    """Run configure_logging as if for the first time, restoring the root logger afterwards."""
+    import logging_setup
+
+    monkeypatch.setattr(logging_setup, '_listener', None)
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    existing = logging.NullHandler()
+    root.addHandler(existing)
+    yield existing
+    if logging_setup._listener is not None:
+        logging_setup._listener.stop()
+        atexit.unregister(logging_setup._listener.stop)
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+@pytest.mark.parametrize('configure_root, kept', [(False, True), (True, False)])
+def test_configure_logging_keeps_root_handlers_unless_asked(app, fresh_root, configure_root, kept):
+    app.config['LOG_CONFIGURE_ROOT'] = configure_root
+
+    configure_logging(app)
+
+    handlers = logging.getLogger().handlers
+    assert (fresh_root in handlers) is kept
+    assert sum(isinstance(handler, LazyQueueHandler) for handler in handlers) == 1
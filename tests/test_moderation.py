@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+
+import moderation
+from extensions import db
+from models import Admin, Alert, Transaction, User
+from moderation import ModerationError, build_criteria, bulk_moderate
+from read_state import mark_all_read, recent_alerts_for, set_alert_read, unread_count
+
+
+@pytest.mark.parametrize('filters', [
+    {'user_id': 'abc'},
+    {'user_id': ['1']},
+    {'start': 20260101},
+    {'end': 'not-a-date'},
+])
+def test_build_criteria_rejects_malformed_filters(filters):
+    with pytest.raises(ModerationError):
+        build_criteria(**filters)
+
+
+def test_flag_raises_alerts_for_high_risk_rows_only(app, admin_user, monkeypatch):
+    monkeypatch.setattr(moderation, 'ALERT_BATCH_SIZE', 2)
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    levels = ['High', 'Low', 'High', 'Medium', 'High', 'High', 'High']
+    db.session.add_all([Transaction(user_id=user.id, transaction_id=f'TXN{i}', amount=10.0, recipient_upi='r@upi',
+                                    sender_upi='s@upi', timestamp=datetime.utcnow(), fraud_probability=0.5,
+                                    risk_level=level, is_flagged=i == 0) for i, level in enumerate(levels)])
+    db.session.commit()
+
+    summary = bulk_moderate('flag', build_criteria(user_id=str(user.id)), admin_user.id)
+
+    assert summary['updated'] == 6
+    assert summary['newly_flagged'] == 6
+    assert Alert.query.count() == 4
+
+
+def _seed_high_risk(count):
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([Transaction(user_id=user.id, transaction_id=f'TXN{i}', amount=10.0, recipient_upi='r@upi',
+                                    sender_upi='s@upi', timestamp=datetime.utcnow(), fraud_probability=0.9,
+                                    risk_level='High') for i in range(count)])
+    db.session.commit()
+    return user
+
+
+def _second_admin():
+    other = Admin(username='other', email='other@example.com', password_hash='!')
+    db.session.add(other)
+    db.session.commit()
+    return other
+
+
+def test_second_flag_keeps_the_original_flagger(app, admin_user):
+    user = _seed_high_risk(5)
+    other = _second_admin()
+    criteria = build_criteria(user_id=str(user.id))
+
+    bulk_moderate('flag', criteria, admin_user.id)
+    db.session.commit()
+    summary = bulk_moderate('flag', criteria, other.id)
+    db.session.commit()
+
+    assert (summary['updated'], summary['newly_flagged']) == (0, 0)
+    assert {txn.flagged_by_id for txn in Transaction.query} == {admin_user.id}
+    assert Alert.query.count() == 5
+
+
+def test_unflag_resolves_alerts_for_every_admin_except_explicit_unread(app, admin_user):
+    user = _seed_high_risk(2)
+    other = _second_admin()
+    criteria = build_criteria(user_id=str(user.id))
+    bulk_moderate('flag', criteria, admin_user.id)
+    db.session.commit()
+    kept = Alert.query.order_by(Alert.id).first()
+    # admin_user keeps one alert on their list on purpose
+    mark_all_read(admin_user.id)
+    set_alert_read(admin_user.id, kept, is_read=False)
+    db.session.commit()
+    assert unread_count(other.id) == 2
+
+    summary = bulk_moderate('unflag', criteria, admin_user.id)
+    db.session.commit()
+
+    assert summary['alerts_resolved'] == 2
+    assert unread_count(other.id) == 0
+    assert unread_count(admin_user.id) == 1
+    assert [alert.id for alert in recent_alerts_for(admin_user.id) if alert.unread] == [kept.id]
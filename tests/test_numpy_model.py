@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from scoring import MODEL_PATH, N_FEATURES, check_parity, load_numpy_predict
+
+# float32 NumPy and TensorFlow kernels differ only in summation order
+PARITY_TOLERANCE = 1e-5
+
+
+def test_numpy_engine_matches_keras():
+    pytest.importorskip('tensorflow')
+    assert check_parity(MODEL_PATH, samples=1000, seed=0) < PARITY_TOLERANCE
+
+
+def test_numpy_engine_single_row_and_batch_agree():
+    predict = load_numpy_predict(MODEL_PATH)
+    batch = np.random.default_rng(1).normal(size=(8, N_FEATURES)).astype(np.float32)
+    probabilities = predict(batch)
+    assert probabilities.shape == (8,)
+    assert np.all((probabilities >= 0.0) & (probabilities <= 1.0))
+    assert predict(batch[3])[0] == pytest.approx(probabilities[3], abs=1e-6)
+
+
+def test_numpy_engine_rejects_wrong_feature_count():
+    with pytest.raises(ValueError):
+        load_numpy_predict(MODEL_PATH)(np.zeros(N_FEATURES + 1))
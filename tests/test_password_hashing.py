@@ -0,0 +1,43 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from password_hashing import HashingPoolFull, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4, timeout=5.0)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher):
+    hashed = hasher.hash('s3cret')
+    assert hasher.verify('s3cret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.verify('s3cret', 'not-a-bcrypt-hash')
+
+
+def test_timeout_maps_to_pool_full_and_keeps_the_slot_until_the_task_ends(hasher):
+    hasher.hash('warm up')
+    hasher.timeout = 0.2
+    with pytest.raises(HashingPoolFull):
+        hasher._run(time.sleep, 1.0)
+    assert hasher.metrics['timed_out'] == 1
+    # The sleeping task still holds a slot; the queued one times out and is cancelled
+    with pytest.raises(HashingPoolFull):
+        hasher._run(time.sleep, 0)
+    time.sleep(1.2)
+    hasher.timeout = 5.0
+    assert hasher.verify('x', hasher.hash('x'))
+
+
+def test_broken_pool_is_replaced(hasher):
+    hasher.hash('warm up')
+    with pytest.raises(BrokenProcessPool):
+        hasher._run(os._exit, 1)
+    assert hasher.metrics['pool_restarts'] == 2
+    assert hasher.verify('x', hasher.hash('x'))
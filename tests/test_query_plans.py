@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Alert, Transaction, User
+from query_plans import admin_query_shapes, explain_admin_queries
+
+
+def _seed():
+    now = datetime.utcnow()
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='!',
+                  created_at=now - timedelta(days=i)) for i in range(20)]
+    db.session.add_all(users)
+    db.session.flush()
+    for i in range(200):
+        db.session.add(Transaction(
+            user_id=users[i % 20].id, transaction_id=f'TXN{i:06d}', amount=100.0 + i,
+            recipient_upi=f'r{i % 7}@upi', sender_upi='s@upi', timestamp=now - timedelta(hours=i),
+            fraud_probability=(i % 10) / 10.0, risk_level=('Low', 'Medium', 'High')[i % 3],
+            is_flagged=i % 5 == 0))
+        db.session.add(Alert(user_id=users[i % 20].id, message=f'alert {i}', alert_type='fraud_alert',
+                             timestamp=now - timedelta(hours=i), is_read=i % 2 == 0))
+    db.session.commit()
+
+
+def test_every_admin_query_uses_an_index(app):
+    _seed()
+    db.session.execute(db.text('ANALYZE'))
+    results = explain_admin_queries()
+    assert {name for name, _, _ in results} == set(admin_query_shapes())
+    full_scans = {name: rows for name, rows, full_scan in results if full_scan}
+    assert not full_scans, f"Queries falling back to a full table scan: {full_scans}"
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from extensions import db
+from models import Alert, User
+from read_state import AlertReadWatermark, mark_all_read, recent_alerts_for, set_alert_read, unread_count
+
+
+def _alerts(count, is_read=False):
+    user = User(username=f'payer{is_read}', email=f'payer{is_read}@example.com', password_hash='!',
+                created_at=datetime.utcnow())
+    db.session.add(user)
+    db.session.flush()
+    # Through Core: the ORM would replace None with the column default
+    db.session.execute(sa.insert(Alert.__table__), [
+        {'user_id': user.id, 'message': 'alert', 'alert_type': 'fraud_alert', 'priority': 'high',
+         'is_read': is_read, 'timestamp': datetime.utcnow()} for _ in range(count)])
+    db.session.commit()
+
+
+def test_alerts_with_null_is_read_count_as_unread(app, admin_user):
+    _alerts(2, is_read=None)
+    _alerts(1, is_read=True)
+    assert unread_count(admin_user.id) == 2
+    mark_all_read(admin_user.id)
+    db.session.commit()
+    assert unread_count(admin_user.id) == 0
+
+
+def test_mark_all_read_updates_a_watermark_created_concurrently(app, admin_user, monkeypatch):
+    _alerts(3)
+    # Another request inserts the watermark between our lookup and our insert
+    with db.engine.begin() as conn:
+        conn.execute(sa.insert(AlertReadWatermark.__table__).values(
+            admin_id=admin_user.id, last_read_alert_id=1, read_at=datetime.utcnow()))
+    real_get = db.session.get
+    calls = []
+
+    def stale_get(entity, ident, **kwargs):
+        calls.append(entity)
+        return None if len(calls) == 1 else real_get(entity, ident, **kwargs)
+
+    monkeypatch.setattr(db.session, 'get', stale_get)
+    assert mark_all_read(admin_user.id) == 3
+    db.session.commit()
+    monkeypatch.undo()
+    assert db.session.get(AlertReadWatermark, admin_user.id).last_read_alert_id == 3
+    assert unread_count(admin_user.id) == 0
+
+
+def test_resolved_alert_marked_unread_above_the_watermark_counts(app, admin_user):
+    _alerts(1, is_read=True)
+    resolved = Alert.query.one()
+    assert unread_count(admin_user.id) == 0
+
+    set_alert_read(admin_user.id, resolved, is_read=False)
+    db.session.commit()
+
+    assert unread_count(admin_user.id) == 1
+    assert [alert.id for alert in recent_alerts_for(admin_user.id) if alert.unread] == [resolved.id]
+    set_alert_read(admin_user.id, resolved, is_read=True)
+    db.session.commit()
+    assert unread_count(admin_user.id) == 0
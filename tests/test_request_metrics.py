@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+import sqlalchemy as sa
+from flask import Blueprint
+
+from extensions import db
+from request_metrics import REQUESTS, _start_request, instrument_blueprint
+
+
+def test_failed_statement_does_not_leave_a_start_time_behind(app):
+    with app.test_request_context('/admin/dashboard'):
+        _start_request()
+        with db.engine.connect() as conn:
+            with pytest.raises(sa.exc.OperationalError):
+                conn.execute(sa.text('SELECT * FROM no_such_table'))
+            assert not conn.info.get('_query_started')
+            conn.execute(sa.text('SELECT 1'))
+            assert not conn.info.get('_query_started')
+
+
+def _instrumented_app(app):
+    blueprint = Blueprint('metrics_probe', __name__)
+    instrument_blueprint(blueprint)
+
+    @blueprint.route('/probe/ok')
+    def ok():
+        return 'ok'
+
+    @blueprint.route('/probe/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    app.register_blueprint(blueprint)
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    return app.test_client()
+
+
+def test_unhandled_errors_are_recorded_as_500(app):
+    client = _instrumented_app(app)
+    before = REQUESTS._values.get(('metrics_probe.boom', '500'), 0)
+
+    assert client.get('/probe/boom').status_code == 500
+    assert client.get('/probe/ok').status_code == 200
+
+    assert REQUESTS._values[('metrics_probe.boom', '500')] == before + 1
+    assert REQUESTS._values[('metrics_probe.ok', '200')] >= 1
+
+
+def test_slow_request_log_passes_arguments(app, caplog, monkeypatch):
+    client = _instrumented_app(app)
+    app.config['SLOW_REQUEST_MS'] = 0
+    # Alembic's fileConfig disables loggers that existed before the migrations ran
+    monkeypatch.setattr(logging.getLogger('request_metrics'), 'disabled', False)
+
+    with caplog.at_level(logging.WARNING, logger='request_metrics'):
+        client.get('/probe/ok')
+
+    record = next(record for record in caplog.records if record.name == 'request_metrics')
+    assert record.msg.startswith('Slow request %s %s')
+    assert 'GET /probe/ok (metrics_probe.ok, 200)' in record.getMessage()
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+import response_cache as response_cache_module
+from response_cache import LocalStore, ResponseCache, SQLiteStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'cache.db'))
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize('make_store', ['local', 'sqlite'])
+def test_entries_expire_after_ttl(clock, sqlite_store, make_store):
+    store = LocalStore() if make_store == 'local' else sqlite_store
+    store.set('key', {'body': 'x'}, ttl=30)
+
+    clock.now += 29
+    assert store.get('key') == {'body': 'x'}
+    clock.now += 2
+    assert store.get('key') is None
+
+
+def test_sqlite_store_keeps_one_connection_per_thread(sqlite_store):
+    main = sqlite_store._connect()
+    sqlite_store.set('key', 1, ttl=30)
+    assert sqlite_store._connect() is main
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append((sqlite_store._connect(), sqlite_store.get('key'))))
+    worker.start()
+    worker.join()
+    assert seen[0][0] is not main and seen[0][1] == 1
+
+    # The exited thread's connection is closed when the next one is opened
+    other = threading.Thread(target=sqlite_store._connect)
+    other.start()
+    other.join()
+    assert worker not in sqlite_store._connections
+    assert len(sqlite_store._connections) == 2
+
+    sqlite_store.close()
+    assert sqlite_store._connections == {}
+
+
+def _cached_app(tmp_path, shared):
+    app = Flask(__name__)
+    app.config.update(RESPONSE_CACHE_TTL=30)
+    if shared:
+        app.config['RESPONSE_CACHE_PATH'] = str(tmp_path / 'shared.db')
+    cache = ResponseCache()
+    cache.init_app(app)
+    calls = []
+
+    @app.route('/stats')
+    @cache.cached('dashboard')
+    def stats():
+        calls.append(1)
+        return jsonify(calls=len(calls))
+
+    return app.test_client(), cache, calls
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_invalidating_a_namespace_drops_its_responses(tmp_path, shared):
+    client, cache, calls = _cached_app(tmp_path, shared)
+
+    assert client.get('/stats').get_json() == {'calls': 1}
+    assert client.get('/stats').get_json() == {'calls': 1}
+    cache.invalidate('dashboard')
+    assert client.get('/stats').get_json() == {'calls': 2}
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
+    assert stats['hit_rate'] == 0.3333
+    assert stats['shared'] is shared
+    if shared:
+        cache.shared.close()
+
+
+def test_shared_generation_is_seen_by_other_processes(tmp_path):
+    client, cache, calls = _cached_app(tmp_path, shared=True)
+    client.get('/stats')
+    # Another worker process on the host invalidates through the shared file
+    other = SQLiteStore(str(tmp_path / 'shared.db'))
+    other.bump('dashboard')
+    other.close()
+
+    assert client.get('/stats').get_json() == {'calls': 2}
+    cache.shared.close()
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import scoring
+from scoring import N_FEATURES, BatchScorer, ScoreCache
+
+
+class RecordingPredict:
+    """Stands in for the model: each row scores as its first feature."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            self.batch_sizes.append(len(rows))
+        return rows[:, 0].copy()
+
+
+def _row(value):
+    return [value] + [0.0] * (N_FEATURES - 1)
+
+
+def test_concurrent_requests_coalesce_into_one_batch():
+    predict = RecordingPredict()
+    scorer = BatchScorer(predict, max_batch_size=8, max_wait_ms=200)
+    futures = [scorer.submit(_row(i / 10.0)) for i in range(5)]
+
+    results = [future.result(timeout=5) for future in futures]
+
+    assert predict.batch_sizes == [5]
+    assert [probability for probability, _ in results] == pytest.approx([i / 10.0 for i in range(5)])
+    assert scorer.stats()['mean_batch_size'] == 5.0
+
+
+def test_batches_are_cut_at_max_batch_size():
+    predict = RecordingPredict()
+    scorer = BatchScorer(predict, max_batch_size=4, max_wait_ms=300)
+    started = time.monotonic()
+    futures = [scorer.submit(_row(0.5)) for _ in range(10)]
+
+    futures[3].result(timeout=5)
+    full_batch_seconds = time.monotonic() - started
+    for future in futures:
+        future.result(timeout=5)
+
+    assert predict.batch_sizes == [4, 4, 2]
+    # Full batches go out without waiting for the deadline
+    assert full_batch_seconds < 0.3
+    assert scorer.stats()['max_batch_size_seen'] == 4
+
+
+def test_partial_batch_is_flushed_at_the_deadline():
+    predict = RecordingPredict()
+    scorer = BatchScorer(predict, max_batch_size=64, max_wait_ms=50)
+    started = time.monotonic()
+
+    probability, risk_level = scorer.submit(_row(0.9)).result(timeout=5)
+
+    assert 0.04 <= time.monotonic() - started < 2.0
+    assert predict.batch_sizes == [1]
+    assert probability == pytest.approx(0.9) and risk_level == 'High'
+
+
+def test_predict_errors_reach_every_caller():
+    def failing(rows):
+        raise RuntimeError('model unavailable')
+
+    scorer = BatchScorer(failing, max_batch_size=4, max_wait_ms=20)
+    futures = [scorer.submit(_row(0.1)) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    assert scorer.stats()['errors'] >= 1
+
+
+@pytest.mark.parametrize('features', [
+    [None] * N_FEATURES, [{}] * N_FEATURES, ['1'] * N_FEATURES, [float('nan')] * N_FEATURES,
+    np.array(['a'] * N_FEATURES), 5, _row(0.1)[:-1],
+])
+def test_invalid_rows_raise_value_error(features):
+    with pytest.raises(ValueError):
+        BatchScorer._row(features)
+
+
+def test_numpy_rows_are_accepted():
+    assert BatchScorer._row(np.arange(N_FEATURES)).dtype == np.float32
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(cache, value):
+    return cache.key(np.asarray(_row(value), dtype=np.float32))
+
+
+def test_score_cache_expires_entries_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scoring.time, 'monotonic', clock)
+    cache = ScoreCache(maxsize=10, ttl=60.0)
+    cache.set_version('v1')
+    cache.put(_key(cache, 0.5), 'v1', (0.5, 'Medium'))
+
+    clock.now += 59
+    assert cache.get(_key(cache, 0.5), 'v1') == (0.5, 'Medium')
+    clock.now += 2
+    assert cache.get(_key(cache, 0.5), 'v1') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = ScoreCache(maxsize=2)
+    cache.set_version('v1')
+    cache.put(_key(cache, 0.1), 'v1', (0.1, 'Low'))
+    cache.put(_key(cache, 0.2), 'v1', (0.2, 'Low'))
+    # Reading 0.1 makes 0.2 the least recently used
+    assert cache.get(_key(cache, 0.1), 'v1') == (0.1, 'Low')
+    cache.put(_key(cache, 0.3), 'v1', (0.3, 'Low'))
+
+    assert cache.get(_key(cache, 0.2), 'v1') is None
+    assert cache.get(_key(cache, 0.1), 'v1') == (0.1, 'Low')
+    assert cache.get(_key(cache, 0.3), 'v1') == (0.3, 'Low')
+    assert cache.stats()['evictions'] == 1
+
+
+def test_score_cache_drops_entries_when_the_model_version_changes():
+    cache = ScoreCache(maxsize=10)
+    cache.set_version('v1')
+    cache.put(_key(cache, 0.5), 'v1', (0.5, 'Medium'))
+
+    cache.set_version('v2')
+
+    assert cache.get(_key(cache, 0.5), 'v2') is None
+    # Lookups and late results from the old model bypass the cache
+    cache.put(_key(cache, 0.5), 'v1', (0.5, 'Medium'))
+    assert cache.get(_key(cache, 0.5), 'v1') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['model_version'] == 'v2'
+
+
+def test_score_cache_counts_hits_and_misses_through_the_scorer():
+    predict = RecordingPredict()
+    cache = ScoreCache(maxsize=10)
+    cache.set_version('v1')
+    scorer = BatchScorer(predict, max_wait_ms=1, cache=cache, model_version='v1')
+
+    first = scorer.score(_row(0.25))
+    # -0.0 and sub-rounding noise map to the same key
+    again = scorer.score([0.25 + 1e-9, -0.0] + [0.0] * (N_FEATURES - 2))
+
+    assert again == first
+    assert predict.batch_sizes == [1]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
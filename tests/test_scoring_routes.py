@@ -0,0 +1,104 @@
+import json
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pytest
+
+import admin
+from bulk_scoring import job_key, start_background_job
+from response_cache import response_cache
+from state_store import get_state
+
+
+def test_score_timeout_returns_503(admin_client, monkeypatch):
+    def slow_score(features, config=None):
+        raise FuturesTimeoutError()
+
+    monkeypatch.setattr(admin, 'score_features', slow_score)
+    response = admin_client.post('/admin/score', json={'features': [0.1] * 10})
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+
+
+def test_score_rejects_non_list_features(admin_client):
+    response = admin_client.post('/admin/score', json={'features': 'abc'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    '{"features": [null, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [{}, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": ["1", 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [true, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [NaN, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [Infinity, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [1e300, 1, 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [[1, 2], 1, 1, 1, 1, 1, 1, 1, 1]}',
+    '{"features": [1, 1, 1]}',
+])
+def test_score_rejects_malformed_features(admin_client, body):
+    response = admin_client.post('/admin/score', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_background_job_removes_upload_and_invalidates_dashboard(app, tmp_path, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(response_cache, 'invalidate', lambda *namespaces: invalidated.extend(namespaces))
+    path = tmp_path / 'upload.jsonl'
+    path.write_text(json.dumps({'user_id': 1, 'transaction_id': 'BULK1', 'amount': 5.0,
+                                'recipient_upi': 'bulk@upi', 'features': [0.1] * 10}) + '\n')
+
+    start_background_job(app, str(path), 'jsonl', 'job1').join(timeout=30)
+
+    assert not path.exists()
+    assert invalidated == ['dashboard']
+    assert get_state(job_key('job1'))['status'] == 'completed'
+
+
+def _two_row_upload(path):
+    path.write_text(''.join(json.dumps({'user_id': 1, 'transaction_id': f'BULK{i}', 'amount': 5.0,
+                                        'recipient_upi': 'bulk@upi', 'features': [0.1] * 10}) + '\n'
+                            for i in range(2)))
+
+
+def test_failed_job_keeps_upload_and_resumes_from_rows_done(app, admin_client, tmp_path, monkeypatch):
+    import bulk_scoring
+    from models import Transaction
+
+    path = tmp_path / 'upload.jsonl'
+    _two_row_upload(path)
+    score_chunk = bulk_scoring._score_chunk
+    calls = []
+
+    def fail_second_chunk(records, predict, summary):
+        calls.append([record['transaction_id'] for record in records])
+        if len(calls) == 2:
+            raise RuntimeError('scorer went away')
+        score_chunk(records, predict, summary)
+
+    monkeypatch.setattr(bulk_scoring, '_score_chunk', fail_second_chunk)
+    app.config['BULK_SCORING_CHUNK_SIZE'] = 1
+    start_background_job(app, str(path), 'jsonl', 'job2', chunk_size=1).join(timeout=30)
+
+    progress = get_state(job_key('job2'))
+    assert progress['status'] == 'failed'
+    assert progress['rows_done'] == 1
+    assert path.exists()
+
+    response = admin_client.post('/admin/bulk-score/job2/resume')
+    assert response.status_code == 202
+    for thread in threading.enumerate():
+        if thread.name == 'bulk-scoring-job2':
+            thread.join(timeout=30)
+
+    progress = get_state(job_key('job2'))
+    assert progress['status'] == 'completed'
+    assert progress['rows_done'] == 2
+    assert progress['summary']['inserted'] == 2
+    assert calls == [['BULK0'], ['BULK1'], ['BULK1']]
+    assert {txn.transaction_id for txn in Transaction.query} == {'BULK0', 'BULK1'}
+    assert not path.exists()
+    # Only failed jobs resume
+    assert admin_client.post('/admin/bulk-score/job2/resume').status_code == 409
+    assert admin_client.post('/admin/bulk-score/nope/resume').status_code == 404
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from extensions import db
+from models import User
+from search_index import NgramIndex
+
+
+def _users(*names):
+    users = [User(username=name, email=f'{name}@example.com', password_hash='!', created_at=datetime.utcnow())
+             for name in names]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def test_ngram_matches_are_checked_against_the_row(app):
+    # 'abc_bcd' holds both trigrams of 'abcd' without containing it
+    exact, partial = _users('abcd', 'abc_bcd')
+    index = NgramIndex('users')
+    assert index.search('abcd', limit=10, offset=0) == [exact.id]
+    assert index.search('bcd', limit=10, offset=0) == [exact.id, partial.id]
+
+
+def test_ngram_prunes_rows_removed_outside_the_orm(app):
+    users = _users(*(f'walker{i}' for i in range(6)))
+    index = NgramIndex('users')
+    assert len(index.search('walker', limit=3, offset=0)) == 3
+
+    removed = [user.id for user in users[3:]]
+    db.session.execute(sa.delete(User.__table__).where(User.__table__.c.id.in_(removed)))
+    db.session.commit()
+
+    assert index.search('walker', limit=3, offset=0) == [user.id for user in reversed(users[:3])]
+    assert not set(removed) & set(index.documents)
@@ -0,0 +1,112 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import column
+from sqlalchemy.dialects import mysql, postgresql
+
+from archival import TransactionRollup
+from extensions import db
+from models import Transaction, User
+from timeseries import (TimeSeriesError, _bucket_expression, bucket_labels, get_time_series, parse_range,
+                        rollup_days)
+
+
+def test_parse_range_converts_offsets_to_naive_utc():
+    start, end = parse_range('2026-01-01T10:00:00+05:30', '2026-01-02T00:00:00Z', 'day')
+    assert start == datetime(2026, 1, 1, 4, 30)
+    assert end == datetime(2026, 1, 2)
+    assert start.tzinfo is None and end.tzinfo is None
+
+
+def test_parse_range_defaults_and_errors():
+    now = datetime(2026, 3, 31)
+    assert parse_range(None, None, 'day', now=now) == (datetime(2026, 3, 1), now)
+    with pytest.raises(TimeSeriesError):
+        parse_range('yesterday', None, 'day')
+
+
+@pytest.mark.parametrize('dialect, granularity, fragment', [
+    (postgresql.dialect(), 'hour', "to_char(date_trunc('hour', ts), 'YYYY-MM-DD HH24:00')"),
+    (postgresql.dialect(), 'week', "to_char(date_trunc('week', ts), 'YYYY-MM-DD')"),
+    (postgresql.dialect(), 'month', "to_char(ts, 'YYYY-MM')"),
+    (mysql.dialect(), 'day', "date_format(ts, '%Y-%m-%d')"),
+    (mysql.dialect(), 'week', "date_format(subdate(ts, weekday(ts)), '%Y-%m-%d')"),
+])
+def test_bucket_expression_per_dialect(dialect, granularity, fragment):
+    expression = _bucket_expression(column('ts'), granularity, dialect.name)
+    sql = str(expression.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    assert sql.replace('%%', '%') == fragment
+
+
+@pytest.mark.parametrize('granularity, label', [
+    ('hour', '2026-03-04 13:00'),
+    ('day', '2026-03-04'),
+    ('week', '2026-03-02'),
+    ('month', '2026-03'),
+])
+def test_sqlite_buckets_match_labels(app, granularity, label):
+    expression = _bucket_expression(column('ts'), granularity, 'sqlite')
+    bucket = db.session.execute(db.select(expression).select_from(
+        db.select(db.literal('2026-03-04 13:45:10.000000').label('ts')).subquery())).scalar()
+    assert bucket == label
+    assert label in bucket_labels(datetime(2026, 3, 4, 13, 45), datetime(2026, 3, 4, 14, 0), granularity)
+
+
+def test_bucket_labels_cover_the_range():
+    assert bucket_labels(datetime(2026, 1, 30, 12), datetime(2026, 3, 1), 'month') == ['2026-01', '2026-02']
+    assert bucket_labels(datetime(2026, 3, 4), datetime(2026, 3, 17), 'week') == \
+        ['2026-03-02', '2026-03-09', '2026-03-16']
+    assert bucket_labels(datetime(2026, 3, 4, 22, 30), datetime(2026, 3, 5, 1), 'hour') == \
+        ['2026-03-04 22:00', '2026-03-04 23:00', '2026-03-05 00:00']
+    with pytest.raises(TimeSeriesError):
+        bucket_labels(datetime(2000, 1, 1), datetime(2026, 1, 1), 'hour')
+
+
+def test_rollup_days_drop_partial_days():
+    assert rollup_days(datetime(2026, 3, 1), datetime(2026, 3, 4)) == (date(2026, 3, 1), date(2026, 3, 4))
+    assert rollup_days(datetime(2026, 3, 1, 9), datetime(2026, 3, 4, 18)) == (date(2026, 3, 2), date(2026, 3, 4))
+
+
+def _seed_live_and_archived():
+    user = User(username='payer', email='payer@example.com', password_hash='!', created_at=datetime(2026, 1, 1))
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Transaction(user_id=user.id, transaction_id='LIVE1', amount=30.0, recipient_upi='r@upi',
+                               timestamp=datetime(2026, 3, 2, 10), fraud_probability=0.2, risk_level='Low',
+                               is_flagged=False))
+    db.session.add_all([
+        TransactionRollup(day=date(2026, 3, 1), user_id=user.id, risk_level='Low', is_flagged=False,
+                          count=2, amount_sum=20.0, probability_sum=0.2),
+        TransactionRollup(day=date(2026, 3, 2), user_id=user.id, risk_level='High', is_flagged=True,
+                          count=1, amount_sum=50.0, probability_sum=0.9),
+    ])
+    db.session.commit()
+
+
+def test_time_series_merges_rollups_with_live_rows(app):
+    _seed_live_and_archived()
+
+    series = get_time_series(datetime(2026, 3, 1), datetime(2026, 3, 3), 'day')
+
+    assert series == [
+        {'bucket': '2026-03-01', 'count': 2, 'amount': 20.0, 'mean_fraud_probability': 0.1},
+        {'bucket': '2026-03-02', 'count': 2, 'amount': 80.0, 'mean_fraud_probability': 0.55},
+    ]
+    assert get_time_series(datetime(2026, 3, 1), datetime(2026, 3, 3), 'day', risk_level='High')[1]['count'] == 1
+
+
+def test_time_series_leaves_partial_days_and_hours_to_live_rows(app):
+    _seed_live_and_archived()
+
+    # Starting mid-day on the 1st skips that day's rollup rather than counting all of it
+    partial = get_time_series(datetime(2026, 3, 1, 12), datetime(2026, 3, 3), 'day')
+    assert [point['count'] for point in partial] == [0, 2]
+    hourly = get_time_series(datetime(2026, 3, 2), datetime(2026, 3, 3), 'hour')
+    assert sum(point['count'] for point in hourly) == 1
+
+
+def test_timeseries_route_reports_archived_coverage(admin_client):
+    for granularity, included in (('day', True), ('hour', False)):
+        response = admin_client.get('/admin/timeseries', query_string={
+            'granularity': granularity, 'start': '2026-03-01', 'end': '2026-03-02'})
+        assert response.get_json()['includes_archived'] is included
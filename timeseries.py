@@ -0,0 +1,184 @@
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import func
+
+from archival import TransactionRollup
+from extensions import db
+from models import Transaction
+
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+MAX_BUCKETS = 5000
+
+
+class TimeSeriesError(ValueError):
+    pass
+
+
+def includes_archived(granularity):
+    """Whether a series at this granularity counts archived transactions (rollups are daily)."""
+    return granularity != 'hour'
+
+
+def _bucket_expression(column, granularity, dialect_name):
+    """SQL expression labelling each row with its bucket, in the format of `_bucket_label`."""
+    if dialect_name == 'sqlite':
+        return {
+            'hour': func.strftime('%Y-%m-%d %H:00', column),
+            'day': func.strftime('%Y-%m-%d', column),
+            'week': func.date(column, 'weekday 0', '-6 days'),
+            'month': func.strftime('%Y-%m', column),
+        }[granularity]
+    if dialect_name == 'postgresql':
+        return {
+            'hour': func.to_char(func.date_trunc('hour', column), 'YYYY-MM-DD HH24:00'),
+            'day': func.to_char(column, 'YYYY-MM-DD'),
+            'week': func.to_char(func.date_trunc('week', column), 'YYYY-MM-DD'),
+            'month': func.to_char(column, 'YYYY-MM'),
+        }[granularity]
+    # MySQL / MariaDB
+    return {
+        'hour': func.date_format(column, '%Y-%m-%d %H:00'),
+        'day': func.date_format(column, '%Y-%m-%d'),
+        'week': func.date_format(func.subdate(column, func.weekday(column)), '%Y-%m-%d'),
+        'month': func.date_format(column, '%Y-%m'),
+    }[granularity]
+
+
+def _bucket_start(moment, granularity):
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_bucket(moment, granularity):
+    if granularity == 'hour':
+        return moment + timedelta(hours=1)
+    if granularity == 'day':
+        return moment + timedelta(days=1)
+    if granularity == 'week':
+        return moment + timedelta(days=7)
+    return (moment + timedelta(days=32)).replace(day=1)
+
+
+def _bucket_label(moment, granularity):
+    if granularity == 'hour':
+        return moment.strftime('%Y-%m-%d %H:00')
+    if granularity == 'month':
+        return moment.strftime('%Y-%m')
+    return moment.strftime('%Y-%m-%d')
+
+
+def bucket_labels(start, end, granularity):
+    """Every bucket label from the bucket containing `start` up to `end` (exclusive)."""
+    labels = []
+    moment = _bucket_start(start, granularity)
+    while moment < end:
+        labels.append(_bucket_label(moment, granularity))
+        if len(labels) > MAX_BUCKETS:
+            raise TimeSeriesError(f"Range produces more than {MAX_BUCKETS} {granularity} buckets")
+        moment = _next_bucket(moment, granularity)
+    return labels
+
+
+def rollup_days(start, end):
+    """The [first, last) range of whole days inside [start, end).
+
+    Rollups only resolve to a day, so a day that the range only partly covers
+    is left out rather than counted in full.
+    """
+    first = start.date()
+    if start != datetime.combine(first, time.min):
+        first += timedelta(days=1)
+    return first, end.date()
+
+
+def _rollup_rows(start, end, granularity, dialect_name, risk_level=None, user_id=None):
+    """Per-bucket (count, amount, probability sum) of archived transactions on the whole days in range."""
+    first, last = rollup_days(start, end)
+    if first >= last:
+        return []
+    bucket = _bucket_expression(TransactionRollup.day, granularity, dialect_name)
+    query = db.session.query(
+        bucket,
+        func.sum(TransactionRollup.count),
+        func.sum(TransactionRollup.amount_sum),
+        func.sum(TransactionRollup.probability_sum)
+    ).filter(TransactionRollup.day >= first, TransactionRollup.day < last)
+    if risk_level:
+        query = query.filter(TransactionRollup.risk_level == risk_level)
+    if user_id:
+        query = query.filter(TransactionRollup.user_id == user_id)
+    return query.group_by(bucket).all()
+
+
+def get_time_series(start, end, granularity='day', risk_level=None, user_id=None):
+    """Count, summed amount and mean fraud_probability per bucket in [start, end).
+
+    One GROUP BY over the hot transactions table plus, for day and coarser
+    buckets, one over the daily rollups of archived transactions. Archived
+    transactions count only on days the range covers in full, and hourly
+    series leave them out entirely (see `includes_archived`).
+    """
+    if granularity not in GRANULARITIES:
+        raise TimeSeriesError(f"Unknown granularity: {granularity}")
+    if end <= start:
+        raise TimeSeriesError("end must be after start")
+    labels = bucket_labels(start, end, granularity)
+    dialect_name = db.session.get_bind().dialect.name
+
+    bucket = _bucket_expression(Transaction.timestamp, granularity, dialect_name)
+    query = db.session.query(
+        bucket,
+        func.count(Transaction.id),
+        func.coalesce(func.sum(Transaction.amount), 0),
+        func.sum(Transaction.fraud_probability)
+    ).filter(Transaction.timestamp >= start, Transaction.timestamp < end)
+    if risk_level:
+        query = query.filter(Transaction.risk_level == risk_level)
+    if user_id:
+        query = query.filter(Transaction.user_id == user_id)
+    results = query.group_by(bucket).all()
+    if includes_archived(granularity):
+        results += _rollup_rows(start, end, granularity, dialect_name, risk_level, user_id)
+
+    rows = {}
+    for label, count, amount, probability_sum in results:
+        total_count, total_amount, total_probability = rows.get(label, (0, 0.0, 0.0))
+        rows[label] = (total_count + (count or 0), total_amount + float(amount or 0),
+                       total_probability + float(probability_sum or 0))
+
+    series = []
+    for label in labels:
+        count, amount, probability_sum = rows.get(label, (0, 0.0, 0.0))
+        series.append({
+            'bucket': label,
+            'count': count,
+            'amount': round(amount, 2),
+            'mean_fraud_probability': round(probability_sum / count, 4) if count else None,
+        })
+    return series
+
+
+def _parse_moment(value):
+    # Timestamps are stored as naive UTC; bring offset-qualified input ("...Z", "+05:30") into line
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def parse_range(start_arg, end_arg, granularity, now=None):
+    """Parse ISO dates/datetimes from request args; defaults to the last 30 days (90 for hourly)."""
+    now = now or datetime.utcnow()
+    try:
+        end = _parse_moment(end_arg) if end_arg else now
+        default_days = 90 if granularity == 'hour' else 30
+        start = _parse_moment(start_arg) if start_arg else end - timedelta(days=default_days)
+    except ValueError as e:
+        raise TimeSeriesError(f"Invalid date: {str(e)}") from e
+    return start, end